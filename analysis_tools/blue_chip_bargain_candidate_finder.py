@@ -1,6 +1,7 @@
 from data_loaders.fmp_stock_list_loader import FmpStockListLoader
 from botrading.data_loaders.fmp_data_loader import FmpDataLoader
-from botrading.data_loaders.market_symbol_loader import MarketSymbolLoader
+from data_loaders.market_symbol_loader import MarketIndex
+from data_loaders.market_universe_loader import MarketUniverseLoader
 from screeners.momentum_screener1 import MomentumScreener1
 from screeners.growth_screener1 import GrowthScreener1
 from screeners.fifty_two_week_low_screener import FiftyTwoWeekLowScreener
@@ -19,7 +20,7 @@ BLUE_CHIP_BARGAIN_CANDIDATES_FILE_NAME = "blue_chip_bargain_candidates.csv"
 
 class BlueChipBargainCandidateFinder:
     def __init__(self, fmp_api_key: str):
-        self.market_symbol_loader = MarketSymbolLoader()
+        self.universe_loader = MarketUniverseLoader()
         self.fmp_data_loader = FmpDataLoader(fmp_api_key)
         self.growth_loader = FmpGrowthLoader1(fmp_api_key)
         self.fmp_analyst_ratings_loader = FmpAnalystRatingsLoader(fmp_api_key)
@@ -33,13 +34,7 @@ class BlueChipBargainCandidateFinder:
         delete_file(BLUE_CHIP_BARGAIN_CANDIDATES_DIR, BLUE_CHIP_BARGAIN_CANDIDATES_FILE_NAME)
 
         # Load Blue Chip stocks
-        snp_500_symbols_df = self.market_symbol_loader.fetch_sp500_symbols(cache_file=True)
-        nasdaq_100_symbols_df = self.market_symbol_loader.fetch_nasdaq100_symbols(cache_file=True)
-        snp_500_symbol_list = list(snp_500_symbols_df['symbol'].unique())
-        nasdaq_100_symbol_list = list(nasdaq_100_symbols_df['symbol'].unique())
-
-        # Combine and eliminate dups
-        symbol_list = list(set(snp_500_symbol_list + nasdaq_100_symbol_list))
+        symbol_list = sorted(self.universe_loader.union(MarketIndex.SNP_500, MarketIndex.NASDAQ_100))
 
         # Fetch price history
         start_date = datetime.today() - timedelta(days=DAILY_DATA_FETCH_PERIODS)
@@ -52,7 +47,7 @@ class BlueChipBargainCandidateFinder:
 
         # Undervalued screener
         undervalued_df = self.fifty_two_week_low_screener.run(symbol_list, prices_dict)
-        logi(f"Undervalued screener returned {len(undervalued_df)} items.")
+        logi("Undervalued screener returned {} items.", len(undervalued_df))
         symbol_list = undervalued_df['symbol'].unique()
 
         # Load growth data
@@ -63,7 +58,7 @@ class BlueChipBargainCandidateFinder:
         if growth_df is None or len(growth_df) == 0:
             logi("Growth screener returned no results")
             return
-        logi(f"Growth screener returned {len(growth_df)} items.")
+        logi("Growth screener returned {} items.", len(growth_df))
 
         # Merge growth
         merged_df = pd.merge(undervalued_df, growth_df, on='symbol', how='inner')
@@ -83,4 +78,4 @@ class BlueChipBargainCandidateFinder:
         path = os.path.join(BLUE_CHIP_BARGAIN_CANDIDATES_DIR, BLUE_CHIP_BARGAIN_CANDIDATES_FILE_NAME)
         merged_df.to_csv(path)
 
-        logi(f"Blue chip candidates saved to {path}")
+        logi("Blue chip candidates saved to {}", path)
@@ -0,0 +1,99 @@
+import re
+import functools
+from collections import deque
+from nltk.stem import WordNetLemmatizer
+
+"""
+Local catalyst classification of news articles.
+
+All tag phrases of all catalyst categories are normalized (lower case, lemmatized words) and compiled into one
+Aho-Corasick automaton over words. An article is normalized the same way and scanned once, every phrase occurring
+in it is found in time linear in the article length, no matter how many phrases there are. Lemmas are memoized,
+news vocabulary repeats heavily so WordNet is only consulted once per distinct word.
+"""
+
+LEMMA_CACHE_SIZE = 100000
+
+
+class CatalystTagger:
+    """
+    Labels texts with the catalyst categories whose tag phrases they contain
+
+    Attributes:
+        catalyst_tags (dict): Category -> comma-separated tag phrases, e.g. {'merger': "merger,acquisition"}
+    """
+    def __init__(self, catalyst_tags: dict, lemmatize=None):
+        if lemmatize is None:
+            lemmatize = WordNetLemmatizer().lemmatize
+        self.lemmatize = functools.lru_cache(maxsize=LEMMA_CACHE_SIZE)(lemmatize)
+
+        # Automaton nodes: word transitions, failure link and the (category, phrase) pairs ending at the node
+        self.transitions = [{}]
+        self.failure_links = [0]
+        self.outputs = [set()]
+        for category, tags in catalyst_tags.items():
+            for phrase in tags.split(","):
+                words = self.normalize(phrase)
+                if words:
+                    self._add_phrase(words, category, phrase.strip())
+        self._build_failure_links()
+
+    def normalize(self, text: str):
+        """
+        Splits a text into lower case, lemmatized words.
+        """
+        return [self.lemmatize(word) for word in re.findall(r"[a-z0-9]+", text.lower())]
+
+    def _add_phrase(self, words: list, category: str, phrase: str):
+        node = 0
+        for word in words:
+            if word not in self.transitions[node]:
+                self.transitions.append({})
+                self.failure_links.append(0)
+                self.outputs.append(set())
+                self.transitions[node][word] = len(self.transitions) - 1
+            node = self.transitions[node][word]
+        self.outputs[node].add((category, phrase))
+
+    def _build_failure_links(self):
+        # Breadth first, the failure link of a node points to the longest proper suffix that is a phrase prefix
+        queue = deque(self.transitions[0].values())
+        while queue:
+            node = queue.popleft()
+            for word, child in self.transitions[node].items():
+                queue.append(child)
+                fallback = self.failure_links[node]
+                while fallback and word not in self.transitions[fallback]:
+                    fallback = self.failure_links[fallback]
+                self.failure_links[child] = self.transitions[fallback].get(word, 0)
+                # Phrases ending at the suffix end here too
+                self.outputs[child] |= self.outputs[self.failure_links[child]]
+
+    def find_phrases(self, text: str):
+        """
+        Returns the (category, phrase) pairs occurring in a text.
+        """
+        matches = set()
+        node = 0
+        for word in self.normalize(text or ""):
+            while node and word not in self.transitions[node]:
+                node = self.failure_links[node]
+            node = self.transitions[node].get(word, 0)
+            matches |= self.outputs[node]
+        return matches
+
+    def tag(self, text: str):
+        """
+        Returns the sorted catalyst categories of a text.
+        """
+        return sorted({category for category, _ in self.find_phrases(text)})
+
+    def tag_articles(self, news_df, text_columns: list):
+        """
+        Adds the categories of every article as 'catalysts' and the matched tag phrases as 'catalyst_phrases'.
+        """
+        texts = news_df[text_columns].fillna("").astype(str).agg(" ".join, axis=1)
+        matches = [self.find_phrases(text) for text in texts]
+        news_df['catalysts'] = [",".join(sorted({category for category, _ in match})) for match in matches]
+        news_df['catalyst_phrases'] = [",".join(sorted({phrase for _, phrase in match})) for match in matches]
+        return news_df
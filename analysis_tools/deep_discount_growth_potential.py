@@ -1,6 +1,7 @@
 from data_loaders.fmp_stock_list_loader import FmpStockListLoader
 from botrading.data_loaders.fmp_data_loader import FmpDataLoader
-from botrading.data_loaders.market_symbol_loader import MarketSymbolLoader
+from data_loaders.market_symbol_loader import MarketIndex
+from data_loaders.market_universe_loader import MarketUniverseLoader
 from screeners.momentum_screener1 import MomentumScreener1
 from screeners.growth_screener1 import GrowthScreener1
 from screeners.earnings_estimate_screener1 import EarningsEstimateScreener1
@@ -39,7 +40,7 @@ WEIGHTS = {
 
 class DeepDiscountGrowthCandidateFinder:
     def __init__(self, fmp_api_key: str):
-        self.market_symbol_loader = MarketSymbolLoader()
+        self.universe_loader = MarketUniverseLoader()
         self.fmp_data_loader = FmpDataLoader(fmp_api_key)
         self.growth_loader = FmpGrowthLoader1(fmp_api_key)
         self.fmp_analyst_ratings_loader = FmpAnalystRatingsLoader(fmp_api_key)
@@ -54,9 +55,8 @@ class DeepDiscountGrowthCandidateFinder:
         delete_file(DEEP_DISCOUNT_GROWTH_CANDIDATES_DIR, DEEP_DISCOUNT_GROWTH_CANDIDATES_FILE_NAME)
 
         # Load symbol list
-        symbols_df = self.market_symbol_loader.fetch_russell1000_symbols(cache_file=True)
-        #symbols_df = self.market_symbol_loader.fetch_nasdaq100_symbols(cache_file=True)
-        symbol_list = list(symbols_df['symbol'].unique())
+        symbol_list = self.universe_loader.get_symbol_list(MarketIndex.RUSSELL_1000)
+        #symbol_list = self.universe_loader.get_symbol_list(MarketIndex.NASDAQ_100)
 
         # Fetch price history
         start_date = datetime.today() - timedelta(days=DAILY_DATA_FETCH_PERIODS)
@@ -74,7 +74,7 @@ class DeepDiscountGrowthCandidateFinder:
         undervalued_df = self.fifty_two_week_low_screener.run(symbol_list,
                                                               prices_dict,
                                                               min_price_drop_percent=MIN_PRICE_DROP_PERCENT)
-        logi(f"Fifty-two week low screener returned {len(undervalued_df)} items.")
+        logi("Fifty-two week low screener returned {} items.", len(undervalued_df))
         symbol_list = undervalued_df['symbol'].unique()
 
         # Load growth data
@@ -87,7 +87,7 @@ class DeepDiscountGrowthCandidateFinder:
         if growth_df is None or len(growth_df) == 0:
             logi("Growth screener returned no results")
             return
-        logi(f"Growth screener returned {len(growth_df)} items.")
+        logi("Growth screener returned {} items.", len(growth_df))
 
         # Merge growth
         merged_df = pd.merge(undervalued_df, growth_df, on='symbol', how='inner')
@@ -114,7 +114,7 @@ class DeepDiscountGrowthCandidateFinder:
         #merged_df = pd.merge(merged_df, news_sentiment_df, on='symbol', how='inner')
 
         if merged_df.empty:
-            logi(f"Candidates file is empty")
+            logi("Candidates file is empty")
             return
 
         # Normalize the different metrics before calculating the score
@@ -145,4 +145,4 @@ class DeepDiscountGrowthCandidateFinder:
         path = os.path.join(DEEP_DISCOUNT_GROWTH_CANDIDATES_DIR, DEEP_DISCOUNT_GROWTH_CANDIDATES_FILE_NAME)
         merged_df.to_csv(path, index=False)
 
-        logi(f"Deep discount growth candidates saved to {path}")
+        logi("Deep discount growth candidates saved to {}", path)
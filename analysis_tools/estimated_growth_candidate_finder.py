@@ -7,12 +7,13 @@ import os
 from sklearn.preprocessing import MinMaxScaler
 from utils.log_utils import *
 from utils.indicator_utils import add_kernel_reg_smoothed_line, compute_slope
+from utils.cache_manager import get_cache_manager
 import numpy as np
-import json
 
 # Configuration
 CANDIDATES_DIR = "C:\\dev\\trading\\data\\estimated_growth\\candidates"
 CANDIDATES_FILE_NAME = "estimated_growth_candidates.csv"
+COMPANY_OUTLOOK_CACHE_NAMESPACE = "company_outlook"
 
 # Stock screener config
 EXCHANGE_LIST = "nyse,nasdaq,amex"
@@ -37,6 +38,7 @@ class EstimatedGrowthCandidateFinder:
     def __init__(self, fmp_api_key):
         self.symbol_loader = MarketSymbolLoader()
         self.fmp_data_loader = FmpDataLoader(fmp_api_key)
+        self.cache_manager = get_cache_manager()
 
     def fetch_price_data(self, symbol_list: list):
         start_date = (datetime.now() - timedelta(days=400)).strftime('%Y-%m-%d')
@@ -49,7 +51,7 @@ class EstimatedGrowthCandidateFinder:
         for symbol, df in prices_dict.items():
             if df.empty:
                 continue
-            logd(f"Calculating trend for {symbol}")
+            logd("Calculating trend for {}", symbol)
             # Add smoothed close trend and slope
             df = add_kernel_reg_smoothed_line(
                 df, column_list=['close'], output_cols=['close_smoothed'], bandwidth=9, var_type='c'
@@ -85,7 +87,7 @@ class EstimatedGrowthCandidateFinder:
         estimates = self.fmp_data_loader.fetch_multiple_analyst_earnings_estimates(symbol_list, period='annual')
         results = []
         for symbol, df in estimates.items():
-            logd(f"Calculating estimates for {symbol}")
+            logd("Calculating estimates for {}", symbol)
             if df.empty:
                 continue
             df['date'] = pd.to_datetime(df['date'])
@@ -137,28 +139,23 @@ class EstimatedGrowthCandidateFinder:
         return results_df
 
     def fetch_company_outlook(self, symbol_list):
-        os.makedirs(CACHE_DIR, exist_ok=True)  # Ensure the cache directory exists
         results = []
 
         for symbol in symbol_list:
-            cache_file = os.path.join(CACHE_DIR, f"{symbol}_outlook.json")
-
             # Check if cache exists
-            if os.path.exists(cache_file):
-                with open(cache_file, 'r') as f:
-                    company_outlook = json.load(f)
-                    logi(f"Loaded company outlook for {symbol} from cache.")
+            company_outlook = self.cache_manager.load_json(COMPANY_OUTLOOK_CACHE_NAMESPACE, symbol)
+            if company_outlook is not None:
+                logi("Loaded company outlook for {} from cache.", symbol)
             else:
                 # Fetch data from API
                 company_outlook = self.fmp_data_loader.fetch_company_outlook(symbol)
                 if not company_outlook:
-                    logw(f"No company outlook data available for {symbol}.")
+                    logw("No company outlook data available for {}.", symbol)
                     continue
 
                 # Save to cache
-                with open(cache_file, 'w') as f:
-                    json.dump(company_outlook, f)
-                    logi(f"Cached company outlook for {symbol}.")
+                self.cache_manager.store_json(COMPANY_OUTLOOK_CACHE_NAMESPACE, symbol, company_outlook)
+                logi("Cached company outlook for {}.", symbol)
 
             # Parse the fetched or cached data
             result = {
@@ -279,6 +276,6 @@ class EstimatedGrowthCandidateFinder:
         os.makedirs(CANDIDATES_DIR, exist_ok=True)
         path = os.path.join(CANDIDATES_DIR, CANDIDATES_FILE_NAME)
         final_df.to_csv(path, index=False)
-        logi(f"Candidate results saved to {path}")
+        logi("Candidate results saved to {}", path)
 
         return final_df
@@ -8,7 +8,9 @@ from botrading.utils.df_utils import replace_inf_values, save_dataframe_to_csv
 from botrading.utils.date_utils import create_date_range
 from utils.file_utils import *
 from botrading.base.enums import TimeInterval
-import empyrical as ep
+from utils.performance_utils import calculate_performance_metrics
+from utils.returns_utils import build_price_matrix, calculate_daily_returns
+from utils.dtype_utils import optimize_prices_dict, log_memory_report
 
 
 # Configuration
@@ -73,90 +75,17 @@ class EtfPerformanceScreener():
                                                                                     end_date_str,
                                                                                     cache_data=True,
                                                                                     cache_dir=CACHE_DIR)
+        # Ten years of history for thousands of ETFs, keep the frames lean
+        fund_prices_dict = optimize_prices_dict(fund_prices_dict)
+        log_memory_report("ETF price history", fund_prices_dict)
 
-        # Calculate daily returns and merge dataframes based on the date
-        returns_dict = {}
-        for symbol, prices_df in fund_prices_dict.items():
-            prices_df.reset_index(inplace=True)
-            prices_df['date'] = pd.to_datetime(prices_df['date'])
-            prices_df.set_index('date', inplace=True)
-            prices_df['adj_close'] = prices_df['adj_close'].ffill()  # Fill missing prices
-            prices_df['daily_return'] = prices_df['adj_close'].pct_change().fillna(0)
-            prices_df = replace_inf_values(prices_df)
-            returns_dict[symbol] = prices_df[['daily_return']]
-
-        # Merge all dataframes on date
-        aligned_returns_df = pd.DataFrame()
-        for symbol, df in returns_dict.items():
-            if aligned_returns_df.empty:
-                aligned_returns_df = df.rename(columns={'daily_return': symbol})
-            else:
-                aligned_returns_df = aligned_returns_df.join(df.rename(columns={'daily_return': symbol}), how='outer')
-
-        # Initialize metrics dictionary
-        metrics = {
-            'etf': [],
-            'alpha': [],
-            'beta': [],
-            'volatility': [],
-            'max_drawdown': [],
-            'avg_annual_return': [],
-            'avg_3yr_return': [],
-            'avg_5yr_return': [],
-            'avg_10yr_return': [],
-            'return_y1': [],
-            'return_y2': [],
-            'return_y3': [],
-            'return_y4': [],
-            'return_y5': [],
-            'return_y6': [],
-            'return_y7': [],
-            'return_y8': [],
-            'return_y9': [],
-            'return_y10': []
-        }
-
-        # Calculate metrics using Empyrical
-        for symbol in symbol_list:
-            print(f"Now calculating metrics for {symbol}...")
-            alpha, beta = ep.alpha_beta(aligned_returns_df[symbol], aligned_returns_df[BENCHMARK_SYMBOL])
-            alpha = round(alpha * 100, PRECISION)
-            beta = round(beta, PRECISION)
-
-            volatility = round(ep.annual_volatility(aligned_returns_df[symbol]), PRECISION) * 100
-            max_drawdown = round(ep.max_drawdown(aligned_returns_df[symbol]), PRECISION) * 100
-
-            # Calculate average annual return
-            total_return = (aligned_returns_df[symbol] + 1).prod() - 1
-            years = NUM_YEARS  # The number of years of data
-            avg_annual_return = round((1 + total_return) ** (1 / years) - 1, PRECISION) * 100
-
-            # Calculate average 3-year, 5-year, and 10-year returns
-            avg_3yr_return = round(ep.annual_return(aligned_returns_df[symbol].last('3Y')) * 100, PRECISION)
-            avg_5yr_return = round(ep.annual_return(aligned_returns_df[symbol].last('5Y')) * 100, PRECISION)
-            avg_10yr_return = round(ep.annual_return(aligned_returns_df[symbol].last('10Y')) * 100, PRECISION)
-
-            metrics['etf'].append(symbol)
-            metrics['alpha'].append(alpha)
-            metrics['beta'].append(beta)
-            metrics['volatility'].append(volatility)
-            metrics['max_drawdown'].append(max_drawdown)
-            metrics['avg_annual_return'].append(avg_annual_return)
-            metrics['avg_3yr_return'].append(avg_3yr_return)
-            metrics['avg_5yr_return'].append(avg_5yr_return)
-            metrics['avg_10yr_return'].append(avg_10yr_return)
-
-            # Calculate annual returns for each year
-            for year in range(1, NUM_YEARS + 1):
-                year_start_date = datetime.today() - timedelta(days=365 * year)
-                year_end_date = year_start_date + timedelta(days=365)
-                year_returns = aligned_returns_df[symbol][
-                    (aligned_returns_df.index >= year_start_date) & (aligned_returns_df.index <= year_end_date)]
-                annual_return = ((year_returns + 1).prod() - 1) if not year_returns.empty else None
-                metrics[f'return_y{year}'].append(round(annual_return * 100, PRECISION) if annual_return is not None else None)
-
-        # Create a dataframe from the dictionary
-        metrics_df = pd.DataFrame(metrics)
+        # Align adjusted prices into one (date x symbol) matrix and calculate daily returns
+        price_matrix = build_price_matrix(fund_prices_dict, column='adj_close')
+        aligned_returns_df = replace_inf_values(calculate_daily_returns(price_matrix))
+
+        # Calculate metrics for all ETFs at once
+        metrics_df = calculate_performance_metrics(aligned_returns_df, BENCHMARK_SYMBOL, NUM_YEARS, PRECISION)
+        metrics_df.rename(columns={'symbol': 'etf'}, inplace=True)
 
         # Remove any rows that have infinity values to remove outliers
         metrics_df = metrics_df.replace([np.inf, -np.inf], np.nan).dropna()
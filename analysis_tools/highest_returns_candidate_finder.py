@@ -7,12 +7,15 @@ from screeners.momentum_screener1 import MomentumScreener1
 from screeners.growth_screener1 import GrowthScreener1
 from screeners.earnings_estimate_screener1 import EarningsEstimateScreener1
 from screeners.fifty_two_week_low_screener import FiftyTwoWeekLowScreener
+from screeners.screener_pipeline import ScreenerPipeline
 from data_loaders.fmp_analyst_ratings_loader import FmpAnalystRatingsLoader
 from data_loaders.fmp_growth_loader1 import FmpGrowthLoader1
 from data_loaders.fmp_stock_news_loader import FmpStockNewsLoader
 from utils.df_utils import *
 from utils.log_utils import *
 from utils.file_utils import *
+from utils.returns_utils import build_price_matrix, calculate_period_returns
+from utils.price_panel import create_price_panel
 from datetime import datetime, timedelta
 import os
 
@@ -56,22 +59,16 @@ class HighestReturnsFinder:
         self.earnings_estimate_screener = EarningsEstimateScreener1()
         self.growth_screener = GrowthScreener1()
 
-    def calculate_metrics(self, symbol, prices_df):
-        # Resample prices to monthly frequency and calculate monthly returns
-        monthly_prices = prices_df['close'].resample('M').last()
-        monthly_returns = monthly_prices.pct_change().dropna()
+    def calculate_metrics(self, prices_dict, symbol_list=None):
+        # Calculate monthly returns for all symbols at once
+        price_matrix = build_price_matrix(prices_dict, column='close', symbol_list=symbol_list)
+        monthly_returns_df = calculate_period_returns(price_matrix, 'M')
 
-        # Calculate average monthly returns
-        avg_monthly_return = monthly_returns.mean()
-
-        # Calculate highest monthly return
-        highest_monthly_return = monthly_returns.max()
-
-        # Calculate lowest monthly return
-        lowest_monthly_return = monthly_returns.min()
-
-        # Calculate standard deviation of monthly returns
-        std_dev_monthly_return = monthly_returns.std()
+        # Calculate average, highest, lowest and standard deviation of monthly returns
+        avg_monthly_return = monthly_returns_df.mean()
+        highest_monthly_return = monthly_returns_df.max()
+        lowest_monthly_return = monthly_returns_df.min()
+        std_dev_monthly_return = monthly_returns_df.std()
 
         # Calculate coefficient of variation (CV)
         cv = std_dev_monthly_return / avg_monthly_return
@@ -82,58 +79,24 @@ class HighestReturnsFinder:
         # Calculate highest average return score
         highest_avg_return_score = highest_monthly_return - cv
 
-        metrics = {
-            'symbol': symbol,
-            'avg_monthly_return': avg_monthly_return,
-            'highest_monthly_return': highest_monthly_return,
-            'lowest_monthly_return': lowest_monthly_return,
-            'cv': cv,
-            'annualized_return': annualized_return,
-            'std_dev_monthly_return': std_dev_monthly_return,
-            'highest_avg_return_score': highest_avg_return_score
-        }
-
-        return metrics
-
-    def find_candidates(self):
-        logi(f"Calculating metrics....")
-        metrics_df = pd.DataFrame()
-
-        # Load stock list
-        stock_list_df = self.stock_list_loader.fetch_list(
-            exchange_list=EXCHANGE_LIST,
-            min_market_cap=MIN_MARKET_CAP,
-            min_price=MIN_PRICE,
-            max_beta=MAX_BETA,
-            min_volume=MIN_VOLUME,
-            country=COUNTRY,
-            stock_list_limit=STOCK_LIST_LIMIT
-        )
-        symbol_list = stock_list_df['symbol'].unique()
-
-        # Fetch price history
-        start_date = datetime.today() - timedelta(days=DAILY_DATA_FETCH_PERIODS)
-        start_date_str = start_date.strftime("%Y-%m-%d")
-        end_date = datetime.today()
-        end_date_str = end_date.strftime("%Y-%m-%d")
-
-        prices_dict = self.fmp_data_loader.fetch_multiple_daily_prices_by_date(symbol_list, start_date_str, end_date_str,
-                                                                        cache_data=True, cache_dir=CACHE_DIR)
+        metrics_df = pd.DataFrame({
+            'symbol': price_matrix.columns,
+            'avg_monthly_return': avg_monthly_return.values,
+            'highest_monthly_return': highest_monthly_return.values,
+            'lowest_monthly_return': lowest_monthly_return.values,
+            'cv': cv.values,
+            'annualized_return': annualized_return.values,
+            'std_dev_monthly_return': std_dev_monthly_return.values,
+            'highest_avg_return_score': highest_avg_return_score.values
+        })
 
-        i = 1
-        for symbol in symbol_list:
-            # Get prices
-            if symbol not in prices_dict:
-                logw(f"No prices for {symbol}")
-                continue
-            prices_df = prices_dict[symbol]
-
-            # Calculate metrics
-            metrics = self.calculate_metrics(symbol, prices_df)
+        return metrics_df
 
-            row = pd.DataFrame(metrics, index=[0])
-            metrics_df = pd.concat([metrics_df, row], axis=0, ignore_index=True)
-            i += 1
+    def screen_monthly_returns(self, symbol_list, prices_dict):
+        missing_symbols = [symbol for symbol in symbol_list if symbol not in prices_dict]
+        if missing_symbols:
+            logw("No prices for {} symbols", len(missing_symbols))
+        metrics_df = self.calculate_metrics(prices_dict, symbol_list)
 
         # Apply filters
         metrics_df = metrics_df[metrics_df['lowest_monthly_return'] >= MIN_LOWEST_MONTHLY_RETURN]
@@ -144,47 +107,68 @@ class HighestReturnsFinder:
         metrics_df.sort_values(by=["highest_avg_return_score"], ascending=[False], inplace=True)
 
         # Keep the top 100
-        metrics_df = metrics_df.head(100)
-        symbol_list = metrics_df['symbol'].unique()
+        return metrics_df.head(100)
 
+    def screen_growth(self, symbol_list):
         # Load growth data
         growth_data_dict = self.growth_loader.fetch(symbol_list)
 
         # Check min earnings/revenue growth and growth acceleration
-        growth_df = self.growth_screener.run(growth_data_dict,
-                                             MIN_CURRENT_QUARTERLY_EARNINGS_GROWTH,
-                                             MIN_CURRENT_QUARTERLY_REVENUE_GROWTH)
-        if growth_df is None or len(growth_df) == 0:
-            logi("Growth screener returned no results")
-            return
-        logi(f"Growth screener returned {len(growth_df)} items.")
-
-        # Merge growth
-        merged_df = pd.merge(metrics_df, growth_df, on='symbol', how='inner')
-        symbol_list = merged_df['symbol'].unique()
+        return self.growth_screener.run(growth_data_dict,
+                                        MIN_CURRENT_QUARTERLY_EARNINGS_GROWTH,
+                                        MIN_CURRENT_QUARTERLY_REVENUE_GROWTH)
 
+    def screen_earnings_estimates(self, symbol_list):
         # Fetch future earnings estimates
         earnings_estimate_data_dict = self.fmp_data_loader.fetch_multiple_analyst_earnings_estimates(symbol_list,
                                                                                                      period="quarter",
                                                                                                      limit=100)
 
         # Screener for earnings estimates
-        earnings_estimates_df = self.earnings_estimate_screener.run(earnings_estimate_data_dict,
-                                                                    MIN_AVG_EARNINGS_ESTIMATE_PERCENT,
-                                                                    MIN_NUM_EARNINGS_ANALYSTS)
-        merged_df = pd.merge(merged_df, earnings_estimates_df, on='symbol', how='inner')
-        symbol_list = merged_df['symbol'].unique()
+        return self.earnings_estimate_screener.run(earnings_estimate_data_dict,
+                                                   MIN_AVG_EARNINGS_ESTIMATE_PERCENT,
+                                                   MIN_NUM_EARNINGS_ANALYSTS)
+
+    def find_candidates(self):
+        logi("Calculating metrics....")
+
+        # Load stock list
+        stock_list_df = self.stock_list_loader.fetch_list(
+            exchange_list=EXCHANGE_LIST,
+            min_market_cap=MIN_MARKET_CAP,
+            min_price=MIN_PRICE,
+            max_beta=MAX_BETA,
+            min_volume=MIN_VOLUME,
+            country=COUNTRY,
+            stock_list_limit=STOCK_LIST_LIMIT
+        )
+        symbol_list = stock_list_df['symbol'].unique()
 
-        # Get analyst ratings
-        analyst_ratings_df = self.fmp_analyst_ratings_loader.fetch(symbol_list)
-        merged_df = pd.merge(merged_df, analyst_ratings_df, on='symbol', how='inner')
+        # Fetch price history
+        start_date = datetime.today() - timedelta(days=DAILY_DATA_FETCH_PERIODS)
+        start_date_str = start_date.strftime("%Y-%m-%d")
+        end_date = datetime.today()
+        end_date_str = end_date.strftime("%Y-%m-%d")
 
-        # Determine news sentiment
-        news_sentiment_df = self.fmp_stock_news_loader.fetch(symbol_list, news_article_limit=30)
-        merged_df = pd.merge(merged_df, news_sentiment_df, on='symbol', how='inner')
+        prices_dict = self.fmp_data_loader.fetch_multiple_daily_prices_by_date(symbol_list, start_date_str, end_date_str,
+                                                                        cache_data=True, cache_dir=CACHE_DIR)
+        # One shared memory-mapped panel instead of a DataFrame per symbol
+        prices_dict = create_price_panel(prices_dict, "highest_returns", fields=['close'])
+
+        # Run the screeners as one pipeline, each stage only processes the survivors of the previous one
+        pipeline = ScreenerPipeline()
+        pipeline.add_stage("monthly_returns", lambda symbols: self.screen_monthly_returns(symbols, prices_dict),
+                           cost=0.0, selectivity=0.1)
+        pipeline.add_stage("growth", self.screen_growth, cost=1.0, selectivity=0.5)
+        pipeline.add_stage("earnings_estimates", self.screen_earnings_estimates, cost=1.0, selectivity=0.3)
+        pipeline.add_stage("analyst_ratings", self.fmp_analyst_ratings_loader.fetch, cost=1.0, selectivity=0.9)
+        pipeline.add_stage("news_sentiment",
+                           lambda symbols: self.fmp_stock_news_loader.fetch(symbols, news_article_limit=30),
+                           cost=5.0, selectivity=0.9)
+        merged_df = pipeline.run(symbol_list)
 
         if merged_df.empty:
-            logi(f"Candidates file is empty")
+            logi("Candidates file is empty")
             return
 
         # Normalize the different metrics before calculating the score
@@ -214,6 +198,6 @@ class HighestReturnsFinder:
         path = os.path.join(HIGHEST_RETURN_CANDIDATES_DIR, HIGHEST_RETURN_CANDIDATES_FILE_NAME)
         store_csv(HIGHEST_RETURN_CANDIDATES_DIR, HIGHEST_RETURN_CANDIDATES_FILE_NAME, merged_df)
 
-        logi(f"Highest avg monthly returns candidates saved to {path}")
+        logi("Highest avg monthly returns candidates saved to {}", path)
 
-        return metrics_df
+        return merged_df
@@ -65,7 +65,7 @@ class InstOwnCandidateFinder:
         stocks_to_keep = int(len(momentum_df) * 0.66)
         momentum_df = momentum_df.head(stocks_to_keep)
 
-        logi(f"Momentum screener returned {len(momentum_df)} items.")
+        logi("Momentum screener returned {} items.", len(momentum_df))
         symbol_list = momentum_df['symbol'].unique()
         """
         # Undervalued screener
@@ -92,7 +92,7 @@ class InstOwnCandidateFinder:
         if growth_df is None or len(growth_df) == 0:
             logi("Growth screener returned no results")
             return
-        logi(f"Growth screener returned {len(growth_df)} items.")
+        logi("Growth screener returned {} items.", len(growth_df))
 
         # Merge growth
         merged_df = pd.merge(inst_own_results_df, growth_df, on='symbol', how='inner')
@@ -118,4 +118,4 @@ class InstOwnCandidateFinder:
         path = os.path.join(INST_OWN_CANDIDATES_DIR, INST_OWN_CANDIDATES_FILE_NAME)
         merged_df.to_csv(path)
 
-        logi(f"Institutional ownership candidates saved to {path}")
+        logi("Institutional ownership candidates saved to {}", path)
@@ -288,12 +288,12 @@ class MarketLeaderStatsFetcher:
                 continue
 
             for symbol in market_leaders:
-                logd(f"Processing {symbol}...")
+                logd("Processing {}...", symbol)
 
                 # Fetch company outlook
                 outlook_dict = self.company_outlook_loader.load(symbol)
                 if outlook_dict is None:
-                    logw(f"No data for symbol {symbol}")
+                    logw("No data for symbol {}", symbol)
                     continue
 
                 # Initialize a dictionary for each symbol
@@ -10,6 +10,8 @@ from data_loaders.fmp_analyst_estimates_loader import FmpAnalystEstimatesLoader
 from utils.file_utils import *
 from utils.log_utils import *
 from utils.indicator_utils import *
+from utils.checkpoint_utils import RunJournal
+from utils.deadline_utils import get_run_deadline
 from config import *
 from datetime import datetime, timedelta
 
@@ -242,7 +244,124 @@ class MarketSegmentGrowthCandidateFinder:
         self.estimate_loader = FmpAnalystEstimatesLoader(fmp_api_key)
         self.inst_own_loader = FmpInstOwnDataLoader(fmp_api_key)
 
-    def find_candidates(self):
+    def load_symbol_stats(self, symbol: str, start_date_str: str, end_date_str: str):
+        """
+        Loads the KPIs of one symbol. Returns None if required data is missing.
+        """
+        # Initialize KPIs
+        stats = {
+            "price_to_sales": 0,
+            "price_to_earnings": 0,
+            "quick_ratio": 0,
+            "return_on_equity": 0,
+            "debt_to_equity": 0,
+            "free_cashflow_per_share": 0,
+            "operating_profit_margin": 0,
+            "current_ratio": 0,
+            "analyst_rating_score": 0,
+            "avg_price_target_change_percent": 0,
+            "price_target_coefficient_variation": 0,
+            "num_price_target_analysts": 0,
+            "avg_revenue_growth": 0,
+            "avg_net_income_growth": 0,
+            "investors_holding": 0,
+            "investors_put_call_ratio": 0
+        }
+
+        # Fetch financial ratios
+        financial_ratios_df = self.fmp_data_loader.get_financial_ratios(symbol, period="annual")
+        if financial_ratios_df is None or len(financial_ratios_df) == 0:
+            logi("No financial ratios available for {}", symbol)
+            return None
+
+        # Convert date to datetime format
+        financial_ratios_df['date'] = pd.to_datetime(financial_ratios_df['date'], errors='coerce')
+        # Sort to get latest dates
+        financial_ratios_df.sort_values(by=['date'], ascending=False, inplace=True)
+
+        # Get ratios
+        stats['price_to_sales'] = financial_ratios_df['priceToSalesRatio'].iloc[0]
+        stats['price_to_earnings'] = financial_ratios_df['priceEarningsRatio'].iloc[0]
+        stats['quick_ratio'] = financial_ratios_df['quickRatio'].iloc[0]
+        stats['return_on_equity'] = financial_ratios_df['returnOnEquity'].iloc[0]
+        stats['debt_to_equity'] = financial_ratios_df['debtEquityRatio'].iloc[0]
+        stats['free_cashflow_per_share'] = financial_ratios_df['freeCashFlowPerShare'].iloc[0]
+        stats['operating_profit_margin'] = financial_ratios_df['operatingProfitMargin'].iloc[0]
+        stats['current_ratio'] = financial_ratios_df['currentRatio'].iloc[0]
+
+        # Fetch analyst ratings
+        analyst_ratings_df = self.analyst_ratings_loader.fetch([symbol], num_lookback_days=60)
+        if analyst_ratings_df is not None and not analyst_ratings_df.empty:
+            stats['analyst_rating_score'] = analyst_ratings_df['analyst_rating_score'].iloc[0]
+
+        # Fetch revenue growth
+        growth_df = self.fmp_data_loader.get_income_growth(symbol, period="annual")
+        if growth_df is None or len(growth_df) == 0:
+            return None
+        growth_df.replace([np.inf, -np.inf], 0, inplace=True)
+
+        # Filter records for the last 3 years
+        growth_start_date = datetime.today() - timedelta(days=365 * 3)
+        growth_df['date'] = pd.to_datetime(growth_df['date'], errors='coerce')
+        growth_df = growth_df[growth_df['date'] > growth_start_date]
+        if len(growth_df) == 0:
+            return None
+
+        # Calculate stats
+        stats['avg_revenue_growth'] = growth_df['growthRevenue'].mean()
+        stats['avg_net_income_growth'] = growth_df['growthNetIncome'].mean()
+
+        # Load prices
+        prices_df = self.fmp_data_loader.fetch_daily_prices_by_date(
+            symbol, start_date_str, end_date_str, cache_data=True, cache_dir=CACHE_DIR)
+        if prices_df is None or prices_df.empty:
+            logi("No price data available for {}", symbol)
+            return None
+        prices_df.reset_index(inplace=True)
+
+        # Optional enrichment is skipped when the run deadline is near
+        deadline = get_run_deadline()
+        degraded_sections = []
+
+        # Fetch price targets
+        if deadline.allows("price_targets"):
+            prices_dict = {symbol: prices_df}
+            price_target_df = self.price_target_loader.load([symbol], prices_dict, lookback_days=90)
+            if price_target_df is not None and not price_target_df.empty:
+                stats['avg_price_target_change_percent'] = price_target_df['avg_price_target_change_percent'].iloc[0]
+                stats['price_target_coefficient_variation'] = price_target_df['price_target_coefficient_variation'].iloc[0]
+                stats['num_price_target_analysts'] = price_target_df['num_price_target_analysts'].iloc[0]
+        else:
+            degraded_sections.append("price_targets")
+
+        # Fetch analyst estimates
+        if deadline.allows("analyst_estimates"):
+            estimates_df, estimate_results = self.estimate_loader.load(symbol, "annual")
+            if estimate_results:
+                stats['avg_estimated_revenue_change_percent'] = estimate_results['avg_revenue_change_percent']
+                stats['estimated_revenue_change_coefficient_variation'] = estimate_results['revenue_change_coefficient_variation']
+                stats['avg_num_analysts_estimates'] = estimate_results['avg_num_analysts']
+        else:
+            degraded_sections.append("analyst_estimates")
+
+        # Fetch institutional ownership data if enabled
+        if USE_INSTITUTIONAL_OWNERSHIP_API and deadline.allows("institutional_ownership"):
+            inst_own_df = self.fmp_data_loader.fetch_institutional_ownership_changes(symbol,
+                                                                                     include_current_quarter=True)
+            if inst_own_df is not None and not inst_own_df.empty:
+                stats['investors_holding'] = inst_own_df['investorsHolding'].iloc[0]
+                stats['investors_total_invested'] = inst_own_df['totalInvested'].iloc[0]
+                stats['investors_put_call_ratio'] = inst_own_df['putCallRatio'].iloc[0]
+        elif USE_INSTITUTIONAL_OWNERSHIP_API:
+            degraded_sections.append("institutional_ownership")
+
+        # Flag the KPIs that are missing because of the deadline
+        if degraded_sections:
+            stats['degraded_sections'] = ", ".join(degraded_sections)
+
+        return stats
+
+    def find_candidates(self, run_id: str = None):
         logi("Finding market segment growth candidates...")
 
         # Set start and end dates
@@ -253,124 +372,45 @@ class MarketSegmentGrowthCandidateFinder:
 
         # Iterate through the growth market segments and gather data
         results = []
+        # Symbol -> KPIs, symbols listed in several segments are only loaded once. The KPIs are journaled so a
+        # restarted run only loads the missing symbols.
+        journal = RunJournal("market_segment_growth_finder", run_id)
+        symbol_stats_memo = journal.load()
 
         for market_segment in market_segment_info:
-            logi(f"Now processing market segment: {market_segment['name']}...")
+            logi("Now processing market segment: {}...", market_segment['name'])
 
             symbol_list = market_segment['symbol_list']
             # Iterate through the symbol list and fetch data
             for symbol in symbol_list:
-                logi(f"Now processing symbol {symbol}...")
+                if symbol not in symbol_stats_memo:
+                    logi("Now processing symbol {}...", symbol)
+                    symbol_stats_memo[symbol] = self.load_symbol_stats(symbol, start_date_str, end_date_str)
+                    # Degraded KPIs are not journaled, a restarted run loads them completely
+                    if symbol_stats_memo[symbol] is None or 'degraded_sections' not in symbol_stats_memo[symbol]:
+                        journal.append(symbol, symbol_stats_memo[symbol])
+                symbol_stats = symbol_stats_memo[symbol]
+                if symbol_stats is None:
+                    continue
 
                 # Look up company name
                 company_name = symbol_company_name_map.get(symbol, "")
 
-                # Initialize KPIs
                 stats = {
                     "symbol": symbol,
                     "company_name": company_name,
                     "market_segment": market_segment['name'],
                     "market_segment_cagr": market_segment['CAGR'],
                     "future_market_size": market_segment['future_market_size'],
-                    "price_to_sales": 0,
-                    "price_to_earnings": 0,
-                    "quick_ratio": 0,
-                    "return_on_equity": 0,
-                    "debt_to_equity": 0,
-                    "free_cashflow_per_share": 0,
-                    "operating_profit_margin": 0,
-                    "current_ratio": 0,
-                    "analyst_rating_score": 0,
-                    "avg_price_target_change_percent": 0,
-                    "price_target_coefficient_variation": 0,
-                    "num_price_target_analysts": 0,
-                    "avg_revenue_growth": 0,
-                    "avg_net_income_growth": 0,
-                    "investors_holding": 0,
-                    "investors_put_call_ratio": 0
+                    **symbol_stats
                 }
-
-                # Fetch financial ratios
-                financial_ratios_df = self.fmp_data_loader.get_financial_ratios(symbol, period="annual")
-                if financial_ratios_df is None or len(financial_ratios_df) == 0:
-                    logi(f"No financial ratios available for {symbol}")
-                    continue
-
-                # Convert date to datetime format
-                financial_ratios_df['date'] = pd.to_datetime(financial_ratios_df['date'], errors='coerce')
-                # Sort to get latest dates
-                financial_ratios_df.sort_values(by=['date'], ascending=False, inplace=True)
-
-                # Get ratios
-                stats['price_to_sales'] = financial_ratios_df['priceToSalesRatio'].iloc[0]
-                stats['price_to_earnings'] = financial_ratios_df['priceEarningsRatio'].iloc[0]
-                stats['quick_ratio'] = financial_ratios_df['quickRatio'].iloc[0]
-                stats['return_on_equity'] = financial_ratios_df['returnOnEquity'].iloc[0]
-                stats['debt_to_equity'] = financial_ratios_df['debtEquityRatio'].iloc[0]
-                stats['free_cashflow_per_share'] = financial_ratios_df['freeCashFlowPerShare'].iloc[0]
-                stats['operating_profit_margin'] = financial_ratios_df['operatingProfitMargin'].iloc[0]
-                stats['current_ratio'] = financial_ratios_df['currentRatio'].iloc[0]
-
-                # Fetch analyst ratings
-                analyst_ratings_df = self.analyst_ratings_loader.fetch([symbol], num_lookback_days=60)
-                if analyst_ratings_df is not None and not analyst_ratings_df.empty:
-                    stats['analyst_rating_score'] = analyst_ratings_df['analyst_rating_score'].iloc[0]
-
-                # Fetch revenue growth
-                growth_df = self.fmp_data_loader.get_income_growth(symbol, period="annual")
-                if growth_df is None or len(growth_df) == 0:
-                    continue
-                growth_df.replace([np.inf, -np.inf], 0, inplace=True)
-
-                # Filter records for the last 3 years
-                growth_start_date = datetime.today() - timedelta(days=365 * 3)
-                growth_df['date'] = pd.to_datetime(growth_df['date'], errors='coerce')
-                growth_df = growth_df[growth_df['date'] > growth_start_date]
-                if len(growth_df) == 0:
-                    continue
-
-                # Calculate stats
-                stats['avg_revenue_growth'] = growth_df['growthRevenue'].mean()
-                stats['avg_net_income_growth'] = growth_df['growthNetIncome'].mean()
-
-                # Load prices
-                prices_df = self.fmp_data_loader.fetch_daily_prices_by_date(
-                    symbol, start_date_str, end_date_str, cache_data=True, cache_dir=CACHE_DIR)
-                if prices_df is None or prices_df.empty:
-                    logi(f"No price data available for {symbol}")
-                    continue
-                prices_df.reset_index(inplace=True)
-
-                # Fetch price targets
-                prices_dict = {symbol: prices_df}
-                price_target_df = self.price_target_loader.load([symbol], prices_dict, lookback_days=90)
-                if price_target_df is not None and not price_target_df.empty:
-                    stats['avg_price_target_change_percent'] = price_target_df['avg_price_target_change_percent'].iloc[0]
-                    stats['price_target_coefficient_variation'] = price_target_df['price_target_coefficient_variation'].iloc[0]
-                    stats['num_price_target_analysts'] = price_target_df['num_price_target_analysts'].iloc[0]
-
-                # Fetch analyst estimates
-                estimates_df, estimate_results = self.estimate_loader.load(symbol, "annual")
-                if estimate_results:
-                    stats['avg_estimated_revenue_change_percent'] = estimate_results['avg_revenue_change_percent']
-                    stats['estimated_revenue_change_coefficient_variation'] = estimate_results['revenue_change_coefficient_variation']
-                    stats['avg_num_analysts_estimates'] = estimate_results['avg_num_analysts']
-
-                # Fetch institutional ownership data if enabled
-                if USE_INSTITUTIONAL_OWNERSHIP_API:
-                    inst_own_df = self.fmp_data_loader.fetch_institutional_ownership_changes(symbol,
-                                                                                             include_current_quarter=True)
-                    if inst_own_df is not None and not inst_own_df.empty:
-                        stats['investors_holding'] = inst_own_df['investorsHolding'].iloc[0]
-                        stats['investors_total_invested'] = inst_own_df['totalInvested'].iloc[0]
-                        stats['investors_put_call_ratio'] = inst_own_df['putCallRatio'].iloc[0]
-
                 results.append(stats)
 
         # Convert stats to dataframe
         results_df = pd.DataFrame(results)
         if len(results_df) == 0:
             logi("No results found")
+            journal.complete()
             return
 
         # List of KPIs to be used in the weighted score
@@ -447,6 +487,7 @@ class MarketSegmentGrowthCandidateFinder:
         os.makedirs(CANDIDATES_DIR, exist_ok=True)
         file_name = f"growth_market_sector_candidates_{datetime.today().strftime('%Y-%m-%d')}.csv"
         store_csv(CANDIDATES_DIR, file_name, candidates_df)
+        journal.complete()
 
         logi("Done with growth market sector candidate analysis.")
 
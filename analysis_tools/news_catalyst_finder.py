@@ -7,9 +7,11 @@ from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
 from botrading.data_loaders.tiingo_data_loader import TiingoDataLoader
 from analysis_tools.news_sentiment_detector import NewsSentimentDetector
+from analysis_tools.catalyst_tagger import CatalystTagger
 from utils.log_utils import *
 from utils.file_utils import *
 from botrading.utils.string_utils import create_md5_hash
+from utils.dedup_utils import collapse_duplicates
 from datetime import timedelta, time
 
 
@@ -30,8 +32,24 @@ layoff_tags = "layoffs,layoff,workforce reduction,job cuts,restructuring,downsiz
 fundraising_tags = "raise capital,fundraising,venture capital,equity financing,funding secured,"
 consumer_behavior_tags = "consumer demand surge,surge in consumer demand,retail growth,e-commerce growth,popular among"
 
-tag_list = [earnings_tags, market_expansion_tags, product_launch_tags, legal_issues_tags, analyst_rating_tags, merger_tags,
-            dividend_buyback_tags, layoff_tags, fundraising_tags, consumer_behavior_tags]
+catalyst_tags = {
+    'earnings': earnings_tags,
+    'market_expansion': market_expansion_tags,
+    'product_launch': product_launch_tags,
+    'legal_issues': legal_issues_tags,
+    'analyst_rating': analyst_rating_tags,
+    'merger': merger_tags,
+    'dividend_buyback': dividend_buyback_tags,
+    'layoff': layoff_tags,
+    'fundraising': fundraising_tags,
+    'consumer_behavior': consumer_behavior_tags,
+}
+tag_list = list(catalyst_tags.values())
+
+# One query for all tag groups, the articles are classified locally. The query returns at most
+# CATALYST_NEWS_LIMIT articles in total, groups left with fewer than CATALYST_NEWS_PER_GROUP get their own query.
+CATALYST_NEWS_PER_GROUP = 50
+CATALYST_NEWS_LIMIT = CATALYST_NEWS_PER_GROUP * len(tag_list)
 
 
 RESULTS_DIR = "C:\\dev\\trading\\data\\news_catalysts"
@@ -43,6 +61,7 @@ class NewsCatalystFinder:
         self.news_sentiment_detector = NewsSentimentDetector()
         self.stop_words = set(stopwords.words('english'))
         self.lemmatizer = WordNetLemmatizer()
+        self.catalyst_tagger = CatalystTagger(catalyst_tags, self.lemmatizer.lemmatize)
 
     # Preprocess function: clean, tokenize, remove stop words, and lemmatize
     def preprocess_text(self, text):
@@ -54,7 +73,7 @@ class NewsCatalystFinder:
         tokens = gensim.utils.simple_preprocess(text, deacc=True)  # Tokenizes and removes punctuations
 
         # Remove stop words and lemmatize
-        tokens = [self.lemmatizer.lemmatize(token) for token in tokens if token not in self.stop_words]
+        tokens = [self.catalyst_tagger.lemmatize(token) for token in tokens if token not in self.stop_words]
 
         return tokens
 
@@ -75,16 +94,37 @@ class NewsCatalystFinder:
 
         return news_df
 
-    def find_catalysts(self):
-        # Fetch news by tags
-        combined_news_df = pd.DataFrame()
-        for tags in tag_list:
-            logd(f"Fetching news for tags: {tags}...")
-            # Fetch news articles
-            news_df = self.fetch_news_articles(tags, limit=50)
-            if news_df is None or len(news_df) == 0:
+    def fetch_catalyst_news(self):
+        """
+        Fetches the news of all tag groups with one query. When the query hit its limit, the busiest groups may
+        have crowded out the others, so groups with fewer than CATALYST_NEWS_PER_GROUP articles are fetched again
+        on their own.
+        """
+        all_tags = ",".join(tag.strip() for tags in tag_list for tag in tags.split(",") if tag.strip())
+        logd("Fetching news for {} tag groups...", len(tag_list))
+        news_df = self.fetch_news_articles(all_tags, limit=CATALYST_NEWS_LIMIT)
+        if news_df is None or len(news_df) < CATALYST_NEWS_LIMIT:
+            return news_df
+
+        tagged_df = self.catalyst_tagger.tag_articles(news_df.copy(), ['title', 'description'])
+        category_counts = tagged_df['catalysts'].str.split(",").explode().value_counts()
+        group_dfs = [news_df]
+        for category, tags in catalyst_tags.items():
+            if category_counts.get(category, 0) >= CATALYST_NEWS_PER_GROUP:
                 continue
+            logd("Fetching news for {}, {} articles in the combined query", category, category_counts.get(category, 0))
+            group_tags = ",".join(tag.strip() for tag in tags.split(",") if tag.strip())
+            group_df = self.fetch_news_articles(group_tags, limit=CATALYST_NEWS_PER_GROUP)
+            if group_df is not None and len(group_df) > 0:
+                group_dfs.append(group_df)
+        return pd.concat(group_dfs, ignore_index=True).drop_duplicates(subset='url')
 
+    def find_catalysts(self):
+        news_df = self.fetch_catalyst_news()
+        if news_df is None or len(news_df) == 0:
+            logw("No news articles found")
+            news_df = pd.DataFrame()
+        else:
             # Detect news sentiment
             #news_df = self.news_sentiment_detector.detect_news_sentiment(news_df)
 
@@ -107,9 +147,14 @@ class NewsCatalystFinder:
             news_sentiment_threshold = 0.6
             #news_df = news_df[(news_df['news_sentiment'] > news_sentiment_threshold) | (news_df['news_sentiment'] < -news_sentiment_threshold)]
 
-            # Combine all news
-            combined_news_df = pd.concat([combined_news_df, news_df], axis=0, ignore_index=True)
+        if len(news_df) > 0:
+            # Sources repeat the same stories, keep one row per story
+            news_df = collapse_duplicates(news_df, ['title', 'description'])
+
+            # Label the catalyst categories of every article
+            news_df = self.catalyst_tagger.tag_articles(news_df, ['title', 'description'])
+
         # Store news analysis
-        store_csv(RESULTS_DIR, "combined_news_tags.csv", combined_news_df)
+        store_csv(RESULTS_DIR, "combined_news_tags.csv", news_df)
 
         logi("News catalyst finder completed.")
@@ -4,6 +4,7 @@ from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import torch
 import json
 from utils.file_utils import *
+from utils.dedup_utils import assign_duplicate_clusters
 device = "cuda:0" if torch.cuda.is_available() else "cpu"
 
 FINBERT_MAX_TOKENS = 512
@@ -74,8 +75,12 @@ class NewsSentimentDetector:
             print(f"No English news articles found")
             return news_df
 
-        # Detect news sentiment using FinBERT
-        news_df['news_sentiment'] = news_df.apply(self.detect_sentiment_for_article, axis=1)
+        # Detect news sentiment using FinBERT, once per story for syndicated copies
+        news_df = assign_duplicate_clusters(news_df, ['title', 'description'])
+        first_rows = news_df.drop_duplicates(subset='cluster_id')
+        cluster_sentiments = dict(zip(first_rows['cluster_id'],
+                                      first_rows.apply(self.detect_sentiment_for_article, axis=1)))
+        news_df['news_sentiment'] = news_df['cluster_id'].map(cluster_sentiments)
 
         return news_df
 
@@ -3,6 +3,8 @@ import pandas as pd
 from datetime import datetime
 from utils.log_utils import *
 from utils.report_utils import *
+from utils.checkpoint_utils import RunJournal
+from utils.deadline_utils import get_run_deadline
 from botrading.data_loaders.fmp_data_loader import FmpDataLoader
 from data_loaders.fmp_analyst_ratings_loader import FmpAnalystRatingsLoader
 from data_loaders.fmp_price_target_loader import FmpPriceTargetLoader
@@ -10,10 +12,22 @@ from data_loaders.fmp_inst_own_data_loader import FmpInstOwnDataLoader
 from data_loaders.fmp_analyst_estimates_loader import FmpAnalystEstimatesLoader
 from data_loaders.fmp_company_outlook_loader import FmpCompanyOutlookLoader
 from report_generators.excel_screener_report_generator import ExcelScreenerReportGenerator
+from screeners.pre_filter_screener import PreFilterScreener
 import os
 
 USE_INSTITUTIONAL_OWNERSHIP_API = True
 CANDIDATES_DIR = "C:\\dev\\trading\\data\\penny_stocks"
+# Cheap pre-filter gates applied before any per-symbol API call, None disables a gate
+PRE_FILTER_MIN_VOLUME = MIN_VOLUME
+PRE_FILTER_MIN_MOMENTUM = None
+PRE_FILTER_MIN_PRICE_DROP_PERCENT = None
+# Report columns, the remaining outlook fields are dropped per symbol
+PROFILE_COLUMN_LIST = ['symbol', 'company_name', 'description', 'website',
+                       'mktCap', 'industry', 'sector', 'price', 'volAvg', 'beta']
+RATIOS_COLUMN_LIST = ['symbol', 'priceToSalesRatioTTM', 'priceEarningsRatioTTM', 'grossProfitMarginTTM',
+                      'operatingProfitMarginTTM', 'netProfitMarginTTM', 'inventoryTurnoverTTM',
+                      'receivablesTurnoverTTM', 'currentRatioTTM', 'quickRatioTTM',
+                      'debtEquityRatioTTM', 'interestCoverageTTM']
 
 """
 Focus on penny stocks with low price < $5, positive revenue trend, long cash runway
@@ -126,8 +140,9 @@ class PennyStockFinder:
         self.estimate_loader = FmpAnalystEstimatesLoader(fmp_api_key)
         self.company_outlook_loader = FmpCompanyOutlookLoader(fmp_api_key)
         self.report_generator = ExcelScreenerReportGenerator()
+        self.pre_filter_screener = PreFilterScreener(fmp_api_key)
 
-    def find_candidates(self):
+    def find_candidates(self, run_id: str = None):
         logi("Finding penny stock candidates...")
 
         # Load stock screener results
@@ -147,10 +162,64 @@ class PennyStockFinder:
             logw("No stocks returned from FMP")
             return
 
+        # Apply cheap filters before fetching per-symbol data
+        stock_list_df = self.pre_filter_screener.run(stock_list_df,
+                                                     min_volume=PRE_FILTER_MIN_VOLUME,
+                                                     min_momentum=PRE_FILTER_MIN_MOMENTUM,
+                                                     min_price_drop_percent=PRE_FILTER_MIN_PRICE_DROP_PERCENT)
+        if stock_list_df.empty:
+            logw("No stocks left after pre-filter")
+            return
+
         # Sample a few symbols for demonstration
         symbol_list = stock_list_df['symbol'].unique()
         #symbol_list = symbol_list[:5]
 
+        # Per-symbol rows are journaled, a restarted run only processes the missing symbols
+        journal = RunJournal("penny_stock_finder", run_id)
+        records = journal.load()
+        remaining_symbol_list = [symbol for symbol in symbol_list if symbol not in records]
+
+        deadline = get_run_deadline()
+        num_without_financials = 0
+
+        # Outlook features are streamed, each raw payload is released once its stats are extracted
+        for symbol, outlook_dict in self.company_outlook_loader.iter_features(remaining_symbol_list):
+            if outlook_dict.get('has_financials', True):
+                # Optional enrichment is skipped when the run deadline is near
+                load_price_target = deadline.allows("price_targets")
+                load_inst_own = USE_INSTITUTIONAL_OWNERSHIP_API and deadline.allows("institutional_ownership")
+                is_degraded = not load_price_target or (USE_INSTITUTIONAL_OWNERSHIP_API and not load_inst_own)
+            else:
+                # Symbols without financials can't score well enough to need price targets or ownership data
+                load_price_target, load_inst_own, is_degraded = False, False, False
+                num_without_financials += 1
+
+            ratios = outlook_dict.get('ratios', {})
+            ratios['symbol'] = symbol
+            record = {
+                'profile': reduce_row(outlook_dict.get('profile', {}), PROFILE_COLUMN_LIST),
+                'ratios': reduce_row(ratios, RATIOS_COLUMN_LIST),
+                'news': outlook_dict.get('news_headlines', []),
+                'quarterly_income_stats': outlook_dict.get('quarterly_income_stats', {}),
+                'annual_income_stats': outlook_dict.get('annual_income_stats', {}),
+                'quarterly_balance_sheet_stats': outlook_dict.get('quarterly_balance_sheet_stats', {}),
+                'annual_balance_sheet_stats': outlook_dict.get('annual_balance_sheet_stats', {}),
+                'quarterly_cashflow_stats': outlook_dict.get('quarterly_cashflow_stats', {}),
+                'annual_cashflow_stats': outlook_dict.get('annual_cashflow_stats', {}),
+                # Fetch price targets
+                'price_target': self.price_target_loader.load(symbol) if load_price_target else {},
+                # Fetch institutional ownership data
+                'inst_own': self.inst_own_loader.load_for_symbol(symbol) if load_inst_own else {}
+            }
+            # Degraded rows are not journaled, a restarted run loads them completely
+            if not is_degraded:
+                journal.append(symbol, record)
+            records[symbol] = record
+        if num_without_financials > 0:
+            logi("Skipped price targets and institutional ownership of {} symbols without financials",
+                 num_without_financials)
+
         # Lists to store stats
         profile_list, ratios_list, news_list = [], [], []
         quarterly_income_stats_list, annual_income_stats_list = [], []
@@ -158,56 +227,33 @@ class PennyStockFinder:
         quarterly_cashflow_stats_list, annual_cashflow_stats_list = [], []
         price_target_list, inst_own_data_list = [], []
 
+        # Populate outlook results
         for symbol in symbol_list:
-            # skip stocks from other countries
-            if "." in symbol:
+            record = records.get(symbol)
+            if record is None:
                 continue
-
-            logd(f"Processing {symbol}...")
-
-            # Fetch company outlook
-            outlook_dict = self.company_outlook_loader.load(symbol)
-            if outlook_dict is None:
-                logw(f"No data for symbol {symbol}")
-                continue
-
-            # Populate outlook results
-            profile_list.append(outlook_dict.get('profile', {}))
-            ratios = outlook_dict.get('ratios', {})
-            ratios['symbol'] = symbol
-            ratios_list.append(outlook_dict.get('ratios', {}))
-            news_list.append(outlook_dict.get('news_headlines', []))
-            quarterly_income_stats_list.append(outlook_dict.get('quarterly_income_stats', {}))
-            annual_income_stats_list.append(outlook_dict.get('annual_income_stats', {}))
-            quarterly_balance_sheet_stats_list.append(outlook_dict.get('quarterly_balance_sheet_stats', {}))
-            annual_balance_sheet_stats_list.append(outlook_dict.get('annual_balance_sheet_stats', {}))
-            quarterly_cashflow_stats_list.append(outlook_dict.get('quarterly_cashflow_stats', {}))
-            annual_cashflow_stats_list.append(outlook_dict.get('annual_cashflow_stats', {}))
-
-            # Fetch price targets
-            price_target_dict = self.price_target_loader.load(symbol)
-            if price_target_dict:
-                price_target_list.append(price_target_dict)
-
-            # Fetch institutional ownership data
-            if USE_INSTITUTIONAL_OWNERSHIP_API:
-                inst_own_data = self.inst_own_loader.load_for_symbol(symbol)
-                if inst_own_data and len(inst_own_data) > 0:
-                    inst_own_data_list.append(inst_own_data)
+            profile_list.append(record['profile'])
+            ratios_list.append(record['ratios'])
+            news_list.append(record['news'])
+            quarterly_income_stats_list.append(record['quarterly_income_stats'])
+            annual_income_stats_list.append(record['annual_income_stats'])
+            quarterly_balance_sheet_stats_list.append(record['quarterly_balance_sheet_stats'])
+            annual_balance_sheet_stats_list.append(record['annual_balance_sheet_stats'])
+            quarterly_cashflow_stats_list.append(record['quarterly_cashflow_stats'])
+            annual_cashflow_stats_list.append(record['annual_cashflow_stats'])
+            if record['price_target']:
+                price_target_list.append(record['price_target'])
+            if record['inst_own']:
+                inst_own_data_list.append(record['inst_own'])
+        del records
 
         # Convert lists to DataFrames
-        profile_column_list = ['symbol', 'company_name', 'description', 'website',
-                               'mktCap', 'industry', 'sector', 'price', 'volAvg', 'beta']
-        profile_df = pd.DataFrame(profile_list, columns=profile_column_list)
+        profile_df = pd.DataFrame(profile_list, columns=PROFILE_COLUMN_LIST)
 
         news_column_list = ['symbol', 'news_headlines', 'urls']
         news_df = pd.DataFrame(news_list, columns=news_column_list)
 
-        ratios_column_list = ['symbol', 'priceToSalesRatioTTM', 'priceEarningsRatioTTM', 'grossProfitMarginTTM',
-                              'operatingProfitMarginTTM', 'netProfitMarginTTM', 'inventoryTurnoverTTM',
-                              'receivablesTurnoverTTM', 'currentRatioTTM', 'quickRatioTTM',
-                              'debtEquityRatioTTM', 'interestCoverageTTM']
-        ratios_df = pd.DataFrame(ratios_list, columns=ratios_column_list)
+        ratios_df = pd.DataFrame(ratios_list, columns=RATIOS_COLUMN_LIST)
 
         income_column_list = ['symbol', 'last_revenue', 'revenue_change', 'last_net_income', 'last_cost_expenses',
                               'revenue_trend', 'net_income_trend', 'cost_expenses_trend']
@@ -285,8 +331,13 @@ class PennyStockFinder:
         if USE_INSTITUTIONAL_OWNERSHIP_API:
             report_data['inst_own_data'] = inst_own_df
 
+        # Flag the sections that were skipped to meet the run deadline
+        if deadline.is_degraded():
+            report_data['degraded_sections_data'] = deadline.get_degraded_df()
+
         # Generate report
         file_name = f"penny_stock_candidates_{datetime.today().strftime('%Y-%m-%d')}.xlsx"
         self.report_generator.generate_report(report_data, CANDIDATES_DIR, file_name)
+        journal.complete()
 
         logi("Done with penny stock analysis.")
@@ -1,4 +1,5 @@
-from data_loaders.market_symbol_loader import MarketSymbolLoader
+from data_loaders.market_symbol_loader import MarketIndex
+from data_loaders.market_universe_loader import MarketUniverseLoader
 from botrading.data_loaders.fmp_data_loader import FmpDataLoader
 from data_loaders.fmp_analyst_ratings_loader import FmpAnalystRatingsLoader
 from data_loaders.fmp_earnings_estimate_loader import FmpEarningsEstimateLoader
@@ -19,7 +20,7 @@ CANDIDATES_FILE_NAME = "price_target_candidates.csv"
 
 class PriceTargetCandidateFinder:
     def __init__(self, fmp_api_key):
-        self.symbol_loader = MarketSymbolLoader()
+        self.universe_loader = MarketUniverseLoader()
         self.fmp_data_loader = FmpDataLoader(fmp_api_key)
         self.fmp_analyst_ratings_loader = FmpAnalystRatingsLoader(fmp_api_key)
         self.fmp_earnings_estimate_loader = FmpEarningsEstimateLoader(fmp_api_key)
@@ -28,8 +29,7 @@ class PriceTargetCandidateFinder:
 
     def find_candidates(self):
         # Fetch market symbols
-        symbols_df = self.symbol_loader.fetch_russell1000_symbols(cache_file=True)
-        symbol_list = symbols_df['symbol'].unique()
+        symbol_list = self.universe_loader.get_symbol_list(MarketIndex.RUSSELL_1000)
 
         # Fetch daily prices
         start_date = datetime.today() - timedelta(days=400)
@@ -45,7 +45,7 @@ class PriceTargetCandidateFinder:
         # Add 52-week low
         fifty_two_week_low_df = self.fifty_two_week_low_loader.load(symbol_list, prices_dict, min_price_drop_percent=0.2)
         if fifty_two_week_low_df.empty:
-            logi(f"Fifty-week-low screener didn't return any data.")
+            logi("Fifty-week-low screener didn't return any data.")
             exit(0)
         symbol_list = fifty_two_week_low_df['symbol'].unique()
 
@@ -127,6 +127,6 @@ class PriceTargetCandidateFinder:
         os.makedirs(CANDIDATES_DIR, exist_ok=True)
         path = os.path.join(CANDIDATES_DIR, CANDIDATES_FILE_NAME)
         final_df.to_csv(path, index=False)
-        logi(f"Price target results saved to {path}")
+        logi("Price target results saved to {}", path)
 
         return final_df
@@ -70,7 +70,7 @@ class ProfileBuilder:
         if growth_df is None or len(growth_df) == 0:
             logi("Growth screener returned no results")
             return
-        logi(f"Growth screener returned {len(growth_df)} items.")
+        logi("Growth screener returned {} items.", len(growth_df))
 
         # Merge growth
         #merged_df = pd.merge(undervalued_df, growth_df, on='symbol', how='inner')
@@ -97,7 +97,7 @@ class ProfileBuilder:
         #merged_df = pd.merge(merged_df, news_sentiment_df, on='symbol', how='inner')
 
         if merged_df.empty:
-            logi(f"Candidates file is empty")
+            logi("Candidates file is empty")
             return
 
         # Normalize the different metrics before calculating the score
@@ -127,4 +127,4 @@ class ProfileBuilder:
         path = os.path.join(CANDIDATES_DIR, CANDIDATES_FILE_NAME)
         merged_df.to_csv(path, index=False)
 
-        logi(f"Profile candidates saved to {path}")
+        logi("Profile candidates saved to {}", path)
@@ -2,11 +2,14 @@ import numpy as np
 import pandas as pd
 import os
 from botrading.data_loaders.tiingo_data_loader import TiingoDataLoader, TiingoDailyInterval
-from data_loaders.market_symbol_loader import MarketSymbolLoader
+from data_loaders.market_symbol_loader import MarketIndex
+from data_loaders.market_universe_loader import MarketUniverseLoader
 from utils.plot_utils import plot_pullback_chart
 from utils.file_utils import delete_files_in_directory
 from utils.log_utils import *
+from utils.instrumentation_utils import instrument
 from utils.indicator_utils import *
+from utils.price_panel import create_price_panel, map_symbols
 from config import *
 from datetime import datetime, timedelta
 
@@ -16,11 +19,27 @@ PULLBACK_PLOTS_DIR = "C:\\dev\\trading\\data\\trend_pullbacks\\plots"
 
 
 
+def detect_pullbacks(symbol: str, prices_df: pd.DataFrame):
+    """
+    Calculates indicators and pullback signals of one symbol. Runs in the worker processes.
+    """
+    if prices_df is None or len(prices_df) < 200:
+        return None
+    prices_df = prices_df.reset_index()
+    prices_df = TrendPullbackFinder.calculate_indicators(prices_df)
+    prices_df = TrendPullbackFinder.find_uptrend_pullbacks(prices_df)
+    prices_df = TrendPullbackFinder.find_downtrend_pullbacks(prices_df)
+    return prices_df
+
+
 class TrendPullbackFinder:
     def __init__(self, tiingo_api_key: str):
         self.data_loader = TiingoDataLoader(tiingo_api_key)
+        self.universe_loader = MarketUniverseLoader()
 
-    def calculate_indicators(self, df: pd.DataFrame):
+    @staticmethod
+    @instrument()
+    def calculate_indicators(df: pd.DataFrame):
         long_ema_window = 10
         short_ema_window = 3
 
@@ -34,7 +53,8 @@ class TrendPullbackFinder:
 
         return df
 
-    def find_uptrend_pullbacks(self, df):
+    @staticmethod
+    def find_uptrend_pullbacks(df):
         # Define conditions for a strong uptrend
         adx_lookback = 5
         strong_uptrend = (df['trend_slope'] > 0.1) & (df['adx'].shift(adx_lookback) > 25)
@@ -45,7 +65,8 @@ class TrendPullbackFinder:
 
         return df
 
-    def find_downtrend_pullbacks(self, df):
+    @staticmethod
+    def find_downtrend_pullbacks(df):
         # Define conditions for a strong downtrend
         adx_lookback = 5
         strong_downtrend = (df['trend_slope'] < -0.1) & (df['adx'].shift(adx_lookback) > 25)
@@ -61,9 +82,7 @@ class TrendPullbackFinder:
         delete_files_in_directory(PULLBACK_PLOTS_DIR)
 
         # Load symbols
-        symbol_loader = MarketSymbolLoader()
-        symbol_list_df = symbol_loader.fetch_sp500_symbols(cache_file=True, cache_dir="cache")
-        symbol_list = symbol_list_df['symbol'].unique()
+        symbol_list = self.universe_loader.get_symbol_list(MarketIndex.SNP_500)
 
         # Set start and end dates
         start_date = datetime.today() - timedelta(days=400)
@@ -77,24 +96,22 @@ class TrendPullbackFinder:
                                                                         interval=TiingoDailyInterval.DAILY,
                                                                         cache_data=True, cache_dir=CACHE_DIR)
 
+        # Share the prices with the worker processes through a memory-mapped panel
+        price_panel = create_price_panel(prices_dict, "trend_pullbacks")
+        del prices_dict
+
+        # Calculate indicators and detect pullbacks in parallel
+        pullbacks_dict = map_symbols(detect_pullbacks, price_panel, symbol_list)
+
         for symbol in symbol_list:
-            print(f"Processing {symbol}")
-            if symbol not in prices_dict:
+            if symbol not in price_panel:
                 print(f"symbol {symbol} not found in prices_dict")
                 continue
 
-            prices_df = prices_dict[symbol]
-            if prices_df is None or len(prices_df) < 200:
-                logi(f"No price data fetched for symbol {symbol}.")
+            prices_df = pullbacks_dict.get(symbol)
+            if prices_df is None:
+                logi("No price data fetched for symbol {}.", symbol)
                 continue
-            prices_df.reset_index(inplace=True)
-
-            # Calculate indicators
-            prices_df = self.calculate_indicators(prices_df)
-
-            # Detect pullbacks
-            prices_df = self.find_uptrend_pullbacks(prices_df)
-            prices_df = self.find_downtrend_pullbacks(prices_df)
 
             # Check if any of the last signals are active before plotting
             has_long_signal = prices_df['long_signal'].iloc[-1] == 1 or prices_df['long_signal'].iloc[-2] == 1
@@ -40,12 +40,14 @@ class UltimateCandidateFinder:
         )
         symbol_list = stock_list_df['symbol'].unique()
 
-        # Load price info
+        # Stream prices into momentum rows, each price history is released right after its momentum is calculated
         price_loader = FmpPriceLoader(self.fmp_api_key)
-        prices_dict = price_loader.fetch(symbol_list)
+        momentum_loader = FmpMomentumLoader(self.fmp_api_key)
+        all_momentum_df = pd.DataFrame(momentum_loader.iter_momentum(price_loader.iter_prices(symbol_list)),
+                                       columns=['symbol', 'momentum_factor'])
 
         # Get all symbols that have prices
-        symbol_list = list(prices_dict.keys())
+        symbol_list = all_momentum_df['symbol'].tolist()
 
         # Load Quality factor
         #quality_loader = FmpQualityLoader(FMP_API_KEY)
@@ -63,9 +65,9 @@ class UltimateCandidateFinder:
         growth_df = growth_df[growth_df['growth_factor'] >= MIN_GROWTH_FACTOR]
         symbol_list = growth_df['symbol'].unique()
 
-        # Load Momentum factor
-        momentum_loader = FmpMomentumLoader(self.fmp_api_key)
-        momentum_df = momentum_loader.fetch(symbol_list, prices_dict)
+        # Cap momentum factor among the remaining symbols
+        momentum_df = all_momentum_df[all_momentum_df['symbol'].isin(symbol_list)].reset_index(drop=True)
+        momentum_df = cap_outliers(momentum_df, 'momentum_factor')
 
         # Filter out stocks based on min score
         momentum_df = momentum_df[momentum_df['momentum_factor'] >= MIN_MOMENTUM_FACTOR]
@@ -108,4 +110,4 @@ class UltimateCandidateFinder:
         path = os.path.join(RESULTS_DIR, file_name)
         ultimate_score_df.to_csv(path)
 
-        logi(f"Ultimate screener candidates saved to {path}")
+        logi("Ultimate screener candidates saved to {}", path)
@@ -10,10 +10,22 @@ from data_loaders.fmp_inst_own_data_loader import FmpInstOwnDataLoader
 from data_loaders.fmp_analyst_estimates_loader import FmpAnalystEstimatesLoader
 from data_loaders.fmp_company_outlook_loader import FmpCompanyOutlookLoader
 from report_generators.excel_screener_report_generator import ExcelScreenerReportGenerator
+from screeners.pre_filter_screener import PreFilterScreener
 import os
 
 USE_INSTITUTIONAL_OWNERSHIP_API = True
 CANDIDATES_DIR = "C:\\dev\\trading\\data\\value_stocks"
+# Cheap pre-filter gates applied before any per-symbol API call, None disables a gate
+PRE_FILTER_MIN_VOLUME = MIN_VOLUME
+PRE_FILTER_MIN_MOMENTUM = None
+PRE_FILTER_MIN_PRICE_DROP_PERCENT = MIN_PRICE_DROP_PERCENT  # Value stocks trade below their 52-week high
+# Report columns, the remaining outlook fields are dropped per symbol
+PROFILE_COLUMN_LIST = ['symbol', 'company_name', 'description', 'website',
+                       'mktCap', 'industry', 'sector', 'price', 'volAvg', 'beta']
+RATIOS_COLUMN_LIST = ['symbol', 'priceToSalesRatioTTM', 'priceEarningsRatioTTM', 'grossProfitMarginTTM',
+                      'operatingProfitMarginTTM', 'netProfitMarginTTM', 'inventoryTurnoverTTM',
+                      'receivablesTurnoverTTM', 'currentRatioTTM', 'quickRatioTTM',
+                      'debtEquityRatioTTM', 'interestCoverageTTM']
 
 """
 Focus on value mid/large cap stocks with low P/E, low P/S, strong revenue growth and high price target
@@ -103,6 +115,7 @@ class ValueStockCandidateFinder:
         self.estimate_loader = FmpAnalystEstimatesLoader(fmp_api_key)
         self.company_outlook_loader = FmpCompanyOutlookLoader(fmp_api_key)
         self.report_generator = ExcelScreenerReportGenerator()
+        self.pre_filter_screener = PreFilterScreener(fmp_api_key)
 
     def find_candidates(self):
         logi("Finding value stock candidates...")
@@ -123,6 +136,15 @@ class ValueStockCandidateFinder:
             logw("No stocks returned from FMP")
             return
 
+        # Apply cheap filters before fetching per-symbol data
+        stock_list_df = self.pre_filter_screener.run(stock_list_df,
+                                                     min_volume=PRE_FILTER_MIN_VOLUME,
+                                                     min_momentum=PRE_FILTER_MIN_MOMENTUM,
+                                                     min_price_drop_percent=PRE_FILTER_MIN_PRICE_DROP_PERCENT)
+        if stock_list_df.empty:
+            logw("No stocks left after pre-filter")
+            return
+
         # Sample a few symbols for demonstration
         symbol_list = stock_list_df['symbol'].unique()
         #symbol_list = symbol_list[:5]
@@ -134,24 +156,15 @@ class ValueStockCandidateFinder:
         quarterly_cashflow_stats_list, annual_cashflow_stats_list = [], []
         price_target_list, inst_own_data_list = [], []
 
-        for symbol in symbol_list:
-            # skip stocks from other countries
-            if "." in symbol:
-                continue
-
-            logd(f"Processing {symbol}...")
-
-            # Fetch company outlook
-            outlook_dict = self.company_outlook_loader.load(symbol)
-            if outlook_dict is None:
-                logw(f"No data for symbol {symbol}")
-                continue
+        num_without_financials = 0
 
+        # Outlook features are streamed, each raw payload is released once its stats are extracted
+        for symbol, outlook_dict in self.company_outlook_loader.iter_features(symbol_list):
             # Populate outlook results
-            profile_list.append(outlook_dict.get('profile', {}))
+            profile_list.append(reduce_row(outlook_dict.get('profile', {}), PROFILE_COLUMN_LIST))
             ratios = outlook_dict.get('ratios', {})
             ratios['symbol'] = symbol
-            ratios_list.append(outlook_dict.get('ratios', {}))
+            ratios_list.append(reduce_row(ratios, RATIOS_COLUMN_LIST))
             news_list.append(outlook_dict.get('news_headlines', []))
             quarterly_income_stats_list.append(outlook_dict.get('quarterly_income_stats', {}))
             annual_income_stats_list.append(outlook_dict.get('annual_income_stats', {}))
@@ -160,6 +173,11 @@ class ValueStockCandidateFinder:
             quarterly_cashflow_stats_list.append(outlook_dict.get('quarterly_cashflow_stats', {}))
             annual_cashflow_stats_list.append(outlook_dict.get('annual_cashflow_stats', {}))
 
+            # Symbols without financials can't score well enough to need price targets or ownership data
+            if not outlook_dict.get('has_financials', True):
+                num_without_financials += 1
+                continue
+
             # Fetch price targets
             price_target_dict = self.price_target_loader.load(symbol)
             if price_target_dict:
@@ -170,20 +188,17 @@ class ValueStockCandidateFinder:
                 inst_own_data = self.inst_own_loader.load_for_symbol(symbol)
                 if inst_own_data and len(inst_own_data) > 0:
                     inst_own_data_list.append(inst_own_data)
+        if num_without_financials > 0:
+            logi("Skipped price targets and institutional ownership of {} symbols without financials",
+                 num_without_financials)
 
         # Convert lists to DataFrames
-        profile_column_list = ['symbol', 'company_name', 'description', 'website',
-                               'mktCap', 'industry', 'sector', 'price', 'volAvg', 'beta']
-        profile_df = pd.DataFrame(profile_list, columns=profile_column_list)
+        profile_df = pd.DataFrame(profile_list, columns=PROFILE_COLUMN_LIST)
 
         news_column_list = ['symbol', 'news_headlines', 'urls']
         news_df = pd.DataFrame(news_list, columns=news_column_list)
 
-        ratios_column_list = ['symbol', 'priceToSalesRatioTTM', 'priceEarningsRatioTTM', 'grossProfitMarginTTM',
-                              'operatingProfitMarginTTM', 'netProfitMarginTTM', 'inventoryTurnoverTTM',
-                              'receivablesTurnoverTTM', 'currentRatioTTM', 'quickRatioTTM',
-                              'debtEquityRatioTTM', 'interestCoverageTTM']
-        ratios_df = pd.DataFrame(ratios_list, columns=ratios_column_list)
+        ratios_df = pd.DataFrame(ratios_list, columns=RATIOS_COLUMN_LIST)
 
         income_column_list = ['symbol', 'last_revenue', 'revenue_change', 'last_net_income', 'last_cost_expenses', 'revenue_trend',
                               'net_income_trend', 'cost_expenses_trend']
@@ -0,0 +1,232 @@
+import os
+import re
+import json
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+
+"""
+Replays FMP payloads for the benchmarks without touching the network.
+
+Recorded payloads are read from benchmarks/fixtures/<endpoint>.json when they exist, the symbol inside a recorded
+payload is swapped for the requested one. Endpoints without a recording get a deterministic synthetic payload
+with the same shape as the FMP response.
+"""
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SEED = 42
+
+# URL pattern -> endpoint name used for the fixture file
+ENDPOINT_PATTERNS = [
+    (re.compile(r"/api/v3/historical-price-full/stock_dividend/(?P<symbol>[^/?]+)"), "stock_dividend"),
+    (re.compile(r"/api/v3/historical-price-full/(?P<symbol>[^/?]+)"), "historical_price_full"),
+    (re.compile(r"/api/v3/grade/(?P<symbol>[^/?]+)"), "grade"),
+    (re.compile(r"/api/v3/income-statement-growth/(?P<symbol>[^/?]+)"), "income_statement_growth"),
+    (re.compile(r"/api/v3/ratios/(?P<symbol>[^/?]+)"), "ratios"),
+    (re.compile(r"/api/v3/stock_news\?tickers=(?P<symbol>[^&]+)"), "stock_news"),
+    (re.compile(r"/api/v4/company-outlook\?symbol=(?P<symbol>[^&]+)"), "company_outlook"),
+]
+
+
+def get_symbol_list(num_symbols: int):
+    return [f"S{i:05d}" for i in range(num_symbols)]
+
+
+def get_rng(symbol: str):
+    # Same payload for the same symbol on every run
+    return np.random.default_rng(SEED + sum(ord(c) * (i + 1) for i, c in enumerate(symbol)))
+
+
+def make_price_history(symbol: str, num_days: int = 500, end_date: datetime = None):
+    """
+    Builds a daily OHLCV price history in the shape of FMP's historical-price-full endpoint, most recent first.
+    """
+    if end_date is None:
+        end_date = datetime.today()
+    rng = get_rng(symbol)
+    dates = pd.bdate_range(end=end_date, periods=num_days)
+    close = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, num_days)))
+    high = close * (1 + rng.uniform(0, 0.02, num_days))
+    low = close * (1 - rng.uniform(0, 0.02, num_days))
+    open_ = low + (high - low) * rng.uniform(0, 1, num_days)
+    volume = rng.integers(100000, 5000000, num_days)
+    historical = [
+        {'date': date.strftime("%Y-%m-%d"), 'open': round(o, 4), 'high': round(h, 4), 'low': round(l, 4),
+         'close': round(c, 4), 'adjClose': round(c, 4), 'volume': int(v)}
+        for date, o, h, l, c, v in zip(dates, open_, high, low, close, volume)
+    ]
+    historical.reverse()
+    return {'symbol': symbol, 'historical': historical}
+
+
+def make_prices_df(symbol: str, num_days: int = 500):
+    """
+    Builds a price DataFrame as returned by the data loaders: date column, oldest first.
+    """
+    prices_df = pd.DataFrame(make_price_history(symbol, num_days)['historical'])
+    prices_df['date'] = pd.to_datetime(prices_df['date'])
+    prices_df.rename(columns={'adjClose': 'adj_close'}, inplace=True)
+    return prices_df.sort_values(by='date').reset_index(drop=True)
+
+
+def make_grades(symbol: str, num_grades: int = 40):
+    rng = get_rng(symbol)
+    grades = ["Strong Buy", "Buy", "Outperform", "Overweight", "Hold", "Equal-Weight", "Underperform",
+              "Underweight", "Sell", "Strong Sell", "Neutral"]
+    today = datetime.today()
+    return [
+        {'symbol': symbol, 'date': (today - timedelta(days=int(days))).strftime("%Y-%m-%d"),
+         'gradingCompany': f"Broker {i % 15}", 'previousGrade': grades[int(rng.integers(len(grades)))],
+         'newGrade': grades[int(rng.integers(len(grades)))]}
+        for i, days in enumerate(np.sort(rng.integers(0, 365, num_grades)))
+    ]
+
+
+def make_stock_news(symbol: str, num_articles: int = 30):
+    today = datetime.today()
+    return [
+        {'symbol': symbol, 'publishedDate': (today - timedelta(hours=6 * i)).strftime("%Y-%m-%d %H:%M:%S"),
+         'title': f"{symbol} headline {i}", 'image': "", 'site': f"site{i % 7}.com",
+         'text': f"{symbol} reported results for the quarter. Article number {i}.",
+         'url': f"https://site{i % 7}.com/{symbol.lower()}/{i}"}
+        for i in range(num_articles)
+    ]
+
+
+def make_statements(symbol: str, num_periods: int, period_days: int):
+    rng = get_rng(symbol)
+    today = datetime.today()
+    income, balance, cash = [], [], []
+    for i in range(num_periods):
+        date_str = (today - timedelta(days=period_days * i)).strftime("%Y-%m-%d")
+        revenue = float(rng.uniform(1e8, 1e10))
+        income.append({'date': date_str, 'symbol': symbol, 'revenue': revenue,
+                       'netIncome': revenue * float(rng.uniform(-0.1, 0.3)),
+                       'costAndExpenses': revenue * float(rng.uniform(0.6, 0.95))})
+        total_assets = float(rng.uniform(1e9, 1e11))
+        balance.append({'date': date_str, 'symbol': symbol, 'totalAssets': total_assets,
+                        'cashAndShortTermInvestments': total_assets * float(rng.uniform(0.05, 0.3)),
+                        'cashAndCashEquivalents': total_assets * float(rng.uniform(0.02, 0.2)),
+                        'totalDebt': total_assets * float(rng.uniform(0.1, 0.6)),
+                        'totalStockholdersEquity': total_assets * float(rng.uniform(0.2, 0.6))})
+        operating_cashflow = revenue * float(rng.uniform(-0.05, 0.3))
+        capital_expenditure = -revenue * float(rng.uniform(0.01, 0.1))
+        cash.append({'date': date_str, 'symbol': symbol, 'operatingCashFlow': operating_cashflow,
+                     'netCashProvidedByOperatingActivities': operating_cashflow,
+                     'capitalExpenditure': capital_expenditure,
+                     'freeCashFlow': operating_cashflow + capital_expenditure,
+                     'netCashUsedForInvestingActivites': capital_expenditure * float(rng.uniform(1, 2))})
+    return {'income': income, 'balance': balance, 'cash': cash}
+
+
+def make_company_outlook(symbol: str):
+    rng = get_rng(symbol)
+    return {
+        'profile': {'symbol': symbol, 'companyName': f"{symbol} Inc.", 'price': float(rng.uniform(1, 500)),
+                    'mktCap': float(rng.uniform(1e7, 1e12)), 'sector': "Technology",
+                    'description': f"{symbol} makes things. " * 20},
+        'ratios': [{'symbol': symbol, 'peRatioTTM': float(rng.uniform(5, 60)),
+                    'priceToBookRatioTTM': float(rng.uniform(0.5, 20)),
+                    'debtEquityRatioTTM': float(rng.uniform(0, 3))}],
+        'rating': [{'symbol': symbol, 'rating': "B", 'ratingScore': int(rng.integers(1, 6))}],
+        'stockNews': make_stock_news(symbol, 10),
+        'financialsAnnual': make_statements(symbol, 5, 365),
+        'financialsQuarter': make_statements(symbol, 8, 91),
+    }
+
+
+SYNTHETIC_PAYLOADS = {
+    'historical_price_full': lambda symbol: make_price_history(symbol),
+    'stock_dividend': lambda symbol: {'symbol': symbol, 'historical': []},
+    'grade': lambda symbol: make_grades(symbol),
+    'stock_news': lambda symbol: make_stock_news(symbol),
+    'company_outlook': lambda symbol: make_company_outlook(symbol),
+}
+
+
+class FixtureResponse:
+    """
+    Minimal stand-in for requests.Response with the attributes FmpClient reads
+    """
+    def __init__(self, content: bytes, status_code: int = 200):
+        self.status_code = status_code
+        self.content = content
+        self.headers = {}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FixtureTransport:
+    """
+    Serves recorded or synthetic payloads for FMP URLs. Use get() in place of requests.get.
+    """
+    def __init__(self, fixtures_dir: str = FIXTURES_DIR):
+        self.fixtures_dir = fixtures_dir
+        self.recorded = {}
+        self.rendered = {}
+        self.num_requests = 0
+
+    def load_recorded(self, endpoint: str):
+        if endpoint not in self.recorded:
+            path = os.path.join(self.fixtures_dir, f"{endpoint}.json")
+            if os.path.exists(path):
+                with open(path) as fixture_file:
+                    self.recorded[endpoint] = fixture_file.read()
+            else:
+                self.recorded[endpoint] = None
+        return self.recorded[endpoint]
+
+    def get_payload(self, endpoint: str, symbol: str):
+        recorded = self.load_recorded(endpoint)
+        if recorded is not None:
+            recorded_payload = json.loads(recorded)
+            if isinstance(recorded_payload, list):
+                recorded_payload = recorded_payload[0] if recorded_payload else {}
+            recorded_symbol = recorded_payload.get('symbol') or recorded_payload.get('profile', {}).get('symbol')
+            if recorded_symbol:
+                recorded = recorded.replace(f'"{recorded_symbol}"', f'"{symbol}"')
+            return json.loads(recorded)
+        if endpoint in SYNTHETIC_PAYLOADS:
+            return SYNTHETIC_PAYLOADS[endpoint](symbol)
+        return None
+
+    def get_content(self, endpoint: str, symbol: str):
+        key = (endpoint, symbol)
+        if key not in self.rendered:
+            payload = self.get_payload(endpoint, symbol)
+            self.rendered[key] = json.dumps(payload).encode() if payload is not None else None
+        return self.rendered[key]
+
+    def prepare(self, endpoint: str, symbol_list: list):
+        """
+        Renders the payloads up front so building them is not part of the measurement.
+        """
+        for symbol in symbol_list:
+            self.get_content(endpoint, symbol)
+
+    def clear(self):
+        self.rendered = {}
+
+    def get(self, url, *args, **kwargs):
+        self.num_requests += 1
+        for pattern, endpoint in ENDPOINT_PATTERNS:
+            match = pattern.search(url)
+            if match:
+                content = self.get_content(endpoint, match.group('symbol'))
+                if content is None:
+                    return FixtureResponse(b"", 404)
+                return FixtureResponse(content, 200)
+        return FixtureResponse(b"", 404)
+
+
+class FixtureFmpDataLoader:
+    """
+    Stands in for botrading's FmpDataLoader where a loader only needs the company outlook
+    """
+    def __init__(self, transport: FixtureTransport):
+        self.transport = transport
+
+    def fetch_company_outlook(self, symbol: str):
+        response = self.transport.get(f"https://financialmodelingprep.com/api/v4/company-outlook?symbol={symbol}")
+        return response.json() if response.status_code == 200 else None
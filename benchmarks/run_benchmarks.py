@@ -0,0 +1,278 @@
+import os
+import sys
+import time
+import json
+import argparse
+import tempfile
+import tracemalloc
+import traceback
+from unittest import mock
+import pandas as pd
+from datetime import datetime
+
+# Run from the repository root so the project modules resolve
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.fixtures import *
+
+"""
+Offline benchmarks for the loaders, indicator calculations, performance metrics and report generation.
+
+Every case replays fixture payloads instead of calling FMP, runs at each synthetic universe size and reports
+wall time, throughput (symbols per second) and peak traced memory. Results are printed and stored as CSV in
+benchmarks/results so runs can be compared for regressions.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 100 1000 --cases price_loader etf_metrics
+"""
+
+DEFAULT_SIZES = [100, 1000, 5000]
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+PRICE_HISTORY_DAYS = 500
+ETF_PRICE_HISTORY_DAYS = 252 * 10
+
+
+def measure(func):
+    """
+    Runs func once and returns (result, elapsed seconds, peak traced memory in MB).
+    """
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    try:
+        result = func()
+    finally:
+        elapsed = time.perf_counter() - start_time
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, elapsed, peak / (1024 * 1024)
+
+
+def bench_price_loader(symbol_list, transport):
+    from data_loaders.fmp_price_loader import FmpPriceLoader
+    loader = FmpPriceLoader("benchmark")
+    transport.prepare('historical_price_full', symbol_list)
+    with mock.patch("requests.get", transport.get):
+        return measure(lambda: loader.fetch(symbol_list))
+
+
+def bench_analyst_ratings_loader(symbol_list, transport):
+    from data_loaders.fmp_analyst_ratings_loader import FmpAnalystRatingsLoader
+    loader = FmpAnalystRatingsLoader("benchmark")
+    transport.prepare('grade', symbol_list)
+    with mock.patch("requests.get", transport.get):
+        return measure(lambda: loader.fetch(symbol_list))
+
+
+def bench_company_outlook_loader(symbol_list, transport):
+    from data_loaders.fmp_company_outlook_loader import FmpCompanyOutlookLoader
+    loader = FmpCompanyOutlookLoader.__new__(FmpCompanyOutlookLoader)
+    loader.fmp_data_loader = FixtureFmpDataLoader(transport)
+    transport.prepare('company_outlook', symbol_list)
+    return measure(lambda: [loader.load(symbol) for symbol in symbol_list])
+
+
+def bench_trend_indicators(symbol_list, transport):
+    from analysis_tools.trend_pullback_candidate_finder import TrendPullbackFinder
+    finder = TrendPullbackFinder.__new__(TrendPullbackFinder)
+    prices_dict = {symbol: make_prices_df(symbol, PRICE_HISTORY_DAYS) for symbol in symbol_list}
+    return measure(lambda: [finder.calculate_indicators(prices_df) for prices_df in prices_dict.values()])
+
+
+def bench_etf_metrics(symbol_list, transport):
+    from utils.performance_utils import calculate_performance_metrics
+    from utils.returns_utils import build_price_matrix, calculate_daily_returns
+    prices_dict = {symbol: make_prices_df(symbol, ETF_PRICE_HISTORY_DAYS) for symbol in ["SPY"] + symbol_list}
+
+    def run_metrics():
+        returns_df = calculate_daily_returns(build_price_matrix(prices_dict, column='adj_close'))
+        return calculate_performance_metrics(returns_df, "SPY", 10)
+
+    return measure(run_metrics)
+
+
+def bench_excel_report(symbol_list, transport):
+    from data_loaders.fmp_company_outlook_loader import FmpCompanyOutlookLoader
+    from report_generators.excel_screener_report_generator import ExcelScreenerReportGenerator
+
+    # Build the report sections the way the candidate finders do
+    loader = FmpCompanyOutlookLoader.__new__(FmpCompanyOutlookLoader)
+    loader.fmp_data_loader = FixtureFmpDataLoader(transport)
+    outlook_list = [loader.load(symbol) for symbol in symbol_list]
+    report_data = {
+        'profile_data': pd.DataFrame([outlook['profile'] for outlook in outlook_list]),
+        'news_data': pd.DataFrame([outlook['news_headlines'] for outlook in outlook_list]),
+        'ratios_data': pd.DataFrame([outlook['ratios'] for outlook in outlook_list]),
+        'quarterly_income_data': pd.DataFrame([outlook['quarterly_income_stats'] for outlook in outlook_list]),
+        'annual_income_data': pd.DataFrame([outlook['annual_income_stats'] for outlook in outlook_list]),
+        'quarterly_balance_sheet_data': pd.DataFrame([outlook['quarterly_balance_sheet_stats']
+                                                      for outlook in outlook_list]),
+        'quarterly_cashflow_data': pd.DataFrame([outlook['quarterly_cashflow_stats'] for outlook in outlook_list]),
+    }
+    report_generator = ExcelScreenerReportGenerator()
+    return measure(lambda: report_generator.generate_report(report_data, "reports", "benchmark_report.xlsx"))
+
+
+def decode_payloads(symbol_list, transport, decode):
+    """
+    Decodes the price and news bodies of all symbols, the parse throughput without the HTTP layer.
+    """
+    transport.prepare('historical_price_full', symbol_list)
+    transport.prepare('stock_news', symbol_list)
+    contents = [(transport.get_content('historical_price_full', symbol), transport.get_content('stock_news', symbol))
+                for symbol in symbol_list]
+    return measure(lambda: [(decode(prices_content, 'historical'), decode(news_content, None))
+                            for prices_content, news_content in contents])
+
+
+def bench_json_decoding(symbol_list, transport):
+    from utils.json_utils import loads, records_to_df
+
+    def decode(content, records_key):
+        data = loads(content)
+        return records_to_df(data[records_key] if records_key else data)
+
+    return decode_payloads(symbol_list, transport, decode)
+
+
+def bench_json_decoding_baseline(symbol_list, transport):
+    # Standard library parser and row-wise DataFrame construction, for comparison with json_decoding
+    def decode(content, records_key):
+        data = json.loads(content)
+        df = pd.DataFrame(data[records_key] if records_key else data)
+        for col in ['date', 'publishedDate']:
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col], errors='coerce')
+        return df
+
+    return decode_payloads(symbol_list, transport, decode)
+
+
+def evict_from_page_cache(path: str):
+    """
+    Drops the pages of a file from the OS page cache so the next read goes to disk, where supported.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    with open(path, "rb") as cached_file:
+        os.fsync(cached_file.fileno())
+        os.posix_fadvise(cached_file.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def read_cold_cache(symbol_list, transport, compress):
+    """
+    Stores the outlook payloads and news frames of all symbols, then reads them back from a cold cache. The
+    result holds the disk footprint of the cache.
+    """
+    from utils.cache_manager import CacheManager
+    cache_dir = os.path.join(os.getcwd(), "cache")
+    cache_manager = CacheManager(cache_dir, compress=compress)
+    transport.prepare('company_outlook', symbol_list)
+    for symbol in symbol_list:
+        cache_manager.store_json('company_outlook', symbol, transport.get_payload('company_outlook', symbol))
+        cache_manager.store_df('stock_news', symbol, pd.DataFrame(make_stock_news(symbol)))
+    cache_manager.save_index()
+    disk_bytes = cache_manager.total_bytes
+    for entry in cache_manager.index.values():
+        evict_from_page_cache(entry['path'])
+
+    def read_all():
+        cold_cache_manager = CacheManager(cache_dir, compress=compress)
+        for symbol in symbol_list:
+            cold_cache_manager.load_json('company_outlook', symbol)
+            cold_cache_manager.load_df('stock_news', symbol, parse_dates=['publishedDate'])
+        return {'disk_mb': disk_bytes / (1024 * 1024)}
+
+    return measure(read_all)
+
+
+def bench_cache_reads(symbol_list, transport):
+    return read_cold_cache(symbol_list, transport, compress=True)
+
+
+def bench_cache_reads_uncompressed(symbol_list, transport):
+    return read_cold_cache(symbol_list, transport, compress=False)
+
+
+BENCHMARK_CASES = {
+    'price_loader': bench_price_loader,
+    'analyst_ratings_loader': bench_analyst_ratings_loader,
+    'company_outlook_loader': bench_company_outlook_loader,
+    'trend_indicators': bench_trend_indicators,
+    'etf_metrics': bench_etf_metrics,
+    'excel_report': bench_excel_report,
+    'json_decoding': bench_json_decoding,
+    'json_decoding_baseline': bench_json_decoding_baseline,
+    'cache_reads': bench_cache_reads,
+    'cache_reads_uncompressed': bench_cache_reads_uncompressed,
+}
+
+
+def run_benchmarks(case_names, sizes):
+    results = []
+    original_dir = os.getcwd()
+    transport = FixtureTransport()
+
+    for case_name in case_names:
+        for size in sizes:
+            symbol_list = get_symbol_list(size)
+            # Loaders write their caches relative to the working directory, keep them out of the repo
+            with tempfile.TemporaryDirectory() as work_dir:
+                os.chdir(work_dir)
+                try:
+                    # Measure the loaders themselves, not HTTP cache hits or API throttling
+                    with mock.patch("utils.fmp_client.HTTP_CACHE_ENABLED", False), \
+                            mock.patch("utils.fmp_client.REQUEST_COALESCING_ENABLED", False), \
+                            mock.patch("utils.fmp_client.FMP_QUOTA_LEDGER_ENABLED", False):
+                        result, elapsed, peak_mb = BENCHMARK_CASES[case_name](symbol_list, transport)
+                    status = "ok"
+                except ImportError as ex:
+                    result, elapsed, peak_mb = None, float('nan'), float('nan')
+                    status = f"skipped ({ex.name} not installed)"
+                except Exception as ex:
+                    # One broken case should not lose the results of the others
+                    traceback.print_exc()
+                    result, elapsed, peak_mb = None, float('nan'), float('nan')
+                    status = f"failed ({type(ex).__name__}: {ex})"
+                finally:
+                    os.chdir(original_dir)
+                    transport.clear()
+
+            results.append({
+                'case': case_name,
+                'symbols': size,
+                'seconds': round(elapsed, 3),
+                'symbols_per_second': round(size / elapsed, 1) if elapsed > 0 else float('nan'),
+                'peak_memory_mb': round(peak_mb, 1),
+                # Only reported by the cache cases
+                'disk_mb': round(result['disk_mb'], 1) if isinstance(result, dict) and 'disk_mb' in result
+                else float('nan'),
+                'status': status
+            })
+            print(f"{case_name} [{size} symbols]: {status}, {elapsed:.3f}s, peak {peak_mb:.1f} MB")
+            if status != "ok":
+                break
+
+    return pd.DataFrame(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run offline benchmarks against fixture payloads")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Synthetic universe sizes")
+    parser.add_argument("--cases", nargs="+", default=list(BENCHMARK_CASES.keys()), choices=BENCHMARK_CASES.keys(),
+                        help="Benchmark cases to run")
+    args = parser.parse_args()
+
+    results_df = run_benchmarks(args.cases, args.sizes)
+    print(results_df.to_string(index=False))
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"benchmark-{datetime.now().strftime('%Y%m%d%H%M%S')}.csv")
+    results_df.to_csv(path, index=False)
+    print(f"Results saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,7 @@ from enums import *
 CACHE_DIR = 'cache'
 RESULTS_DIR = 'results'
 LOG_DIR = 'logs'
-LOG_FILE_NAME = "stock-screener1-log.txt"
+LOG_FILE_NAME = "fmp-screener.log"  # Rotated daily, rotation adds the date to the previous file
 
 # Variables for coarse selection
 EXCHANGE_LIST = "nyse,nasdaq,amex"
@@ -19,10 +19,20 @@ STOCK_LIST_LIMIT = 3000
 # Config variables
 DAILY_DATA_FETCH_PERIODS = 500
 NEWS_ARTICLE_LIMIT = 50
+FETCH_FULL_ARTICLE_TEXT = False  # Score news sentiment on the article pages instead of the FMP snippets
 FMP_CALLS_PER_MINUTE = 1000
-API_REQUEST_DELAY = 60 / FMP_CALLS_PER_MINUTE
+API_REQUEST_DELAY = 60 / FMP_CALLS_PER_MINUTE  # Only for loaders that don't go through FmpClient
+FMP_QUOTA_LEDGER_ENABLED = True  # Share FMP_CALLS_PER_MINUTE across all processes on the host (utils/quota_utils.py)
+MAX_THROTTLE_RETRIES = 3  # Retries of a request answered with 429 Too Many Requests
+FMP_MAX_CONCURRENCY = 16  # Upper bound of the adaptive number of FMP requests in flight (utils/request_scheduler.py)
+FMP_REQUEST_TIMEOUT = 30  # Seconds
 RISK_FREE_RATE = 0.015  # Annualized average risk-free rate (3-month T-bill average)
 ROUND_PRECISION = 4  # Precision for rounding values, number of placed after decimal point
+STORE_DEBUG_ARTIFACTS = False  # Collect per-symbol review frames in cache/debug_artifacts
+NUM_WORKER_PROCESSES = max(1, (os.cpu_count() or 1) - 1)  # Processes for per-symbol indicator calculations
+HTTP_CACHE_ENABLED = True  # Cache FMP responses per endpoint freshness rules (utils/http_cache.py)
+REQUEST_COALESCING_ENABLED = True  # Share identical FMP requests within a run (utils/request_coalescer.py)
+CACHE_COMPRESSION_ENABLED = True  # Store cache payloads as compressed blobs (utils/compression_utils.py)
 
 # Screener criteria
 MIN_PRICE = 5.0  # Minimum price a security should have
@@ -0,0 +1,199 @@
+import re
+import hashlib
+import threading
+import requests
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from urllib.parse import urlsplit, urlunsplit
+from bs4 import BeautifulSoup
+from utils.log_utils import *
+from utils.instrumentation_utils import count, instrument, propagate_spans
+from utils.cache_manager import get_cache_manager
+
+"""
+Full text of news articles.
+
+Article pages are downloaded on a thread pool with connect and read timeouts and at most a few connections per
+news site, URLs are interleaved by site so one slow site doesn't hold up the others. Pages are parsed in worker
+processes as the downloads complete, and the extracted text is cached by URL hash so an article is only fetched
+once across runs and symbols.
+"""
+
+ARTICLE_TEXT_CACHE_NAMESPACE = 'article_text'
+ARTICLE_FETCH_CONCURRENCY = 16  # Downloads in flight across all sites
+MAX_CONNECTIONS_PER_DOMAIN = 2
+ARTICLE_REQUEST_TIMEOUT = (5, 15)  # Connect and read timeouts in seconds
+MAX_ARTICLE_BYTES = 5 * 1024 * 1024  # Larger pages are skipped
+ARTICLE_CHUNK_BYTES = 64 * 1024
+ARTICLE_REQUEST_HEADERS = {'User-Agent': 'Mozilla/5.0 (compatible; fmp-stock-screener)'}
+MIN_PAGES_FOR_PARSE_POOL = 8  # Fewer pages are parsed in-process
+
+
+def clean_article_text(text: str):
+    # Remove line breaks, tabs, and multiple whitespace characters
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def parse_article_html(content: bytes):
+    """
+    Extracts the paragraph text of an article page. Runs in the parse worker processes.
+    """
+    soup = BeautifulSoup(content, 'lxml')
+    return clean_article_text(' '.join(p.get_text().strip() for p in soup.find_all('p')))
+
+
+def get_article_key(url: str):
+    # The fragment doesn't change the page
+    parts = urlsplit(url)
+    return hashlib.sha1(urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, ""))
+                        .encode()).hexdigest()
+
+
+def get_domain(url: str):
+    return urlsplit(url).netloc.lower()
+
+
+def interleave_by_domain(url_list: list):
+    """
+    Orders URLs round robin across their sites.
+    """
+    urls_by_domain = defaultdict(list)
+    for url in url_list:
+        urls_by_domain[get_domain(url)].append(url)
+    domain_queues = list(urls_by_domain.values())
+    ordered_urls = []
+    for index in range(max((len(queue) for queue in domain_queues), default=0)):
+        ordered_urls.extend(queue[index] for queue in domain_queues if index < len(queue))
+    return ordered_urls
+
+
+class ArticleTextLoader:
+    """
+    Fetches and caches the full text of news articles
+
+    Attributes:
+        concurrency (int): Downloads in flight across all sites
+        max_connections_per_domain (int): Downloads in flight per site
+        num_workers (int): Parse worker processes
+    """
+    def __init__(self, concurrency: int = ARTICLE_FETCH_CONCURRENCY,
+                 max_connections_per_domain: int = MAX_CONNECTIONS_PER_DOMAIN,
+                 num_workers: int = NUM_WORKER_PROCESSES):
+        self.concurrency = concurrency
+        self.max_connections_per_domain = max_connections_per_domain
+        self.num_workers = num_workers
+        self.cache_manager = get_cache_manager()
+        self.domain_semaphores = {}
+        self.lock = threading.Lock()
+        # Started on first use and kept for later batches, close() stops it
+        self.parse_executor = None
+
+    def _get_domain_semaphore(self, url: str):
+        domain = get_domain(url)
+        with self.lock:
+            if domain not in self.domain_semaphores:
+                self.domain_semaphores[domain] = threading.BoundedSemaphore(self.max_connections_per_domain)
+            return self.domain_semaphores[domain]
+
+    def download(self, url: str):
+        """
+        Returns the page content, None if the download failed.
+        """
+        try:
+            with self._get_domain_semaphore(url):
+                # Streamed, so oversized pages are abandoned without downloading them completely
+                with requests.get(url, headers=ARTICLE_REQUEST_HEADERS, timeout=ARTICLE_REQUEST_TIMEOUT,
+                                  stream=True) as response:
+                    response.raise_for_status()
+                    count('requests')
+                    chunks = []
+                    num_bytes = 0
+                    for chunk in response.iter_content(chunk_size=ARTICLE_CHUNK_BYTES):
+                        num_bytes += len(chunk)
+                        if num_bytes > MAX_ARTICLE_BYTES:
+                            logw("Skipping article larger than {:.0f} MB: {}", MAX_ARTICLE_BYTES / (1024 * 1024), url)
+                            return None
+                        chunks.append(chunk)
+            count('bytes', num_bytes)
+            return b"".join(chunks)
+        except Exception as ex:
+            count('errors')
+            logd("Failed to fetch article {}: {}", url, ex)
+            return None
+
+    def load_cached(self, url: str):
+        entry = self.cache_manager.load_json(ARTICLE_TEXT_CACHE_NAMESPACE, get_article_key(url))
+        return entry['text'] if entry is not None else None
+
+    def store(self, url: str, text: str):
+        self.cache_manager.store_json(ARTICLE_TEXT_CACHE_NAMESPACE, get_article_key(url), {'url': url, 'text': text})
+
+    @instrument()
+    def fetch(self, url_list: list):
+        """
+        Returns the text of every article as a url -> text dictionary, an empty text for articles that could not be
+        fetched or parsed. Failures are not cached and are retried on the next run.
+        """
+        texts = {}
+        missing_urls = []
+        for url in dict.fromkeys(url for url in url_list if url):
+            text = self.load_cached(url)
+            if text is not None:
+                texts[url] = text
+            else:
+                missing_urls.append(url)
+        if not missing_urls:
+            return texts
+
+        logi("Fetching {} articles ({} cached)", len(missing_urls), len(texts))
+        progress = ProgressLogger("Fetched article", len(missing_urls))
+        parse_executor = self._get_parse_executor() if len(missing_urls) >= MIN_PAGES_FOR_PARSE_POOL else None
+        parse_futures = {}
+        with ThreadPoolExecutor(max_workers=self.concurrency) as download_executor:
+            download = propagate_spans(self.download)
+            download_futures = {download_executor.submit(download, url): url
+                                for url in interleave_by_domain(missing_urls)}
+            # Parse each page as soon as it arrives, the remaining downloads continue meanwhile
+            for download_future in as_completed(download_futures):
+                url = download_futures[download_future]
+                progress.update(url)
+                content = download_future.result()
+                if content is None:
+                    texts[url] = ""
+                elif parse_executor is not None:
+                    parse_futures[parse_executor.submit(parse_article_html, content)] = url
+                else:
+                    texts[url] = self._parse(url, lambda: parse_article_html(content))
+
+        for parse_future, url in parse_futures.items():
+            texts[url] = self._parse(url, parse_future.result)
+        return texts
+
+    def _get_parse_executor(self):
+        if self.num_workers <= 1:
+            return None
+        if self.parse_executor is None:
+            self.parse_executor = ProcessPoolExecutor(max_workers=self.num_workers)
+        return self.parse_executor
+
+    def close(self):
+        if self.parse_executor is not None:
+            self.parse_executor.shutdown()
+            self.parse_executor = None
+
+    def _parse(self, url: str, parse_func):
+        try:
+            text = parse_func()
+        except Exception as ex:
+            logw("Failed to parse article {}: {}", url, ex)
+            return ""
+        self.store(url, text)
+        return text
+
+    def fetch_all_full_text(self, news_df):
+        """
+        Adds the article text of every news item as 'full_text'.
+        """
+        texts = self.fetch(news_df['url'].tolist())
+        news_df['full_text'] = news_df['url'].map(texts).fillna("")
+        return news_df
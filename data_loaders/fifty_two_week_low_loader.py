@@ -1,5 +1,6 @@
 import pandas as pd
 from utils.log_utils import *
+from utils.instrumentation_utils import instrument
 from datetime import datetime, timedelta
 
 
@@ -9,19 +10,20 @@ from datetime import datetime, timedelta
 
 
 class FiftyTwoWeekLowLoader:
+    @instrument()
     def load(self, symbol_list, prices_dict, min_price_drop_percent=None):
-        logi(f"Finding undervalued stocks....")
+        logi("Finding undervalued stocks....")
         undervalued_data = []
 
         for symbol in symbol_list:
             # Get prices
             if symbol not in prices_dict:
-                logw(f"No prices for {symbol}")
+                logw("No prices for {}", symbol)
                 continue
 
             prices_df = prices_dict[symbol]
             if prices_df is None or len(prices_df) < 252:
-                logw(f"Not enough data for {symbol}")
+                logw("Not enough data for {}", symbol)
                 continue
 
             # Get the last year's data
@@ -29,12 +31,12 @@ class FiftyTwoWeekLowLoader:
             last_year_data = prices_df[prices_df.index >= one_year_ago]
 
             if last_year_data.empty:
-                logw(f"No data for {symbol} in the last year")
+                logw("No data for {} in the last year", symbol)
                 continue
 
             # Ensure the DataFrame has a 'Close' column
             if 'close' not in prices_df.columns:
-                logw(f"No 'close' price data for {symbol}")
+                logw("No 'close' price data for {}", symbol)
                 continue
 
             # Calculate 52-week high
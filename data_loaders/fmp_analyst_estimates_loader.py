@@ -3,6 +3,7 @@ import numpy as np
 from datetime import datetime, timedelta
 from botrading.data_loaders.fmp_data_loader import FmpDataLoader
 from utils.log_utils import *
+from utils.instrumentation_utils import instrument
 
 
 class FmpAnalystEstimatesLoader:
@@ -13,12 +14,13 @@ class FmpAnalystEstimatesLoader:
     def __init__(self, fmp_api_key: str = ''):
         self.fmp_data_loader = FmpDataLoader(fmp_api_key)
 
+    @instrument()
     def load(self, symbol: str, period: str ="quarterly"):
         # Fetch price targets
         estimates_df = self.fmp_data_loader.fetch_analyst_earnings_estimates(symbol, period=period)
 
         if estimates_df is None or estimates_df.empty:
-            logi(f"No estimates for symbol {symbol}")
+            logi("No estimates for symbol {}", symbol)
             return pd.DataFrame(), {
                 'avg_revenue_change_percent': 0.0,
                 'revenue_change_coefficient_variation': 0.0,
@@ -2,18 +2,18 @@ import pandas as pd
 from config import *
 from utils.fmp_client import FmpClient
 from utils.log_utils import *
+from utils.debug_artifact_utils import get_debug_artifact_sink
+from utils.instrumentation_utils import instrument
 from utils.file_utils import *
-import time
 from datetime import datetime
 import os
 
-ANALYST_RATINGS_CACHE_DIR = os.path.join("cache", "analyst_ratings")
-
 
 # Loads analyst ratings from FMP
 class FmpAnalystRatingsLoader:
     def __init__(self, fmp_api_key):
         self.fmp_client = FmpClient(fmp_api_key)
+        self.debug_artifact_sink = get_debug_artifact_sink()
 
     def aggregate_rating_counts(self, symbol, grades_df):
         strong_buy_count = 0
@@ -60,27 +60,20 @@ class FmpAnalystRatingsLoader:
         })
         return grades_count_df
 
+    @instrument()
     def fetch(self, symbol_list, num_lookback_days=60):
         #  Fetch all symbols
         symbols = symbol_list
         #  Iterate through symbols
-        i = 1
+        progress = ProgressLogger("Loading analyst ratings for", len(symbol_list))
         results_df = pd.DataFrame({})
-        for symbol in symbols:
-            logd(f"Loading analyst ratings for {symbol}... ({i}/{len(symbol_list)})")
+        # Responses are cached by FmpClient, uncached ones are fetched concurrently
+        for symbol, grades_df in self.fmp_client.map(self.fmp_client.get_analyst_ratings, symbols):
+            progress.update(symbol)
 
-            today_str = datetime.today().strftime("%Y-%m-%d")
-            file_name = f"{symbol}_{today_str}_analyst_ratings.csv"
-            path = os.path.join(ANALYST_RATINGS_CACHE_DIR, file_name)
-            if os.path.exists(path):
-                # Load from cache
-                grades_df = pd.read_csv(path)
-            else:
-                # Fetch remotely
-                grades_df = self.fmp_client.get_analyst_ratings(symbol)
-                if grades_df is None or len(grades_df) == 0:
-                    logw(f"No grades for {symbol}")
-                    continue
+            if grades_df is None or len(grades_df) == 0:
+                logw("No grades for {}", symbol)
+                continue
 
             # Filter out data more than x months in the past
             cutoff_date = pd.Timestamp.now() - pd.DateOffset(days=num_lookback_days)
@@ -90,7 +83,7 @@ class FmpAnalystRatingsLoader:
             grades_df = self.aggregate_rating_counts(symbol, grades_df)
 
             # Store grades for review
-            store_csv(CACHE_DIR, f"{symbol}_analyst_ratings.csv", grades_df)
+            self.debug_artifact_sink.add("analyst_ratings", symbol, grades_df)
 
             #  Add individual stock results to all results
             total_rating = grades_df['total_rating'].iloc[0]
@@ -101,9 +94,4 @@ class FmpAnalystRatingsLoader:
                                 'bearish_count': [bearish_count], 'analyst_rating_score': [total_rating]})
             results_df = pd.concat([results_df, row], axis=0, ignore_index=True)
 
-            i += 1
-
-            # Throttle for API limit
-            time.sleep(API_REQUEST_DELAY)
-
         return results_df
@@ -4,6 +4,7 @@ import pandas as pd
 from config import *
 from botrading.data_loaders.fmp_data_loader import FmpDataLoader
 from utils.log_utils import *
+from utils.instrumentation_utils import instrument
 import time
 from utils.df_utils import cap_outliers
 from utils.file_utils import *
@@ -15,8 +16,9 @@ class FmpBalanceSheetDataLoader:
     def __init__(self, fmp_api_key):
         self.fmp_client = FmpDataLoader(fmp_api_key)
 
+    @instrument()
     def fetch(self, symbol, period='quarterly', lookback_periods=4):
-        logi(f"Fetching balance sheet data....")
+        logi("Fetching balance sheet data....")
 
         results = {
                 'last_cash_cash_equivalents': 0,
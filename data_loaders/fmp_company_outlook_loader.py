@@ -1,12 +1,17 @@
 import pandas as pd
 from config import *
 from utils.log_utils import *
+from utils.instrumentation_utils import instrument
+from utils.dtype_utils import optimize_record_dtypes
 from utils.file_utils import *
 from utils.indicator_utils import *
 from botrading.data_loaders.fmp_data_loader import FmpDataLoader
 import numpy as np
 
 CACHE_DIR = "cache"
+# Raw payload sections that are only kept when requested, the stats are calculated from them
+RAW_DATA_KEYS = ['news_data', 'annual_income_data', 'quarterly_income_data', 'annual_balance_sheet_data',
+                 'quarterly_balance_sheet_data', 'annual_cashflow_data', 'quarterly_cashflow_data']
 
 
 class FmpCompanyOutlookLoader:
@@ -42,8 +47,8 @@ class FmpCompanyOutlookLoader:
         if not income_data:
             return stats
 
-        income_stats_df = pd.DataFrame(income_data)
-        income_stats_df['date'] = pd.to_datetime(income_stats_df['date'], errors="coerce")
+        # Dates as datetime64, symbol, currency and period as categoricals
+        income_stats_df = optimize_record_dtypes(pd.DataFrame(income_data))
         income_stats_df.sort_values(by='date', ascending=True, inplace=True)
 
         # Set defaults and round values
@@ -70,8 +75,7 @@ class FmpCompanyOutlookLoader:
         if not balance_sheet_data:
             return stats
 
-        balance_sheet_df = pd.DataFrame(balance_sheet_data)
-        balance_sheet_df['date'] = pd.to_datetime(balance_sheet_df['date'], errors="coerce")
+        balance_sheet_df = optimize_record_dtypes(pd.DataFrame(balance_sheet_data))
         balance_sheet_df.sort_values(by='date', ascending=True, inplace=True)
 
         stats['last_total_assets'] = round(balance_sheet_df['totalAssets'].iloc[-1],
@@ -99,8 +103,7 @@ class FmpCompanyOutlookLoader:
         if not cashflow_data:
             return stats
 
-        cashflow_df = pd.DataFrame(cashflow_data)
-        cashflow_df['date'] = pd.to_datetime(cashflow_df['date'], errors="coerce")
+        cashflow_df = optimize_record_dtypes(pd.DataFrame(cashflow_data))
         cashflow_df.sort_values(by='date', ascending=True, inplace=True)
 
         stats['last_operating_cashflow'] = round(cashflow_df['operatingCashFlow'].iloc[-1],
@@ -151,7 +154,8 @@ class FmpCompanyOutlookLoader:
 
             return round(cash_runway_months, 2)
 
-    def load(self, symbol: str):
+    @instrument()
+    def load(self, symbol: str, keep_raw_data: bool = True):
         results = {}
 
         # Fetch company outlook
@@ -206,4 +210,26 @@ class FmpCompanyOutlookLoader:
         if rating_list:
             results['rating'] = rating_list[0]
 
+        # Symbols without financials are kept but score zero, callers skip their enrichment calls
+        results['has_financials'] = bool(results['quarterly_income_data'])
+        if not keep_raw_data:
+            for key in RAW_DATA_KEYS:
+                results.pop(key, None)
+
         return results
+
+    def iter_features(self, symbol_list):
+        """
+        Yields (symbol, outlook stats) for every symbol with an outlook. Only one raw outlook payload is held at a
+        time, it is released as soon as its stats are calculated.
+        """
+        progress = ProgressLogger("Processing", len(symbol_list))
+        for symbol in symbol_list:
+            progress.update(symbol)
+
+            outlook_dict = self.load(symbol, keep_raw_data=False)
+            if outlook_dict is None:
+                logw("No data for symbol {}", symbol)
+                continue
+
+            yield symbol, outlook_dict
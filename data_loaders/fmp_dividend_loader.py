@@ -2,8 +2,10 @@ import pandas as pd
 from config import *
 from utils.fmp_client import FmpClient
 from utils.log_utils import *
+from utils.debug_artifact_utils import get_debug_artifact_sink
+from utils.instrumentation_utils import instrument
 from utils.file_utils import *
-import time
+from utils.returns_utils import calculate_period_returns
 from datetime import datetime, timedelta
 import numpy as np
 
@@ -11,21 +13,17 @@ import numpy as np
 class FmpDividendLoader:
     def __init__(self, fmp_api_key):
         self.fmp_client = FmpClient(fmp_api_key)
+        self.debug_artifact_sink = get_debug_artifact_sink()
 
     def calculate_yearly_returns(self, symbol, prices_df):
         try:
-            # Resample the data to get the last trading day of each year
-            yearly_prices_df = prices_df.resample('Y').last()
-
-            # Calculate the yearly returns as percent change of the 'close' price
-            yearly_prices_df['annual_close_returns'] = round(yearly_prices_df['close'].pct_change() * 100, 2)
+            # Calculate the yearly returns as percent change of the last 'close' price of each year
+            yearly_returns_df = calculate_period_returns(prices_df[['close']], 'Y')
+            yearly_prices_df = pd.DataFrame({'annual_close_returns': round(yearly_returns_df['close'] * 100, 2)})
             yearly_prices_df.dropna(inplace=True)
-            yearly_prices_df = yearly_prices_df[['annual_close_returns']]
 
             # Store for review
-            file_name = f"{symbol}_annual_returns.csv"
-            path = os.path.join(CACHE_DIR, file_name)
-            yearly_prices_df.to_csv(path)
+            self.debug_artifact_sink.add("annual_returns", symbol, yearly_prices_df)
 
             # Calculate average and standard deviation of the yearly returns
             avg_annual_return = yearly_prices_df['annual_close_returns'].mean()
@@ -102,19 +100,20 @@ class FmpDividendLoader:
     def cap_values(self, value, min_val, max_val):
         return max(min_val, min(value, max_val))
 
+    @instrument()
     def fetch(self, symbol_list, prices_dict):
         dividend_results = []
         # Used to cap outlier values
         MAX_DIVIDEND_YIELD = 1000
         MIN_DIVIDEND_YIELD = 0
         LOOKBACK_DAYS = 365 * 3
-        i = 1
+        progress = ProgressLogger("Fetching dividends for", len(symbol_list))
         for symbol in symbol_list:
-            logd(f"Fetching dividends for {symbol}...  ({i}/{len(symbol_list)})")
+            progress.update(symbol)
 
             # Get prices
             if symbol not in prices_dict:
-                logw(f"No prices for dividend calculation for {symbol}")
+                logw("No prices for dividend calculation for {}", symbol)
                 avg_dividend_yield = 0
             else:
                 prices_df = prices_dict[symbol]
@@ -122,15 +121,15 @@ class FmpDividendLoader:
                 # Fetch dividends
                 dividends_df = self.fmp_client.fetch_dividends(symbol)
                 if dividends_df is None or len(dividends_df) == 0:
-                    logw(f"Not enough dividend data for {symbol}")
+                    logw("Not enough dividend data for {}", symbol)
                     avg_dividend_yield = 0
                 else:
                     # Filter by date
                     start_date = datetime.today() - timedelta(days=LOOKBACK_DAYS)
                     dividends_df = dividends_df[dividends_df.index >= start_date]
-                    store_csv(CACHE_DIR, f"{symbol}_dividends.csv", dividends_df)
+                    self.debug_artifact_sink.add("dividends", symbol, dividends_df)
                     if len(dividends_df) == 0:
-                        logw(f"Not enough dividend data for {symbol}")
+                        logw("Not enough dividend data for {}", symbol)
                         avg_dividend_yield = 0
                     else:
                         # Filter prices by start date
@@ -144,11 +143,6 @@ class FmpDividendLoader:
 
             dividend_results.append({'symbol': symbol, 'avg_dividend_yield': avg_dividend_yield})
 
-            i += 1
-
-            # Throttle for API limit
-            time.sleep(API_REQUEST_DELAY)
-
         dividend_stats_df = pd.DataFrame(dividend_results)
 
         # Store results
@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from botrading.data_loaders.fmp_data_loader import FmpDataLoader
+from utils.instrumentation_utils import instrument
 
 
 class FmpEarningsEstimateLoader:
@@ -11,6 +12,7 @@ class FmpEarningsEstimateLoader:
     def __init__(self, fmp_api_key: str):
         self.fmp_data_loader = FmpDataLoader(fmp_api_key)
 
+    @instrument()
     def load(self, symbol_list, period="annual", num_future_periods=4, min_avg_estimate_percent=None, min_num_analysts=0):
         results = []
 
@@ -3,6 +3,7 @@ from sklearn.linear_model import LinearRegression
 import numpy as np
 from config import *
 from utils.log_utils import *
+from utils.instrumentation_utils import instrument
 from botrading.data_loaders.fmp_data_loader import FmpDataLoader
 
 
@@ -16,15 +17,16 @@ class FmpInstOwnDataLoader:
     def __init__(self, fmp_api_key):
         self.fmp_data_loader = FmpDataLoader(api_key=fmp_api_key)
 
+    @instrument()
     def run(self, symbol_list):
-        logi(f"Fetching institutional ownership data...")
+        logi("Fetching institutional ownership data...")
         results = []
 
         # Fetch institutional ownership data
         inst_ownership_dict = self.fmp_data_loader.fetch_multiple_institutional_ownership_changes(symbol_list)
         for symbol, inst_own_df in inst_ownership_dict.items():
             if inst_own_df is None or len(inst_own_df) == 0:
-                logi(f"No institutional ownership data for {symbol}")
+                logi("No institutional ownership data for {}", symbol)
 
             total_invested = inst_own_df['totalInvested'].iloc[0]
             total_invested_change = inst_own_df['totalInvestedChange'].iloc[0]
@@ -46,10 +48,11 @@ class FmpInstOwnDataLoader:
         # convert to dataframe
         inst_own_results_df = pd.DataFrame(results)
 
-        logi(f"Done fetching institutional ownership data...")
+        logi("Done fetching institutional ownership data...")
 
         return inst_own_results_df
 
+    @instrument()
     def load_for_symbol(self, symbol):
         # Fetch institutional ownership data
         inst_own_df = self.fmp_data_loader.fetch_institutional_ownership_changes(symbol)
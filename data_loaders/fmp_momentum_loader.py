@@ -2,6 +2,8 @@ import pandas as pd
 from config import *
 from utils.fmp_client import FmpClient
 from utils.log_utils import *
+from utils.debug_artifact_utils import get_debug_artifact_sink
+from utils.instrumentation_utils import instrument
 from utils.file_utils import *
 import time
 from datetime import datetime, timedelta
@@ -12,11 +14,12 @@ from utils.df_utils import cap_outliers
 class FmpMomentumLoader:
     def __init__(self, fmp_api_key):
         self.fmp_client = FmpClient(fmp_api_key)
+        self.debug_artifact_sink = get_debug_artifact_sink()
 
     def calculate_momentum_factor(self, symbol, prices_df):
         # Check minimum length
         if len(prices_df) < 252:
-            logw(f"Not enough price data for {symbol}")
+            logw("Not enough price data for {}", symbol)
             return 0
         # Current price (latest)
         current_price = prices_df['close'][-2]  # NOTE: -2 because -1 is the current incomplete bar in live trading
@@ -35,33 +38,42 @@ class FmpMomentumLoader:
         momentum_factor = 0.5 * six_month_momentum + 0.5 * twelve_month_momentum
         return momentum_factor
 
-    def fetch(self, symbol_list, prices_dict):
-        momentum_df = pd.DataFrame()
+    def calculate_symbol_momentum(self, symbol, prices_df):
         lookback_days = 400
-        i = 1
+
+        # Fetch price history
+        start_date = datetime.today() - timedelta(days=lookback_days)
+        prices_df = prices_df[prices_df.index >= start_date]
+        self.debug_artifact_sink.add("prices", symbol, prices_df)
+
+        # Calculate momentum factor
+        momentum_factor = self.calculate_momentum_factor(symbol, prices_df)
+        return {'symbol': symbol, 'momentum_factor': momentum_factor}
+
+    def iter_momentum(self, prices_iter):
+        """
+        Yields one momentum row per (symbol, prices_df) pair, e.g. from FmpPriceLoader.iter_prices, so the
+        price frames can be released right after use. The rows are not capped.
+        """
+        for symbol, prices_df in prices_iter:
+            yield self.calculate_symbol_momentum(symbol, prices_df)
+
+    @instrument()
+    def fetch(self, symbol_list, prices_dict):
+        momentum_rows = []
+        progress = ProgressLogger("Calculating momentum for", len(symbol_list))
         for symbol in symbol_list:
-            logd(f"Calculating momentum for {symbol}... ({i}/{len(symbol_list)})")
+            progress.update(symbol)
 
             # Get prices
             if symbol not in prices_dict:
-                logw(f"No prices for {symbol}")
+                logw("No prices for {}", symbol)
                 continue
-            prices_df = prices_dict[symbol]
-
-            # Fetch price history
-            start_date = datetime.today() - timedelta(days=lookback_days)
-            prices_df = prices_df[prices_df.index >= start_date]
-            store_csv(CACHE_DIR, f"{symbol}_prices.csv", prices_df)
+            momentum_rows.append(self.calculate_symbol_momentum(symbol, prices_dict[symbol]))
 
-            # Calculate momentum factor
-            momentum_factor = self.calculate_momentum_factor(symbol, prices_df)
-
-            row = pd.DataFrame({'symbol': [symbol], 'momentum_factor': [momentum_factor]})
-            momentum_df = pd.concat([momentum_df, row], axis=0, ignore_index=True)
-            i += 1
+        momentum_df = pd.DataFrame(momentum_rows, columns=['symbol', 'momentum_factor'])
 
         # Cap outliers
         momentum_df = cap_outliers(momentum_df, 'momentum_factor')
 
         return momentum_df
-
@@ -1,39 +1,50 @@
 import pandas as pd
 from config import *
 from utils.fmp_client import FmpClient
+from enums import RequestPriority
 from utils.log_utils import *
+from utils.instrumentation_utils import instrument
+from utils.dtype_utils import log_memory_report
 import time
 from datetime import datetime, timedelta
 
 
 class FmpPriceLoader:
     def __init__(self, fmp_api_key):
-        self.fmp_client = FmpClient(fmp_api_key)
+        self.fmp_client = FmpClient(fmp_api_key, RequestPriority.CRITICAL)
 
+    @instrument()
     def fetch_all(self):
         all_prices_df = self.fmp_client.fetch_all_prices()
         return all_prices_df
 
-    def fetch(self, symbol_list):
-        prices_dict = {}
+    def iter_prices(self, symbol_list):
+        """
+        Yields (symbol, prices_df) for every symbol with enough price history, one price frame at a time.
+        """
         lookback_days = 365 * 3
-        i = 1
-        for symbol in symbol_list:
-            logd(f"Fetching prices for {symbol}... ({i}/{len(symbol_list)})")
+        start_date = datetime.today() - timedelta(days=lookback_days)
+        start_date_str = start_date.strftime("%Y-%m-%d")
+        end_date = datetime.today()
+        end_date_str = end_date.strftime("%Y-%m-%d")
+
+        def fetch_prices(symbol):
+            return self.fmp_client.fetch_daily_prices(symbol, start_date_str, end_date_str)
 
-            # Fetch price history
-            start_date = datetime.today() - timedelta(days=lookback_days)
-            start_date_str = start_date.strftime("%Y-%m-%d")
-            end_date = datetime.today()
-            end_date_str = end_date.strftime("%Y-%m-%d")
+        # Price histories are fetched concurrently, they are yielded in symbol order
+        progress = ProgressLogger("Fetching prices for", len(symbol_list))
+        for symbol, prices_df in self.fmp_client.map(fetch_prices, symbol_list):
+            progress.update(symbol)
 
-            prices_df = self.fmp_client.fetch_daily_prices(symbol, start_date_str, end_date_str)
             if prices_df is None or len(prices_df) < 252:
-                logw(f"Not enough price data for {symbol}")
+                logw("Not enough price data for {}", symbol)
                 continue
 
-            prices_dict[symbol] = prices_df
-            i += 1
+            yield symbol, prices_df
 
-        return prices_dict
+    @instrument()
+    def fetch(self, symbol_list):
+        prices_dict = dict(self.iter_prices(symbol_list))
 
+        log_memory_report("Price history", prices_dict)
+        return prices_dict
@@ -2,6 +2,7 @@ import pandas as pd
 from datetime import datetime, timedelta
 from botrading.data_loaders.fmp_data_loader import FmpDataLoader
 from config import *
+from utils.instrumentation_utils import instrument
 
 
 class FmpPriceTargetLoader:
@@ -12,6 +13,7 @@ class FmpPriceTargetLoader:
     def __init__(self, fmp_api_key: str = ''):
         self.fmp_data_loader = FmpDataLoader(fmp_api_key)
 
+    @instrument()
     def load(self, symbol: str, lookback_days: int = 60):
         result = {
                 'symbol': symbol,
@@ -74,6 +76,7 @@ class FmpPriceTargetLoader:
         result['num_price_target_analysts'] = round(num_price_target_analysts, 2)
         return result
 
+    @instrument()
     def load_list(self, symbol_list: list, lookback_days=60):
         results = []
 
@@ -2,19 +2,21 @@ import pandas as pd
 from config import *
 from utils.fmp_client import FmpClient
 from utils.log_utils import *
+from utils.debug_artifact_utils import get_debug_artifact_sink
+from utils.instrumentation_utils import instrument
 from utils.file_utils import *
 from utils.df_utils import cap_outliers
-import time
 
 
 class FmpQualityLoader:
     def __init__(self, fmp_api_key):
         self.fmp_client = FmpClient(fmp_api_key)
+        self.debug_artifact_sink = get_debug_artifact_sink()
 
     def calculate_quality_factor(self, symbol, ratios_df):
         # Check minimum length
         if ratios_df is None or len(ratios_df) == 0:
-            logw(f"Not enough income quality data for {symbol}")
+            logw("Not enough income quality data for {}", symbol)
             return 0
 
         return_on_equity = ratios_df['returnOnEquity'].iloc[0] or 0
@@ -24,22 +26,23 @@ class FmpQualityLoader:
         quality_factor = 0.5 * return_on_equity - 0.5 * debt_equity_ratio
         return quality_factor
 
+    @instrument()
     def fetch(self, symbol_list):
         quality_results_df = pd.DataFrame()
-        i = 1
+        progress = ProgressLogger("Fetching quality info for", len(symbol_list))
         for symbol in symbol_list:
-            logd(f"Fetching quality info for {symbol}... ({i}/{len(symbol_list)})")
+            progress.update(symbol)
 
             # Fetch quarterly ratios
             quarterly_ratios_df = self.fmp_client.get_financial_ratios(symbol, period="quarterly")
-            store_csv(CACHE_DIR, f"{symbol}_quarterly_ratios.csv", quarterly_ratios_df)
+            self.debug_artifact_sink.add("quarterly_ratios", symbol, quarterly_ratios_df)
 
             # Calculate Quality factor
             quarterly_quality_factor = self.calculate_quality_factor(symbol, quarterly_ratios_df)
 
             # Fetch annual ratios
             annual_ratios_df = self.fmp_client.get_financial_ratios(symbol, period="annual")
-            store_csv(CACHE_DIR, f"{symbol}_annual_ratios.csv", quarterly_ratios_df)
+            self.debug_artifact_sink.add("annual_ratios", symbol, annual_ratios_df)
 
             # Calculate Quality factor
             annual_quality_factor = self.calculate_quality_factor(symbol, annual_ratios_df)
@@ -50,11 +53,6 @@ class FmpQualityLoader:
             row = pd.DataFrame({'symbol': [symbol], 'quality_factor': [quality_factor]})
             quality_results_df = pd.concat([quality_results_df, row], axis=0, ignore_index=True)
 
-            i += 1
-
-            # Throttle for API limit
-            time.sleep(API_REQUEST_DELAY)
-
         # Cap outliers in the growth factor results
         quality_results_df = cap_outliers(quality_results_df, "quality_factor")
 
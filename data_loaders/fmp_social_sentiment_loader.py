@@ -1,28 +1,30 @@
 import pandas as pd
 from config import *
 from utils.fmp_client import FmpClient
+from enums import RequestPriority
 from utils.log_utils import *
+from utils.instrumentation_utils import instrument
 from utils.df_utils import cap_outliers
 from datetime import datetime, timedelta
-import time
 import numpy as np
 
 
 class FmpSocialSentimentLoader:
     def __init__(self, fmp_api_key):
-        self.fmp_client = FmpClient(fmp_api_key)
+        self.fmp_client = FmpClient(fmp_api_key, RequestPriority.OPTIONAL)
 
     def calculate_social_sentiment_score(self, sentiment_df):
         mean_sentiment = sentiment_df['stocktwitsSentiment'].mean()
 
         return mean_sentiment
 
+    @instrument()
     def fetch(self, symbol_list):
         #  Iterate through symbols
         results_df = pd.DataFrame({})
-        i = 1
+        progress = ProgressLogger("Loading social media sentiment for", len(symbol_list))
         for symbol in symbol_list:
-            logd(f"Loading social media sentiment for {symbol}... ({i}/{len(symbol_list)})")
+            progress.update(symbol)
 
             # Fetch social sentiment
             social_sentiment_df = self.fmp_client.get_social_sentiment(symbol)
@@ -42,11 +44,6 @@ class FmpSocialSentimentLoader:
             row = pd.DataFrame({'symbol': [symbol], 'social_sentiment_score': [sentiment_score]})
             results_df = pd.concat([results_df, row], axis=0, ignore_index=True)
 
-            i += 1
-
-            # Throttle for API limit
-            time.sleep(API_REQUEST_DELAY)
-
         # Cap values
         results_df = cap_outliers(results_df, 'social_sentiment_score')
 
@@ -2,6 +2,7 @@ import pandas as pd
 from config import *
 from botrading.data_loaders.fmp_data_loader import FmpDataLoader
 from utils.log_utils import *
+from utils.instrumentation_utils import instrument
 from utils.file_utils import *
 
 
@@ -9,8 +10,9 @@ class FmpStockListLoader:
     def __init__(self, fmp_api_key):
         self.fmp_client = FmpDataLoader(fmp_api_key)
 
+    @instrument()
     def fetch_list(self, exchange_list, min_market_cap, min_price, max_beta, min_volume, country, stock_list_limit):
-        logi(f"Fetching stock list")
+        logi("Fetching stock list")
         stock_list_df = self.fmp_client.fetch_stock_screener_results(exchange_list=exchange_list,
                                                                      market_cap_more_than=min_market_cap,
                                                                      price_more_than=min_price,
@@ -31,7 +33,7 @@ class FmpStockListLoader:
 
         # Cache locally
         store_csv(CACHE_DIR, "stock_list.csv", stock_list_df)
-        logi(f"Stock list cached at {os.path.join(CACHE_DIR, 'stock_list.csv')}")
-        logi(f"Stock list returned {len(stock_list_df)} stocks")
+        logi("Stock list cached at {}", os.path.join(CACHE_DIR, 'stock_list.csv'))
+        logi("Stock list returned {} stocks", len(stock_list_df))
         return stock_list_df
 
@@ -1,15 +1,14 @@
 import pandas as pd
 from config import *
 from utils.fmp_client import FmpClient
+from enums import RequestPriority
 from utils.log_utils import *
+from utils.instrumentation_utils import instrument
 from utils.file_utils import *
 from utils.df_utils import cap_outliers
-import hashlib
+from data_loaders.article_text_loader import ArticleTextLoader
+from utils.dedup_utils import NearDuplicateIndex, collapse_duplicates
 from langdetect import detect, LangDetectException
-from bs4 import BeautifulSoup
-import re
-import time
-import requests
 from datetime import datetime, timedelta
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import torch
@@ -23,13 +22,16 @@ labels = ["positive", "negative", "neutral"]
 
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
 
-NEWS_CACHE_DIR = os.path.join("cache", "news_articles")
-
 
 # Loads stock news from FMP
 class FmpStockNewsLoader:
     def __init__(self, fmp_api_key):
-        self.fmp_client = FmpClient(fmp_api_key)
+        self.fmp_client = FmpClient(fmp_api_key, RequestPriority.OPTIONAL)
+        self.article_text_loader = ArticleTextLoader()
+        # Syndicated stories are detected and scored once per cluster across all symbols
+        self.duplicate_index = NearDuplicateIndex()
+        self.cluster_is_english = {}
+        self.cluster_sentiments = {}
 
     def detect_english(self, text):
         try:
@@ -39,50 +41,25 @@ class FmpStockNewsLoader:
 
     def filter_non_english_news_items(self, news_df):
         # Filter out all news articles not in English language
-        news_df['is_english'] = news_df['text'].apply(self.detect_english)
+        news_df['is_english'] = news_df.apply(self.detect_cluster_english, axis=1)
         news_df = news_df[news_df['is_english']]
 
         # Drop the 'is_english' column if it's no longer needed
         news_df.drop(columns=['is_english'], inplace=True)
         return news_df
 
-    def clean_article_text(self, text):
-        # Remove line breaks, tabs, and multiple whitespace characters
-        text = re.sub(r'\s+', ' ', text)
-        return text
-
-    def fetch_full_article_text(self, row):
-        symbol = row['symbol']
-        url = row['url']
-        print(f"Fetching full article for {symbol}: {url}")
-        try:
-            if url is None or url == "":
-                return ""
-
-            # Fetch text
-            response = requests.get(url)
-            response.raise_for_status()  # This will raise an HTTPError
-
-            # If you get a successful response, proceed to parse the text
-            soup = BeautifulSoup(response.content, 'lxml')
-            article_text = ' '.join(p.get_text().strip() for p in soup.find_all('p'))
-
-            # Clean the text
-            article_text = self.clean_article_text(article_text)
-
-            return article_text
-        except requests.HTTPError as http_err:
-            print(f"HTTP error occurred: {http_err}")
-        except Exception as err:
-            print(f"An error occurred: {err}")
-        return ""
+    def detect_cluster_english(self, row):
+        cluster_id = row['cluster_id']
+        if cluster_id not in self.cluster_is_english:
+            self.cluster_is_english[cluster_id] = self.detect_english(row['text'])
+        return self.cluster_is_english[cluster_id]
 
     def fetch_all_full_text(self, news_df):
-        news_df['full_text'] = news_df.apply(self.fetch_full_article_text, axis=1)
-        return news_df
+        return self.article_text_loader.fetch_all_full_text(news_df)
 
     def detect_news_sentiment(self, row):
-        news_text = f"{row['title']} {row['text']}"
+        # The article text when it was fetched, FMP's snippet otherwise
+        news_text = f"{row['title']} {row.get('full_text') or row['text']}"
         if news_text:
             # Truncate the news_text to the max_length the model can handle
             tokens = tokenizer(news_text, return_tensors="pt", max_length=512, truncation=True,
@@ -110,6 +87,12 @@ class FmpStockNewsLoader:
         else:
             return 0.0  # Return 0.0 for empty or None text
 
+    def detect_cluster_sentiment(self, row):
+        cluster_id = row['cluster_id']
+        if cluster_id not in self.cluster_sentiments:
+            self.cluster_sentiments[cluster_id] = self.detect_news_sentiment(row)
+        return self.cluster_sentiments[cluster_id]
+
     def calculate_news_sentiment_score(self, news_df):
         if news_df is None or len(news_df) == 0:
             return 0
@@ -121,52 +104,50 @@ class FmpStockNewsLoader:
 
         return news_sentiment_score
 
+    @instrument()
     def fetch(self, symbol_list, news_article_limit):
         #  Iterate through symbols
         results_df = pd.DataFrame({})
-        i = 1
-        for symbol in symbol_list:
-            logd(f"Loading stock news for {symbol}... ({i}/{len(symbol_list)})")
-
-            today_str = datetime.today().strftime("%Y-%m-%d")
-            file_name = f"{symbol}_{today_str}_news_articles.csv"
-            path = os.path.join(NEWS_CACHE_DIR, file_name)
-            if os.path.exists(path):
-                # Load from cache
-                news_df = pd.read_csv(path)
-            else:
-                # Fetch news remotely
-                news_df = self.fmp_client.get_stock_news(symbol, news_article_limit)
-                store_csv(NEWS_CACHE_DIR, file_name, news_df)
-            if news_df is None or len(news_df) == 0:
-                logw(f"No news for {symbol}")
-                continue
-
-            # Filter - only keep news from last 30 days
-            start_date = datetime.today() - timedelta(days=30)
-            news_df = news_df[news_df['publishedDate'] >= start_date]
-
-            if len(news_df) == 0:
-                logw(f"No news stories in the last month for {symbol}")
-                news_sentiment_score = 0
-            else:
-
-                # Filter non-english news articles
-                news_df = self.filter_non_english_news_items(news_df)
-
-                # Fetch full news articles
-                #news_df = self.fetch_all_full_text(news_df)
-
-                # Detect news sentiment
-                news_df['news_sentiment'] = news_df.apply(self.detect_news_sentiment, axis=1)
-
-                # Calculate score
-                news_sentiment_score = self.calculate_news_sentiment_score(news_df)
-
-            row = pd.DataFrame({'symbol': [symbol], 'news_sentiment_score': [news_sentiment_score]})
-            results_df = pd.concat([results_df, row], axis=0, ignore_index=True)
+        progress = ProgressLogger("Loading stock news for", len(symbol_list))
+        # The parse pool is stopped even when a symbol fails
+        try:
+            for symbol in symbol_list:
+                progress.update(symbol)
 
-            i += 1
+                # Responses are cached by FmpClient
+                news_df = self.fmp_client.get_stock_news(symbol, news_article_limit)
+                if news_df is None or len(news_df) == 0:
+                    logw("No news for {}", symbol)
+                    continue
+
+                # Filter - only keep news from last 30 days
+                start_date = datetime.today() - timedelta(days=30)
+                news_df = news_df[news_df['publishedDate'] >= start_date]
+
+                if len(news_df) == 0:
+                    logw("No news stories in the last month for {}", symbol)
+                    news_sentiment_score = 0
+                else:
+                    # One row per story, so copies of a story don't inflate the score
+                    news_df = collapse_duplicates(news_df.copy(), ['title', 'text'], self.duplicate_index)
+
+                    # Filter non-english news articles
+                    news_df = self.filter_non_english_news_items(news_df)
+
+                    # Fetch full news articles
+                    if FETCH_FULL_ARTICLE_TEXT:
+                        news_df = self.fetch_all_full_text(news_df)
+
+                    # Detect news sentiment
+                    news_df['news_sentiment'] = news_df.apply(self.detect_cluster_sentiment, axis=1)
+
+                    # Calculate score
+                    news_sentiment_score = self.calculate_news_sentiment_score(news_df)
+
+                row = pd.DataFrame({'symbol': [symbol], 'news_sentiment_score': [news_sentiment_score]})
+                results_df = pd.concat([results_df, row], axis=0, ignore_index=True)
+        finally:
+            self.article_text_loader.close()
 
         # Cap values
         results_df = cap_outliers(results_df, 'news_sentiment_score')
@@ -0,0 +1,183 @@
+import os
+import threading
+import pandas as pd
+from datetime import datetime, timedelta
+from enums import DataRefreshInterval
+from data_loaders.market_symbol_loader import MarketSymbolLoader, MarketIndex
+from utils.log_utils import *
+from utils.instrumentation_utils import instrument
+
+UNIVERSE_CACHE_DIR = os.path.join("cache", "universe")
+UNIVERSE_REFRESH_INTERVAL = DataRefreshInterval.WEEKLY
+MAX_SNAPSHOT_VERSIONS = 12
+VERSION_FORMAT = "%Y%m%d%H%M%S"
+
+# In-process memo of loaded snapshots: (market index, version) -> symbols DataFrame
+_snapshot_memo = {}
+_memo_lock = threading.Lock()
+_refreshing = set()
+
+
+def get_refresh_timedelta(refresh_interval: DataRefreshInterval):
+    if refresh_interval == DataRefreshInterval.DAILY:
+        return timedelta(days=1)
+    elif refresh_interval == DataRefreshInterval.WEEKLY:
+        return timedelta(weeks=1)
+    elif refresh_interval == DataRefreshInterval.MONTHLY:
+        return timedelta(days=30)
+    return None
+
+
+class MarketUniverseLoader:
+    """
+    Serves index constituents from versioned local snapshots.
+
+    Snapshots are refreshed from Wikipedia by MarketSymbolLoader when they are older than the refresh interval.
+    A stale snapshot is still served while the refresh runs in the background, so HTML parsing only
+    blocks a caller when no snapshot exists at all.
+
+    Attributes:
+        cache_dir (str): Directory holding one sub-directory of snapshots per market index
+        refresh_interval (DataRefreshInterval): Maximum snapshot age before a refresh is triggered
+    """
+    def __init__(self, cache_dir=UNIVERSE_CACHE_DIR, refresh_interval=UNIVERSE_REFRESH_INTERVAL):
+        self.cache_dir = cache_dir
+        self.refresh_interval = refresh_interval
+        self.market_symbol_loader = MarketSymbolLoader()
+
+    def _get_index_dir(self, market_index: MarketIndex):
+        return os.path.join(self.cache_dir, market_index.value.lower())
+
+    def list_versions(self, market_index: MarketIndex):
+        """
+        Lists the stored snapshot versions of a market index, oldest first.
+        """
+        index_dir = self._get_index_dir(market_index)
+        if not os.path.exists(index_dir):
+            return []
+        return sorted(file_name[:-4] for file_name in os.listdir(index_dir) if file_name.endswith(".csv"))
+
+    def _load_version(self, market_index: MarketIndex, version: str):
+        key = (market_index, version)
+        with _memo_lock:
+            if key in _snapshot_memo:
+                return _snapshot_memo[key]
+
+        path = os.path.join(self._get_index_dir(market_index), f"{version}.csv")
+        symbols_df = pd.read_csv(path)
+        with _memo_lock:
+            _snapshot_memo[key] = symbols_df
+        return symbols_df
+
+    def _is_stale(self, version: str):
+        max_age = get_refresh_timedelta(self.refresh_interval)
+        if max_age is None:
+            return False
+        return datetime.now() - datetime.strptime(version, VERSION_FORMAT) > max_age
+
+    @instrument()
+    def refresh(self, market_index: MarketIndex):
+        """
+        Fetches the current constituents and stores them as a new snapshot version.
+
+        Returns:
+            str: The new version, or the latest existing version if the fetch failed.
+        """
+        symbols_df = self.market_symbol_loader.fetch_symbols(market_index, cache_file=False)
+        versions = self.list_versions(market_index)
+        if symbols_df is None or len(symbols_df) == 0:
+            logw("Could not refresh constituents of {}", market_index.value)
+            return versions[-1] if versions else None
+
+        index_dir = self._get_index_dir(market_index)
+        os.makedirs(index_dir, exist_ok=True)
+        version = datetime.now().strftime(VERSION_FORMAT)
+        symbols_df.to_csv(os.path.join(index_dir, f"{version}.csv"), index=False)
+        with _memo_lock:
+            _snapshot_memo[(market_index, version)] = symbols_df
+
+        # Drop the oldest snapshots
+        for old_version in versions[:max(0, len(versions) + 1 - MAX_SNAPSHOT_VERSIONS)]:
+            os.remove(os.path.join(index_dir, f"{old_version}.csv"))
+            with _memo_lock:
+                _snapshot_memo.pop((market_index, old_version), None)
+
+        logi("Stored {} constituents of {} as version {}", len(symbols_df), market_index.value, version)
+        return version
+
+    def _refresh_in_background(self, market_index: MarketIndex):
+        with _memo_lock:
+            if market_index in _refreshing:
+                return
+            _refreshing.add(market_index)
+
+        def run_refresh():
+            try:
+                self.refresh(market_index)
+            finally:
+                with _memo_lock:
+                    _refreshing.discard(market_index)
+
+        threading.Thread(target=run_refresh, daemon=True).start()
+
+    @instrument()
+    def get_snapshot(self, market_index: MarketIndex, version: str = None):
+        """
+        Returns the constituents DataFrame of a market index.
+
+        Parameters:
+            market_index (MarketIndex): The market index.
+            version (str): Snapshot version. Defaults to the latest one.
+
+        Returns:
+            DataFrame: dataframe with list of symbols and additional info.
+        """
+        if version is not None:
+            return self._load_version(market_index, version)
+
+        versions = self.list_versions(market_index)
+        if not versions:
+            # Cold start - nothing to serve yet
+            version = self.refresh(market_index)
+            if version is None:
+                return None
+            return self._load_version(market_index, version)
+
+        latest_version = versions[-1]
+        if self._is_stale(latest_version):
+            self._refresh_in_background(market_index)
+        return self._load_version(market_index, latest_version)
+
+    def get_symbol_list(self, market_index: MarketIndex, version: str = None):
+        symbols_df = self.get_snapshot(market_index, version)
+        if symbols_df is None:
+            return []
+        return list(symbols_df['symbol'].dropna().unique())
+
+    def get_symbols(self, market_index: MarketIndex, version: str = None):
+        return set(self.get_symbol_list(market_index, version))
+
+    def union(self, *market_indexes: MarketIndex):
+        symbols = set()
+        for market_index in market_indexes:
+            symbols |= self.get_symbols(market_index)
+        return symbols
+
+    def intersect(self, *market_indexes: MarketIndex):
+        if not market_indexes:
+            return set()
+        symbols = self.get_symbols(market_indexes[0])
+        for market_index in market_indexes[1:]:
+            symbols &= self.get_symbols(market_index)
+        return symbols
+
+    def diff(self, market_index: MarketIndex, from_version: str, to_version: str = None):
+        """
+        Compares two snapshots of a market index.
+
+        Returns:
+            tuple: (added symbols, removed symbols) going from from_version to to_version (default latest).
+        """
+        from_symbols = self.get_symbols(market_index, from_version)
+        to_symbols = self.get_symbols(market_index, to_version)
+        return to_symbols - from_symbols, from_symbols - to_symbols
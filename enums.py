@@ -12,3 +12,9 @@ class DataRefreshInterval(Enum):
     WEEKLY = 2
     MONTHLY = 3
 
+
+class RequestPriority(Enum):
+    # Lower values are dispatched first
+    CRITICAL = 0  # Gates the rest of a run, e.g. screener results and universe prices
+    NORMAL = 1
+    OPTIONAL = 2  # Enrichment a report can do without, e.g. news and social sentiment
@@ -18,6 +18,12 @@ from analysis_tools.market_segment_growth_candidate_finder import MarketSegmentG
 from analysis_tools.news_catalyst_finder import NewsCatalystFinder
 from analysis_tools.market_player_stats_fetcher import MarketLeaderStatsFetcher
 from analysis_tools.estimated_growth_candidate_finder import  EstimatedGrowthCandidateFinder
+from data_loaders.market_symbol_loader import MarketIndex
+from data_loaders.market_universe_loader import MarketUniverseLoader
+from utils.instrumentation_utils import trace_run
+from utils.cache_manager import get_cache_manager
+from utils.deadline_utils import run_deadline
+from datetime import timedelta
 import schedule
 import time
 
@@ -26,93 +32,130 @@ import time
 FMP_API_KEY = get_os_variable('FMP_API_KEY')
 TIINGO_API_KEY = get_os_variable('TIINGO_API_KEY')
 
+# Time budgets of the scheduled runs, each run should finish before the next scheduled job starts
+PRICE_TARGET_RUN_BUDGET = timedelta(minutes=8)
+ANALYST_RATINGS_RUN_BUDGET = timedelta(minutes=19)
+TREND_PULLBACK_RUN_BUDGET = timedelta(minutes=14)
+PENNY_STOCK_RUN_BUDGET = timedelta(minutes=100)
+NEWS_CATALYST_RUN_BUDGET = timedelta(hours=21)
 
+
+@trace_run("market_leader_stats_fetcher")
 def run_market_leader_stats_fetcher():
     fetcher = MarketLeaderStatsFetcher(fmp_api_key=FMP_API_KEY)
     fetcher.fetch_stats()
 
 
+@trace_run("market_segment_growth_stock_finder")
 def run_market_segment_growth_stock_finder():
     market_segment_growth_stock_finder = MarketSegmentGrowthCandidateFinder(FMP_API_KEY)
     market_segment_growth_stock_finder.find_candidates()
 
 
+@trace_run("penny_stock_finder")
+@run_deadline(PENNY_STOCK_RUN_BUDGET)
 def run_penny_stock_finder():
     penny_stock_finder = PennyStockFinder(FMP_API_KEY)
     penny_stock_finder.find_candidates()
 
 
+@trace_run("overvalued_stock_finder")
 def run_overvalued_stock_finder():
     candidate_finder = OvervaluedStockCandidateFinder(FMP_API_KEY)
     candidate_finder.find_candidates()
 
 
+@trace_run("value_stock_finder")
 def run_value_stock_finder():
     candidate_finder = ValueStockCandidateFinder(FMP_API_KEY)
     candidate_finder.find_candidates()
 
+@trace_run("trend_pullback_finder")
+@run_deadline(TREND_PULLBACK_RUN_BUDGET)
 def run_trend_pullback_finder():
     trend_pullback_finder = TrendPullbackFinder(TIINGO_API_KEY)
     trend_pullback_finder.find_trend_pullbacks()
 
+@trace_run("news_catalyst_finder")
+@run_deadline(NEWS_CATALYST_RUN_BUDGET)
 def run_news_catalyst_finder():
     catalyst_finder = NewsCatalystFinder(TIINGO_API_KEY)
     catalyst_finder.find_catalysts()
 
 
+@trace_run("profile_finder")
 def run_profile_finder():
     profile_finder = ProfileBuilder(fmp_api_key=FMP_API_KEY)
     profile_finder.build_profiles()
 
 
+@trace_run("price_target_candidate_finder")
+@run_deadline(PRICE_TARGET_RUN_BUDGET)
 def run_price_target_candidate_finder():
     finder = PriceTargetCandidateFinder(fmp_api_key=FMP_API_KEY)
     finder.find_candidates()
 
 
+@trace_run("analyst_ratings_candidate_finder")
+@run_deadline(ANALYST_RATINGS_RUN_BUDGET)
 def run_analyst_ratings_candidate_finder():
     finder = AnalystRatingsCandidateFinder(fmp_api_key=FMP_API_KEY)
     finder.find_candidates()
 
 
+@trace_run("deep_discount_growth_screener")
 def run_deep_discount_growth_screener():
     screener = DeepDiscountGrowthCandidateFinder(FMP_API_KEY)
     screener.find_candidates()
 
 
+@trace_run("etf_performance_screener")
 def run_etf_performance_screener():
     screener = EtfPerformanceScreener(FMP_API_KEY)
     screener.find_candidates()
 
 
+@trace_run("blue_chip_bargain_candidate_finder")
 def run_blue_chip_bargain_candidate_finder():
     finder = BlueChipBargainCandidateFinder(FMP_API_KEY)
     finder.find_candidates()
 
 
+@trace_run("inst_own_candidate_finder")
 def run_inst_own_candidate_finder():
     finder = InstOwnCandidateFinder(FMP_API_KEY)
     finder.find_candidates()
 
 
+@trace_run("ultimate_finder")
 def run_ultimate_finder():
     finder = UltimateCandidateFinder(FMP_API_KEY)
     finder.find_candidates()
 
 
+@trace_run("highest_return_finder")
 def run_highest_return_finder():
     finder = HighestReturnsFinder(FMP_API_KEY)
     finder.find_candidates()
 
 
+@trace_run("estimated_growth_candidate_finder")
 def run_estimated_growth_candidate_finder():
     finder = EstimatedGrowthCandidateFinder(FMP_API_KEY)
     finder.find_candidates()
 
 
+@trace_run("universe_refresh")
+def run_universe_refresh():
+    universe_loader = MarketUniverseLoader()
+    for market_index in [MarketIndex.SNP_500, MarketIndex.NASDAQ_100, MarketIndex.RUSSELL_1000]:
+        universe_loader.refresh(market_index)
+
+
 def perform_cleanup():
-    # Cleanup log file to avoid excessive growth
-    delete_file(CACHE_DIR, LOG_FILE_NAME)
+    # Log files are rotated and deleted by the logger's retention setting
+    # Drop expired cache entries and keep the cache within its size budget
+    get_cache_manager().cleanup()
 
 
 def schedule_events():
@@ -128,6 +171,7 @@ def schedule_events():
     schedule.every().day.at('03:30').do(run_news_catalyst_finder)
 
 
+    schedule.every().sunday.at('00:30').do(run_universe_refresh)
     schedule.every().sunday.at('01:00').do(perform_cleanup)
 
 
@@ -2,6 +2,7 @@ import pandas as pd
 from datetime import datetime
 from openpyxl.styles import Alignment, numbers
 import os
+from utils.instrumentation_utils import instrument
 
 
 class ExcelScreenerReportGenerator:
@@ -77,6 +78,7 @@ class ExcelScreenerReportGenerator:
 
         return sheet
 
+    @instrument()
     def generate_report(self,
                         data: dict = {},
                         path: str = "reports",
@@ -85,6 +87,11 @@ class ExcelScreenerReportGenerator:
         os.makedirs(path, exist_ok=True)
         full_path = os.path.join(path, file_name)
         with pd.ExcelWriter(full_path) as writer:
+            # Build degraded sections sheet first, so an incomplete report is noticed
+            if 'degraded_sections_data' in data:
+                df = data['degraded_sections_data']
+                self.build_generic_sheet(writer, "Degraded Sections", df)
+
             # Build profile sheet
             if 'profile_data' in data:
                 profile_data = data['profile_data']
@@ -2,6 +2,7 @@ import pandas as pd
 from config import *
 from utils.fmp_client import FmpClient
 from utils.log_utils import *
+from utils.debug_artifact_utils import get_debug_artifact_sink
 from utils.file_utils import *
 import time
 
@@ -10,6 +11,7 @@ import time
 class FmpAnalystRatingsLoader:
     def __init__(self, fmp_api_key):
         self.fmp_client = FmpClient(fmp_api_key)
+        self.debug_artifact_sink = get_debug_artifact_sink()
 
     def aggregate_rating_counts(self, symbol, grades_df):
         strong_buy_count = 0
@@ -62,15 +64,15 @@ class FmpAnalystRatingsLoader:
         #  Fetch all symbols
         symbols = symbol_list
         #  Iterate through symbols
-        i = 1
+        progress = ProgressLogger("Loading analyst ratings for", len(symbol_list))
         results_df = pd.DataFrame({})
         for symbol in symbols:
-            logd(f"Loading analyst ratings for {symbol}... ({i}/{len(symbol_list)})")
+            progress.update(symbol)
 
             # Fetch analyst data
             grades_df = self.fmp_client.get_analyst_ratings(symbol)
             if grades_df is None or len(grades_df) == 0:
-                logw(f"No grades for {symbol}")
+                logw("No grades for {}", symbol)
                 continue
 
             # Filter out data more than x months in the past
@@ -81,13 +83,11 @@ class FmpAnalystRatingsLoader:
             grades_df = self.aggregate_rating_counts(symbol, grades_df)
 
             # Store grades for review
-            store_csv(CACHE_DIR, f"{symbol}_analyst_ratings.csv", grades_df)
+            self.debug_artifact_sink.add("analyst_ratings", symbol, grades_df)
 
             #  Add individual stock results to all results
             total_rating = grades_df['total_rating'].iloc[0]
             row = pd.DataFrame({'symbol': [symbol], 'analyst_rating_score': [total_rating]})
             results_df = pd.concat([results_df, row], axis=0, ignore_index=True)
 
-            i += 1
-
         return results_df
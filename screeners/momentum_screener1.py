@@ -1,5 +1,6 @@
 import pandas as pd
 from utils.log_utils import *
+from utils.debug_artifact_utils import get_debug_artifact_sink
 from utils.file_utils import *
 import time
 from datetime import datetime, timedelta
@@ -11,12 +12,12 @@ from datetime import datetime, timedelta
 
 class MomentumScreener1:
     def __init__(self):
-        pass
+        self.debug_artifact_sink = get_debug_artifact_sink()
 
     def calculate_momentum_factor(self, symbol, prices_df):
         # Check minimum length
         if len(prices_df) < 252:
-            logw(f"Not enough price data for {symbol}")
+            logw("Not enough price data for {}", symbol)
             return 0
         # Current price (latest)
         current_price = prices_df['close'][
@@ -31,7 +32,7 @@ class MomentumScreener1:
         return round(start_month_change, 4)
 
     def run(self, symbol_list, prices_dict):
-        logi(f"Calculating momentum....")
+        logi("Calculating momentum....")
         momentum_df = pd.DataFrame()
         lookback_days = 400
         i = 1
@@ -40,14 +41,14 @@ class MomentumScreener1:
 
             # Get prices
             if symbol not in prices_dict:
-                logw(f"No prices for {symbol}")
+                logw("No prices for {}", symbol)
                 continue
             prices_df = prices_dict[symbol]
 
             # Fetch price history
             start_date = datetime.today() - timedelta(days=lookback_days)
             prices_df = prices_df[prices_df.index >= start_date]
-            store_csv(CACHE_DIR, f"{symbol}_prices.csv", prices_df)
+            self.debug_artifact_sink.add("prices", symbol, prices_df)
 
             # Calculate momentum factor
             momentum_factor = self.calculate_momentum_factor(symbol, prices_df)
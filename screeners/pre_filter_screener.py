@@ -0,0 +1,84 @@
+import pandas as pd
+from utils.fmp_client import FmpClient
+from utils.log_utils import *
+
+"""
+ Pre-filter screener applies cheap gates on bulk data before any expensive per-symbol endpoint is called
+"""
+
+
+class PreFilterScreener:
+    def __init__(self, fmp_api_key: str = ''):
+        self.fmp_client = FmpClient(fmp_api_key)
+
+    def fetch_quotes(self, exchange_list="nyse,nasdaq,amex"):
+        # One bulk call per exchange instead of one call per symbol
+        quotes_df_list = []
+        for exchange in exchange_list.split(","):
+            quotes_df = self.fmp_client.fetch_exchange_quotes(exchange)
+            if quotes_df is not None and len(quotes_df) > 0:
+                quotes_df_list.append(quotes_df)
+        if not quotes_df_list:
+            return None
+        return pd.concat(quotes_df_list, axis=0, ignore_index=True)
+
+    def run(self, stock_list_df, exchange_list="nyse,nasdaq,amex", exclude_foreign=True,
+            min_price=None, max_price=None, min_volume=None, min_market_cap=None, max_beta=None,
+            sector_list=None, min_momentum=None, min_price_drop_percent=None):
+        """
+        Filters stock screener results with thresholds that need no per-symbol API calls.
+
+        Momentum (price vs. 200-day average) and the drop from the 52-week high come from the bulk
+        exchange quotes, which are only fetched if one of those thresholds is set. Symbols missing from the
+        quotes are kept. A threshold of None disables its gate.
+        """
+        if stock_list_df is None or len(stock_list_df) == 0:
+            return stock_list_df
+        num_symbols = len(stock_list_df)
+        df = stock_list_df
+        # Gate -> symbols it removed
+        num_cut = {}
+
+        def apply_gate(gate_name, mask):
+            num_cut[gate_name] = int((~mask).sum())
+            return df[mask]
+
+        # Skip stocks from other countries
+        if exclude_foreign:
+            df = apply_gate("foreign", ~df['symbol'].str.contains(".", regex=False))
+
+        if min_price is not None:
+            df = apply_gate("min_price", df['price'] >= min_price)
+        if max_price is not None:
+            df = apply_gate("max_price", df['price'] <= max_price)
+        if min_volume is not None:
+            df = apply_gate("min_volume", df['volume'] >= min_volume)
+        if min_market_cap is not None:
+            df = apply_gate("min_market_cap", df['marketCap'] >= min_market_cap)
+        if max_beta is not None:
+            df = apply_gate("max_beta", df['beta'] <= max_beta)
+        if sector_list is not None:
+            if 'sector' in df.columns:
+                df = apply_gate("sector", df['sector'].isin(sector_list))
+            else:
+                logw("Stock screener results have no sector - skipping sector filter")
+
+        if min_momentum is not None or min_price_drop_percent is not None:
+            quotes_df = self.fetch_quotes(exchange_list)
+            if quotes_df is None:
+                logw("No bulk quotes returned - skipping momentum and 52-week high filters")
+            else:
+                quotes_df = quotes_df[['symbol', 'yearHigh', 'priceAvg200']].drop_duplicates(subset='symbol')
+                # Keep symbols without a quote, they can't be judged here
+                df = df.merge(quotes_df, on='symbol', how='left')
+                df['momentum'] = df['price'] / df['priceAvg200'] - 1
+                df['price_drop_percent'] = (df['yearHigh'] - df['price']) / df['yearHigh']
+                if min_momentum is not None:
+                    df = apply_gate("min_momentum", (df['momentum'] >= min_momentum) | df['momentum'].isna())
+                if min_price_drop_percent is not None:
+                    df = apply_gate("min_price_drop_percent", (df['price_drop_percent'] >= min_price_drop_percent)
+                                    | df['price_drop_percent'].isna())
+
+        logi("Pre-filter screener kept {} of {} symbols, cut {}", len(df), num_symbols,
+             ", ".join(f"{gate_name}={count}" for gate_name, count in num_cut.items()) or "none")
+        return df
@@ -0,0 +1,82 @@
+import time
+import pandas as pd
+from utils.log_utils import *
+
+"""
+ Screener pipeline runs screener stages one after another, each stage only sees the previous stage's survivors
+"""
+
+
+class ScreenerStage:
+    """
+    A single step of a screener pipeline
+
+    Attributes:
+        name (str): Stage name used in the stats
+        run_func (callable): Takes a symbol list and returns a DataFrame with a 'symbol' column for the survivors
+        cost (float): Estimated cost per symbol, e.g. number of API calls
+        selectivity (float): Estimated fraction of symbols that pass the stage (0-1)
+    """
+    def __init__(self, name: str, run_func, cost: float = 1.0, selectivity: float = 1.0):
+        self.name = name
+        self.run_func = run_func
+        self.cost = cost
+        self.selectivity = selectivity
+
+    def get_rank(self):
+        # Cheap stages that drop many symbols go first
+        if self.selectivity >= 1.0:
+            return float('inf')
+        return self.cost / (1.0 - self.selectivity)
+
+
+class ScreenerPipeline:
+    def __init__(self, stages: list = None):
+        self.stages = stages or []
+        self.stats = []
+
+    def add_stage(self, name: str, run_func, cost: float = 1.0, selectivity: float = 1.0):
+        self.stages.append(ScreenerStage(name, run_func, cost, selectivity))
+        return self
+
+    def get_ordered_stages(self):
+        # sorted() is stable, so stages with equal rank keep the order they were added in
+        return sorted(self.stages, key=lambda stage: stage.get_rank())
+
+    def run(self, symbol_list):
+        """
+        Runs all stages ordered by estimated cost and selectivity.
+
+        Returns:
+            DataFrame: The columns of all stages merged for the symbols that passed every stage.
+        """
+        self.stats = []
+        merged_df = pd.DataFrame({'symbol': list(symbol_list)})
+
+        for stage in self.get_ordered_stages():
+            symbols_in = merged_df['symbol'].unique()
+            start_time = time.perf_counter()
+            stage_df = stage.run_func(symbols_in) if len(symbols_in) > 0 else None
+            elapsed = time.perf_counter() - start_time
+
+            if stage_df is None or len(stage_df) == 0:
+                merged_df = merged_df.iloc[0:0]
+            else:
+                merged_df = pd.merge(merged_df, stage_df, on='symbol', how='inner')
+
+            self.stats.append({
+                'stage': stage.name,
+                'rows_in': len(symbols_in),
+                'rows_out': len(merged_df),
+                'seconds': round(elapsed, 2)
+            })
+            logi("Stage {}: {} -> {} symbols in {:.2f}s", stage.name, len(symbols_in), len(merged_df), elapsed)
+
+            if merged_df.empty:
+                logi("No symbols left after stage {}", stage.name)
+                break
+
+        return merged_df
+
+    def get_stats_df(self):
+        return pd.DataFrame(self.stats, columns=['stage', 'rows_in', 'rows_out', 'seconds'])
@@ -29,16 +29,16 @@ class UndervaluedScreener1:
         return trend_slope
 
     def run(self, symbol_list, prices_dict):
-        logi(f"Calculating trends....")
+        logi("Calculating trends....")
         trends_df = pd.DataFrame()
 
-        i = 1
+        progress = ProgressLogger("Calculating trends for", len(symbol_list))
         for symbol in symbol_list:
-            logd(f"Calculating trends for {symbol}... ({i}/{len(symbol_list)})")
+            progress.update(symbol)
 
             # Get prices
             if symbol not in prices_dict:
-                logw(f"No prices for {symbol}")
+                logw("No prices for {}", symbol)
                 continue
             prices_df = prices_dict[symbol]
 
@@ -54,7 +54,6 @@ class UndervaluedScreener1:
                                 'price_below_ema': [price_below_ema],
                                 'short_term_trend': [current_trend]})
             trends_df = pd.concat([trends_df, row], axis=0, ignore_index=True)
-            i += 1
 
         # Perform filters
         trends_df = trends_df[trends_df['price_below_ema'] == 1]
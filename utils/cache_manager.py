@@ -0,0 +1,422 @@
+import io
+import json
+import time
+import atexit
+import hashlib
+import threading
+import pandas as pd
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from utils.log_utils import *
+from utils.instrumentation_utils import count
+from utils.json_utils import loads, dumps
+from utils.compression_utils import PayloadCompressor, DICTIONARY_DIR_NAME
+
+"""
+Cache manager for the per-symbol data caches.
+
+Entries live in sharded sub-directories (cache/<namespace>/<shard>/<key>.<ext>) so no directory grows to
+hundreds of thousands of files. An in-memory index, persisted to cache/cache_index.json, answers lookups without
+touching the file system, expires entries per namespace and evicts the least recently used entries once the
+cache grows beyond its byte budget. Processes sharing the cache merge their index into the file under a lock
+file instead of overwriting each other, and cleanup() reconciles the index with the files on disk so files
+written before a crash are still expired and evicted. Payloads are stored as compressed blobs (.csvz/.jsonz, see
+utils/compression_utils.py) and decompressed on read, plain .csv/.json entries written earlier are still read.
+"""
+
+CACHE_INDEX_FILE_NAME = "cache_index.json"
+CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2 GB
+CACHE_EVICTION_TARGET = 0.9  # Evict down to this fraction of the budget
+CACHE_INDEX_FLUSH_SECONDS = 600  # Persist the index at most this often while running, and at exit and in cleanup()
+CACHE_INDEX_LOCK_TIMEOUT = 30  # Seconds to wait for the index lock of another process
+CACHE_INDEX_STALE_LOCK_AGE = 120  # Seconds after which a lock left by a crashed process is broken
+NUM_SHARD_CHARS = 2  # 256 shards per namespace
+
+# Time to live per namespace
+CACHE_TTLS = {
+    'growth_data': timedelta(days=7),
+    'company_outlook': timedelta(days=1),
+    'http_responses': timedelta(days=120),  # Retention only, the HTTP cache decides about freshness
+    'article_text': timedelta(days=30),
+}
+DEFAULT_CACHE_TTL = timedelta(days=1)
+
+
+class CacheManager:
+    """
+    Stores DataFrames and JSON documents by namespace and key
+
+    Attributes:
+        cache_dir (str): Root cache directory
+        max_bytes (int): Byte budget of all managed entries
+        ttls (dict): Namespace -> time to live
+        compress (bool): Store payloads as compressed blobs
+    """
+    def __init__(self, cache_dir: str = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES, ttls: dict = None,
+                 compress: bool = CACHE_COMPRESSION_ENABLED):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttls = ttls if ttls is not None else CACHE_TTLS
+        self.compress = compress
+        self.compressors = {}
+        self.index_path = os.path.join(cache_dir, CACHE_INDEX_FILE_NAME)
+        self.index_lock_path = f"{self.index_path}.lock"
+        # Entries removed and written since the index was last saved, for merging with other processes
+        self.removed_ids = set()
+        self.written_ids = set()
+        self.lock = threading.RLock()
+        self.total_bytes = 0
+        self.num_changes = 0
+        self.last_save_time = time.time()
+        # "namespace/key" -> {'path', 'size', 'created', 'accessed'}, least recently used first
+        self.index = OrderedDict()
+        self.load_index()
+
+    def _get_entry_id(self, namespace: str, key: str):
+        return f"{namespace}/{key}"
+
+    def _get_path(self, namespace: str, key: str, extension: str):
+        shard = hashlib.md5(key.encode()).hexdigest()[:NUM_SHARD_CHARS]
+        return os.path.join(self.cache_dir, namespace, shard, f"{key}.{extension}")
+
+    def _get_compressor(self, namespace: str):
+        with self.lock:
+            if namespace not in self.compressors:
+                # Processes sharing the cache train dictionaries under the index lock
+                self.compressors[namespace] = PayloadCompressor(namespace,
+                                                                os.path.join(self.cache_dir, DICTIONARY_DIR_NAME),
+                                                                file_lock=self._index_file_lock)
+            return self.compressors[namespace]
+
+    def _read_payload(self, namespace: str, path: str):
+        with open(path, "rb") as payload_file:
+            return self._get_compressor(namespace).decompress(payload_file.read())
+
+    def _write_payload(self, namespace: str, key: str, extension: str, payload: bytes):
+        """
+        Writes a payload, compressed if enabled, and returns the path.
+        """
+        if self.compress:
+            payload = self._get_compressor(namespace).compress(payload)
+            extension += "z"
+        path = self._get_path(namespace, key, extension)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as payload_file:
+            payload_file.write(payload)
+        return path
+
+    def _get_ttl(self, namespace: str):
+        return self.ttls.get(namespace, DEFAULT_CACHE_TTL)
+
+    def _is_expired(self, namespace: str, entry: dict):
+        ttl = self._get_ttl(namespace)
+        if ttl is None:
+            return False
+        return datetime.now().timestamp() - entry['created'] > ttl.total_seconds()
+
+    def load_index(self):
+        with self.lock:
+            self.index = OrderedDict()
+            if os.path.exists(self.index_path):
+                try:
+                    entries = self._read_index_file()
+                    # Stored least recently used first
+                    self.index = OrderedDict(sorted(entries.items(), key=lambda item: item[1]['accessed']))
+                except Exception as ex:
+                    logw("Cache index unreadable, rebuilding: {}", ex)
+                    self.rebuild_index()
+            else:
+                self.rebuild_index()
+            self.total_bytes = sum(entry['size'] for entry in self.index.values())
+
+    def _read_index_file(self):
+        with open(self.index_path, "r") as index_file:
+            return json.load(index_file)
+
+    def _scan_files(self):
+        """
+        Returns the files of the managed namespaces as an entry id -> entry dictionary.
+        """
+        entries = {}
+        for namespace in self.ttls.keys():
+            namespace_dir = os.path.join(self.cache_dir, namespace)
+            if not os.path.exists(namespace_dir):
+                continue
+            for shard_entry in os.scandir(namespace_dir):
+                if not shard_entry.is_dir():
+                    continue
+                for file_entry in os.scandir(shard_entry.path):
+                    stat = file_entry.stat()
+                    key = os.path.splitext(file_entry.name)[0]
+                    entries.setdefault(self._get_entry_id(namespace, key), []).append({
+                        'path': file_entry.path,
+                        'size': stat.st_size,
+                        'created': stat.st_mtime,
+                        'accessed': stat.st_atime
+                    })
+        return entries
+
+    def rebuild_index(self):
+        """
+        Rebuilds the index from the files of the managed namespaces.
+        """
+        with self.lock:
+            # Of several files of one key (e.g. .json and .jsonz) the newest one is the entry
+            entries = [(entry_id, max(file_entries, key=lambda entry: entry['created']))
+                       for entry_id, file_entries in self._scan_files().items()]
+            self.index = OrderedDict(sorted(entries, key=lambda item: item[1]['accessed']))
+            self.total_bytes = sum(entry['size'] for entry in self.index.values())
+            self.save_index()
+
+    def reconcile_index(self):
+        """
+        Brings the index in line with the files on disk: files no index knows about, e.g. written by a process that
+        crashed before saving its index, are added so they expire and count against the budget, index entries
+        whose file is gone are dropped and superseded files of an entry are deleted.
+        """
+        with self.lock:
+            files = self._scan_files()
+            num_missing = 0
+            for entry_id in [entry_id for entry_id, entry in self.index.items()
+                             if not os.path.exists(entry['path'])]:
+                self.total_bytes -= self.index.pop(entry_id)['size']
+                num_missing += 1
+
+            num_orphans = 0
+            for entry_id, file_entries in files.items():
+                entry = self.index.get(entry_id)
+                newest_entry = max(file_entries, key=lambda file_entry: file_entry['created'])
+                # Another process may have written a newer file of the key, e.g. with compression switched on
+                if entry is None or (newest_entry['path'] != entry['path']
+                                     and newest_entry['created'] > entry['created']):
+                    if entry is not None:
+                        self.total_bytes -= entry['size']
+                    entry = newest_entry
+                    self.index[entry_id] = entry
+                    self.total_bytes += entry['size']
+                    num_orphans += 1
+                for file_entry in file_entries:
+                    if file_entry['path'] != entry['path']:
+                        os.remove(file_entry['path'])
+                        num_orphans += 1
+
+            if num_orphans or num_missing:
+                self.index = OrderedDict(sorted(self.index.items(), key=lambda item: item[1]['accessed']))
+                self._record_change()
+            return num_orphans, num_missing
+
+    @contextmanager
+    def _index_file_lock(self):
+        """
+        Holds the lock file of the index across processes. A lock older than CACHE_INDEX_STALE_LOCK_AGE is broken.
+        """
+        start_time = time.time()
+        lock_fd = None
+        while lock_fd is None:
+            try:
+                lock_fd = os.open(self.index_lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.index_lock_path) > CACHE_INDEX_STALE_LOCK_AGE:
+                        os.remove(self.index_lock_path)
+                        continue
+                except OSError:
+                    continue
+                if time.time() - start_time > CACHE_INDEX_LOCK_TIMEOUT:
+                    raise TimeoutError(f"Cache index locked by another process: {self.index_lock_path}")
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            os.close(lock_fd)
+            os.remove(self.index_lock_path)
+
+    def _merge_index_file(self):
+        """
+        Adds the entries other processes saved since this index was loaded.
+        """
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            saved_entries = self._read_index_file()
+        except Exception as ex:
+            logw("Cache index unreadable, overwriting it: {}", ex)
+            return
+        num_merged = 0
+        for entry_id, saved_entry in saved_entries.items():
+            entry = self.index.get(entry_id)
+            if entry is None:
+                if entry_id in self.removed_ids or not os.path.exists(saved_entry['path']):
+                    continue
+                self.index[entry_id] = saved_entry
+                self.total_bytes += saved_entry['size']
+                num_merged += 1
+            elif saved_entry['path'] == entry['path']:
+                entry['accessed'] = max(entry['accessed'], saved_entry['accessed'])
+        # Entries this process didn't write that are gone from the saved index were removed by another process
+        for entry_id in [entry_id for entry_id, entry in self.index.items()
+                         if entry_id not in saved_entries and entry_id not in self.written_ids
+                         and not os.path.exists(entry['path'])]:
+            self.total_bytes -= self.index.pop(entry_id)['size']
+        if num_merged:
+            self.index = OrderedDict(sorted(self.index.items(), key=lambda item: item[1]['accessed']))
+
+    def save_index(self):
+        with self.lock:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with self._index_file_lock():
+                    self._merge_index_file()
+                    temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+                    with open(temp_path, "w") as index_file:
+                        json.dump(self.index, index_file)
+                    os.replace(temp_path, self.index_path)
+                self.removed_ids = set()
+                self.written_ids = set()
+                self.num_changes = 0
+                self.last_save_time = time.time()
+            except Exception as ex:
+                loge(f"Failed to save cache index: {ex}")
+
+    def _record_change(self):
+        # Saving merges and rewrites the whole index, so it is done on a timer rather than per number of changes.
+        # Entries written after the last save are still found by reconcile_index() after a crash.
+        self.num_changes += 1
+        if time.time() - self.last_save_time >= CACHE_INDEX_FLUSH_SECONDS:
+            self.save_index()
+
+    def _lookup(self, namespace: str, key: str):
+        """
+        Returns the path of a valid entry and marks it as recently used, None on a miss.
+        """
+        entry_id = self._get_entry_id(namespace, key)
+        with self.lock:
+            entry = self.index.get(entry_id)
+            if entry is None:
+                count('cache_misses')
+                return None
+            if self._is_expired(namespace, entry):
+                self._remove(entry_id)
+                count('cache_misses')
+                return None
+            entry['accessed'] = datetime.now().timestamp()
+            self.index.move_to_end(entry_id)
+            count('cache_hits')
+            return entry['path']
+
+    def _register(self, namespace: str, key: str, path: str):
+        entry_id = self._get_entry_id(namespace, key)
+        now = datetime.now().timestamp()
+        with self.lock:
+            if entry_id in self.index:
+                previous_entry = self.index.pop(entry_id)
+                self.total_bytes -= previous_entry['size']
+                # An entry written before compression was switched on or off has another extension
+                if previous_entry['path'] != path and os.path.exists(previous_entry['path']):
+                    os.remove(previous_entry['path'])
+            size = os.path.getsize(path)
+            self.index[entry_id] = {'path': path, 'size': size, 'created': now, 'accessed': now}
+            self.written_ids.add(entry_id)
+            self.total_bytes += size
+            self._record_change()
+            if self.total_bytes > self.max_bytes:
+                self.enforce_budget()
+
+    def _remove(self, entry_id: str):
+        entry = self.index.pop(entry_id, None)
+        if entry is None:
+            return
+        self.removed_ids.add(entry_id)
+        self.total_bytes -= entry['size']
+        try:
+            if os.path.exists(entry['path']):
+                os.remove(entry['path'])
+        except Exception as ex:
+            logw("Failed to delete cache file {}: {}", entry['path'], ex)
+        self._record_change()
+
+    def load_df(self, namespace: str, key: str, parse_dates: list = None):
+        path = self._lookup(namespace, key)
+        if path is None:
+            return None
+        try:
+            return pd.read_csv(io.BytesIO(self._read_payload(namespace, path)), parse_dates=parse_dates)
+        except Exception as ex:
+            logw("Failed to read cache file {}: {}", path, ex)
+            with self.lock:
+                self._remove(self._get_entry_id(namespace, key))
+            return None
+
+    def store_df(self, namespace: str, key: str, df: pd.DataFrame):
+        if df is None:
+            return
+        path = self._write_payload(namespace, key, "csv", df.to_csv(index=False).encode())
+        self._register(namespace, key, path)
+
+    def load_json(self, namespace: str, key: str):
+        path = self._lookup(namespace, key)
+        if path is None:
+            return None
+        try:
+            return loads(self._read_payload(namespace, path))
+        except Exception as ex:
+            logw("Failed to read cache file {}: {}", path, ex)
+            with self.lock:
+                self._remove(self._get_entry_id(namespace, key))
+            return None
+
+    def store_json(self, namespace: str, key: str, data):
+        if data is None:
+            return
+        path = self._write_payload(namespace, key, "json", dumps(data))
+        self._register(namespace, key, path)
+
+    def invalidate(self, namespace: str, key: str):
+        with self.lock:
+            self._remove(self._get_entry_id(namespace, key))
+
+    def evict_expired(self):
+        with self.lock:
+            expired_ids = [entry_id for entry_id, entry in self.index.items()
+                           if self._is_expired(entry_id.split("/", 1)[0], entry)]
+            for entry_id in expired_ids:
+                self._remove(entry_id)
+            return len(expired_ids)
+
+    def enforce_budget(self):
+        """
+        Evicts least recently used entries until the cache is below its eviction target.
+        """
+        with self.lock:
+            num_evicted = 0
+            target_bytes = self.max_bytes * CACHE_EVICTION_TARGET
+            while self.index and self.total_bytes > target_bytes:
+                entry_id = next(iter(self.index))
+                self._remove(entry_id)
+                num_evicted += 1
+            return num_evicted
+
+    def cleanup(self):
+        num_orphans, num_missing = self.reconcile_index()
+        num_expired = self.evict_expired()
+        num_evicted = self.enforce_budget() if self.total_bytes > self.max_bytes else 0
+        self.save_index()
+        logi("Cache cleanup: {} unindexed files, {} missing files, {} expired, {} evicted, {} entries using {:.1f} MB",
+             num_orphans, num_missing, num_expired, num_evicted, len(self.index), self.total_bytes / (1024 * 1024))
+
+
+_cache_manager = None
+_cache_manager_lock = threading.Lock()
+
+
+def get_cache_manager():
+    """
+    Returns the process-wide cache manager, all loaders share one index.
+    """
+    global _cache_manager
+    with _cache_manager_lock:
+        if _cache_manager is None:
+            _cache_manager = CacheManager()
+            atexit.register(_cache_manager.save_index)
+        return _cache_manager
@@ -0,0 +1,100 @@
+import json
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from utils.log_utils import *
+
+"""
+Checkpoints for long per-symbol runs.
+
+Each completed symbol is appended to a JSON lines journal and flushed to disk right away. A run that dies halfway
+is restarted with the same run id (by default the date of the run), loads the journal and only processes the
+symbols that are missing. The journal is deleted when the run completes, journals of runs that never completed
+are deleted after a week.
+"""
+
+JOURNAL_DIR = os.path.join(CACHE_DIR, "journals")
+JOURNAL_RUN_ID_FORMAT = "%Y-%m-%d"
+MAX_JOURNAL_AGE = timedelta(days=7)
+
+
+def to_json_value(value):
+    """
+    Converts numpy and pandas values that json can't serialize.
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.isoformat()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Can't store {type(value).__name__} in a journal")
+
+
+class RunJournal:
+    """
+    Append-only journal of the per-symbol results of a run
+
+    Attributes:
+        name (str): Journal name, usually the finder name
+        run_id (str): Run the results belong to, a restarted run with the same id resumes
+    """
+    def __init__(self, name: str, run_id: str = None, journal_dir: str = JOURNAL_DIR):
+        self.name = name
+        self.run_id = run_id or datetime.today().strftime(JOURNAL_RUN_ID_FORMAT)
+        self.journal_dir = os.path.join(journal_dir, name)
+        self.path = os.path.join(self.journal_dir, f"{self.run_id}.jsonl")
+        os.makedirs(self.journal_dir, exist_ok=True)
+        self.delete_old_journals()
+
+    def delete_old_journals(self):
+        min_time = (datetime.now() - MAX_JOURNAL_AGE).timestamp()
+        for file_name in os.listdir(self.journal_dir):
+            path = os.path.join(self.journal_dir, file_name)
+            if path != self.path and os.path.getmtime(path) < min_time:
+                os.remove(path)
+
+    def load(self):
+        """
+        Returns the results recorded so far as a symbol -> record dictionary. A line cut off by a crash is ignored.
+        """
+        records = {}
+        if not os.path.exists(self.path):
+            return records
+        valid_lines = []
+        has_incomplete_lines = False
+        with open(self.path, "r") as journal_file:
+            for line in journal_file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logw("Skipping incomplete journal line in {}", self.path)
+                    has_incomplete_lines = True
+                    continue
+                records[entry['symbol']] = entry['record']
+                valid_lines.append(line)
+
+        # Drop the incomplete lines so new entries don't get appended to them
+        if has_incomplete_lines:
+            with open(self.path, "w") as journal_file:
+                journal_file.writelines(valid_lines)
+        if records:
+            logi("Resuming {} run {}: {} symbols already done", self.name, self.run_id, len(records))
+        return records
+
+    def append(self, symbol: str, record):
+        """
+        Records the result of a symbol. None marks a symbol that was processed without a result.
+        """
+        line = json.dumps({'symbol': symbol, 'record': record}, default=to_json_value)
+        with open(self.path, "a") as journal_file:
+            journal_file.write(line + "\n")
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+
+    def complete(self):
+        """
+        Deletes the journal once the run has written its results.
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
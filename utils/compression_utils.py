@@ -0,0 +1,202 @@
+import re
+import zlib
+import struct
+import threading
+from contextlib import nullcontext
+from utils.log_utils import *
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+"""
+Compressed cache payloads.
+
+FMP payloads are highly repetitive: every outlook, statement or news record repeats the same field names, so a
+dictionary trained on the first payloads of a namespace compresses the following ones far better than each payload
+on its own. Payloads are compressed with zstandard when it is installed, otherwise with zlib and a preset
+dictionary. Every blob starts with a small header naming the codec and the dictionary, blobs without that header
+are plain payloads written before compression was enabled and are returned as they are.
+
+Dictionaries are stored by id and never overwritten, so blobs stay readable by every process. Processes sharing
+the cache train under a file lock, the first dictionary of a namespace wins and later processes load it instead
+of training their own.
+"""
+
+BLOB_MAGIC = b"FMPZ"
+BLOB_HEADER = struct.Struct(">4scI")  # Magic, codec, dictionary id (0 = no dictionary)
+ZSTD_CODEC = b"s"
+ZLIB_CODEC = b"z"
+ZSTD_LEVEL = 3
+ZLIB_LEVEL = 6
+DICTIONARY_DIR_NAME = "dictionaries"
+DICTIONARY_TRAINING_SAMPLES = 100  # Payloads collected per namespace before the dictionary is trained
+ZSTD_DICTIONARY_SIZE = 112 * 1024
+ZLIB_DICTIONARY_SIZE = 32 * 1024  # zlib only looks back 32 KB
+
+
+def get_codec():
+    return ZSTD_CODEC if zstandard is not None else ZLIB_CODEC
+
+
+def train_dictionary(samples: list, codec: bytes):
+    """
+    Returns a dictionary built from sample payloads, None if there is not enough data.
+    """
+    if codec == ZSTD_CODEC:
+        try:
+            return zstandard.train_dictionary(ZSTD_DICTIONARY_SIZE, samples).as_bytes()
+        except zstandard.ZstdError as ex:
+            logw("Could not train compression dictionary: {}", ex)
+            return None
+    # zlib matches against the end of the dictionary first, so the most recent samples go last
+    dictionary = b"".join(samples)[-ZLIB_DICTIONARY_SIZE:]
+    return dictionary or None
+
+
+class PayloadCompressor:
+    """
+    Compresses the payloads of one cache namespace with a dictionary trained on its first payloads
+
+    Attributes:
+        namespace (str): Cache namespace, e.g. 'company_outlook'
+        dictionary_dir (str): Directory holding the trained dictionaries
+        codec (bytes): ZSTD_CODEC or ZLIB_CODEC
+        file_lock: Context manager factory serializing training across processes, e.g. the cache index lock
+    """
+    def __init__(self, namespace: str, dictionary_dir: str, file_lock=None):
+        self.namespace = namespace
+        self.dictionary_dir = dictionary_dir
+        self.codec = get_codec()
+        self.file_lock = file_lock if file_lock is not None else nullcontext
+        # <namespace>.<codec>.<id>.dict, files without an id were written by earlier versions
+        self.file_pattern = re.compile(rf"{re.escape(namespace)}\.{self.codec.decode()}(?:\.([0-9a-f]{{8}}))?\.dict$")
+        # Dictionary id -> dictionary, older dictionaries are kept to read the blobs written with them
+        self.dictionaries = {}
+        self.dictionary_id = 0
+        self.samples = []
+        self.lock = threading.Lock()
+        # zstandard (de)compressors are expensive to set up with a dictionary and not thread-safe, one per thread
+        self.local = threading.local()
+        self._load_dictionaries()
+
+    def _get_dictionary_path(self, dictionary_id: int):
+        return os.path.join(self.dictionary_dir, f"{self.namespace}.{self.codec.decode()}.{dictionary_id:08x}.dict")
+
+    def _load_dictionaries(self):
+        """
+        Loads the dictionaries on disk that are not loaded yet. The oldest one compresses new payloads.
+        """
+        if not os.path.isdir(self.dictionary_dir):
+            return
+        paths = []
+        for file_name in os.listdir(self.dictionary_dir):
+            match = self.file_pattern.match(file_name)
+            if match is not None:
+                paths.append((os.path.getmtime(os.path.join(self.dictionary_dir, file_name)), file_name, match))
+        for _, file_name, match in sorted(paths):
+            dictionary_id = int(match.group(1), 16) if match.group(1) is not None else None
+            if dictionary_id not in self.dictionaries:
+                with open(os.path.join(self.dictionary_dir, file_name), "rb") as dictionary_file:
+                    dictionary = dictionary_file.read()
+                dictionary_id = zlib.crc32(dictionary) or 1
+                self.dictionaries[dictionary_id] = dictionary
+            if self.dictionary_id == 0:
+                self.dictionary_id = dictionary_id
+
+    def _add_sample(self, data: bytes):
+        with self.lock:
+            if self.dictionary_id != 0:
+                return
+            self.samples.append(data)
+            if len(self.samples) < DICTIONARY_TRAINING_SAMPLES:
+                return
+            with self.file_lock():
+                # Another process may have trained one meanwhile
+                self._load_dictionaries()
+                if self.dictionary_id == 0:
+                    self._train()
+            self.samples = []
+
+    def _train(self):
+        dictionary = train_dictionary(self.samples, self.codec)
+        if dictionary is None:
+            return
+        dictionary_id = zlib.crc32(dictionary) or 1
+        path = self._get_dictionary_path(dictionary_id)
+        os.makedirs(self.dictionary_dir, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as dictionary_file:
+            dictionary_file.write(dictionary)
+        os.replace(temp_path, path)
+        self.dictionaries[dictionary_id] = dictionary
+        self.dictionary_id = dictionary_id
+        logi("Trained compression dictionary for {} ({:.0f} KB)", self.namespace, len(dictionary) / 1024)
+
+    def _get_dictionary(self, dictionary_id: int):
+        if dictionary_id not in self.dictionaries:
+            # Trained by another process after this one started
+            with self.lock:
+                self._load_dictionaries()
+        dictionary = self.dictionaries.get(dictionary_id)
+        if dictionary is None:
+            raise ValueError(f"Compression dictionary {dictionary_id} of {self.namespace} is not available")
+        return dictionary
+
+    def _get_zstd_compressor(self, dictionary_id: int):
+        compressors = getattr(self.local, 'compressors', None)
+        if compressors is None:
+            compressors = self.local.compressors = {}
+        if dictionary_id not in compressors:
+            zstd_dictionary = None
+            if dictionary_id != 0:
+                zstd_dictionary = zstandard.ZstdCompressionDict(self._get_dictionary(dictionary_id))
+                zstd_dictionary.precompute_compress(level=ZSTD_LEVEL)
+            compressors[dictionary_id] = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=zstd_dictionary)
+        return compressors[dictionary_id]
+
+    def _get_zstd_decompressor(self, dictionary_id: int):
+        decompressors = getattr(self.local, 'decompressors', None)
+        if decompressors is None:
+            decompressors = self.local.decompressors = {}
+        if dictionary_id not in decompressors:
+            zstd_dictionary = None
+            if dictionary_id != 0:
+                zstd_dictionary = zstandard.ZstdCompressionDict(self._get_dictionary(dictionary_id))
+            decompressors[dictionary_id] = zstandard.ZstdDecompressor(dict_data=zstd_dictionary)
+        return decompressors[dictionary_id]
+
+    def compress(self, data: bytes):
+        dictionary_id = self.dictionary_id
+        if dictionary_id == 0:
+            self._add_sample(data)
+        if self.codec == ZSTD_CODEC:
+            body = self._get_zstd_compressor(dictionary_id).compress(data)
+        else:
+            compressor = zlib.compressobj(ZLIB_LEVEL, zdict=self.dictionaries[dictionary_id]) \
+                if dictionary_id != 0 else zlib.compressobj(ZLIB_LEVEL)
+            body = compressor.compress(data) + compressor.flush()
+        return BLOB_HEADER.pack(BLOB_MAGIC, self.codec, dictionary_id) + body
+
+    def decompress(self, blob: bytes):
+        """
+        Returns the payload of a blob, plain payloads are returned unchanged. Raises ValueError for blobs that
+        need a codec or dictionary that is not available.
+        """
+        if not blob.startswith(BLOB_MAGIC):
+            return blob
+        _, codec, dictionary_id = BLOB_HEADER.unpack_from(blob)
+        body = blob[BLOB_HEADER.size:]
+        if codec != self.codec and dictionary_id != 0:
+            raise ValueError(f"Compression dictionary {dictionary_id} of {self.namespace} is not available")
+
+        if codec == ZSTD_CODEC:
+            if zstandard is None:
+                raise ValueError("Blob compressed with zstandard, which is not installed")
+            return self._get_zstd_decompressor(dictionary_id).decompress(body)
+        if codec == ZLIB_CODEC:
+            decompressor = zlib.decompressobj(zdict=self._get_dictionary(dictionary_id)) if dictionary_id != 0 \
+                else zlib.decompressobj()
+            return decompressor.decompress(body) + decompressor.flush()
+        raise ValueError(f"Unknown compression codec {codec!r}")
@@ -0,0 +1,103 @@
+import time
+import pandas as pd
+from contextlib import contextmanager
+from datetime import timedelta
+from utils.log_utils import *
+
+"""
+Run deadlines for scheduled jobs.
+
+A scheduled job gets the time until the next job as its budget. Finders ask the run deadline before loading
+optional enrichment such as price targets or institutional ownership. Once most of the budget is used up that
+enrichment is skipped (or served from stale cache) so the report is still written in time, and the skipped sections
+are recorded so the report can flag them as degraded.
+"""
+
+DEADLINE_MARGIN = 0.2  # Fraction of the budget kept for the required work and the report
+
+
+class RunDeadline:
+    """
+    Time budget of a run and the sections degraded to meet it
+
+    Attributes:
+        budget (timedelta): Time budget, None for runs without a deadline
+        margin (float): Fraction of the budget at the end in which optional work is skipped
+        degraded_sections (dict): Section name -> number of skipped items
+    """
+    def __init__(self, budget: timedelta = None, margin: float = DEADLINE_MARGIN):
+        self.budget = budget
+        self.margin = margin
+        self.start_time = time.time()
+        self.degraded_sections = {}
+
+    def get_elapsed_seconds(self):
+        return time.time() - self.start_time
+
+    def get_remaining_seconds(self):
+        """
+        Returns the seconds left, None for runs without a deadline.
+        """
+        if self.budget is None:
+            return None
+        return self.budget.total_seconds() - self.get_elapsed_seconds()
+
+    def is_near(self):
+        """
+        True once the run has entered the margin at the end of its budget.
+        """
+        if self.budget is None:
+            return False
+        return self.get_elapsed_seconds() >= self.budget.total_seconds() * (1 - self.margin)
+
+    def is_exceeded(self):
+        return self.budget is not None and self.get_remaining_seconds() <= 0
+
+    def allows(self, section: str):
+        """
+        Returns whether optional work for a section may still be done. A refusal is recorded as a degraded section.
+        """
+        if not self.is_near():
+            return True
+        if section not in self.degraded_sections:
+            logw("Run deadline is near, skipping {} from now on", section)
+        self.degraded_sections[section] = self.degraded_sections.get(section, 0) + 1
+        return False
+
+    def is_degraded(self):
+        return len(self.degraded_sections) > 0
+
+    def get_degraded_df(self):
+        """
+        Returns the degraded sections with the number of skipped items, for a report sheet.
+        """
+        return pd.DataFrame([{'section': section, 'num_skipped': num_skipped}
+                             for section, num_skipped in self.degraded_sections.items()],
+                            columns=['section', 'num_skipped'])
+
+
+# Deadline of the run in progress, runs without a deadline get an unlimited one
+_run_deadline = RunDeadline()
+
+
+def get_run_deadline():
+    return _run_deadline
+
+
+@contextmanager
+def run_deadline(budget: timedelta, margin: float = DEADLINE_MARGIN):
+    """
+    Sets the deadline of the enclosed run. Can be used as a decorator too.
+    """
+    global _run_deadline
+    _run_deadline = RunDeadline(budget, margin)
+    try:
+        yield _run_deadline
+    finally:
+        if _run_deadline.is_degraded():
+            logw("Run finished with degraded sections: " +
+                 ", ".join(f"{section} ({num_skipped} skipped)"
+                           for section, num_skipped in _run_deadline.degraded_sections.items()))
+        if _run_deadline.is_exceeded():
+            logw("Run exceeded its budget of {} by {:.0f} seconds", budget, -_run_deadline.get_remaining_seconds())
+        _run_deadline = RunDeadline()
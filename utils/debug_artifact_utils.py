@@ -0,0 +1,165 @@
+import queue
+import atexit
+import threading
+import pandas as pd
+from datetime import datetime
+from utils.log_utils import *
+
+"""
+Debug artifact sink for the per-symbol frames loaders used to dump as review CSV files.
+
+Disabled by default (STORE_DEBUG_ARTIFACTS in config.py), adding an artifact is then a no-op. When enabled, frames
+are handed to a background thread that batches them and appends them to one Parquet file per artifact type and run,
+e.g. cache/debug_artifacts/20240101120000/prices.parquet, with a 'symbol' column identifying the source.
+The files are closed once no artifact arrived for a while, the next artifact starts a new directory with its own
+writer thread. pyarrow is only imported once an artifact is written.
+"""
+
+DEBUG_ARTIFACTS_DIR = os.path.join(CACHE_DIR, "debug_artifacts")
+DEBUG_ARTIFACT_BATCH_ROWS = 50000  # Rows buffered per artifact type before a row group is written
+DEBUG_ARTIFACT_IDLE_SECONDS = 60  # Files are closed when no artifact arrived for this long
+
+
+class DebugArtifactRun:
+    """
+    Artifact files of one run directory, written by its own thread
+
+    Attributes:
+        run_dir (str): Directory of the artifact files
+        batch_rows (int): Rows buffered per artifact type before they are written
+    """
+    def __init__(self, run_dir: str, batch_rows: int):
+        self.run_dir = run_dir
+        self.batch_rows = batch_rows
+        self.queue = queue.Queue()
+        self.buffers = {}
+        self.buffered_rows = {}
+        self.writers = {}
+
+    def write(self, artifact: str, df: pd.DataFrame):
+        self.buffers.setdefault(artifact, []).append(df)
+        self.buffered_rows[artifact] = self.buffered_rows.get(artifact, 0) + len(df)
+        if self.buffered_rows[artifact] >= self.batch_rows:
+            self.flush(artifact)
+
+    def flush(self, artifact: str):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        frames = self.buffers.pop(artifact, [])
+        self.buffered_rows[artifact] = 0
+        if not frames:
+            return
+        try:
+            table = pa.Table.from_pandas(pd.concat(frames, axis=0, ignore_index=True), preserve_index=False)
+            writer = self.writers.get(artifact)
+            if writer is None:
+                os.makedirs(self.run_dir, exist_ok=True)
+                writer = pq.ParquetWriter(os.path.join(self.run_dir, f"{artifact}.parquet"), table.schema)
+                self.writers[artifact] = writer
+            else:
+                # Later batches are aligned to the schema of the first one
+                table = table.select([name for name in writer.schema.names if name in table.column_names])
+                table = table.cast(pa.schema([writer.schema.field(name) for name in table.column_names]))
+                for name in writer.schema.names:
+                    if name not in table.column_names:
+                        table = table.append_column(writer.schema.field(name),
+                                                    pa.nulls(len(table), writer.schema.field(name).type))
+                table = table.select(writer.schema.names)
+            writer.write_table(table)
+        except Exception as ex:
+            logw("Failed to write debug artifact {}: {}", artifact, ex)
+
+    def close(self):
+        for artifact in list(self.buffers.keys()):
+            self.flush(artifact)
+        for writer in self.writers.values():
+            writer.close()
+        self.writers = {}
+        logi("Debug artifacts written to {}", self.run_dir)
+
+
+class DebugArtifactSink:
+    """
+    Collects debug frames and writes them asynchronously in batches
+
+    Attributes:
+        enabled (bool): Artifacts are dropped when False
+        artifacts_dir (str): Directory for the artifact files of all runs
+        batch_rows (int): Rows buffered per artifact type before they are written
+    """
+    def __init__(self, enabled: bool = STORE_DEBUG_ARTIFACTS, artifacts_dir: str = DEBUG_ARTIFACTS_DIR,
+                 batch_rows: int = DEBUG_ARTIFACT_BATCH_ROWS):
+        self.enabled = enabled
+        self.artifacts_dir = artifacts_dir
+        self.batch_rows = batch_rows
+        self.run = None
+        self.thread = None
+        self.thread_lock = threading.Lock()
+
+    def add(self, artifact: str, symbol: str, df: pd.DataFrame):
+        """
+        Queues a frame for the artifact file. Returns immediately.
+        """
+        if not self.enabled or df is None or len(df) == 0:
+            return
+
+        # Keep a date index as a column and tag every row with its symbol
+        if not isinstance(df.index, pd.RangeIndex):
+            df = df.reset_index()
+        df = df.assign(symbol=symbol)
+
+        # Queue under the lock so an idle writer thread cannot exit in between
+        with self.thread_lock:
+            if self.thread is None:
+                # A writer thread that went idle keeps its own files, the new one starts a new directory
+                self.run = DebugArtifactRun(os.path.join(self.artifacts_dir, datetime.now().strftime("%Y%m%d%H%M%S")),
+                                            self.batch_rows)
+                self.thread = threading.Thread(target=self._run, args=(self.run,), daemon=True)
+                self.thread.start()
+            self.run.queue.put((artifact, df))
+
+    def _run(self, run: DebugArtifactRun):
+        while True:
+            try:
+                item = run.queue.get(timeout=DEBUG_ARTIFACT_IDLE_SECONDS)
+            except queue.Empty:
+                with self.thread_lock:
+                    # Only stop if nothing was queued in the meantime
+                    if run.queue.empty():
+                        if self.run is run:
+                            self.run, self.thread = None, None
+                        break
+                continue
+            if item is None:
+                break
+            run.write(*item)
+        run.close()
+
+    def close(self):
+        """
+        Writes all buffered frames and closes the artifact files.
+        """
+        with self.thread_lock:
+            run, thread = self.run, self.thread
+            self.run, self.thread = None, None
+        if thread is None:
+            return
+        run.queue.put(None)
+        thread.join()
+
+
+_debug_artifact_sink = None
+_debug_artifact_sink_lock = threading.Lock()
+
+
+def get_debug_artifact_sink():
+    """
+    Returns the process-wide debug artifact sink.
+    """
+    global _debug_artifact_sink
+    with _debug_artifact_sink_lock:
+        if _debug_artifact_sink is None:
+            _debug_artifact_sink = DebugArtifactSink()
+            atexit.register(_debug_artifact_sink.close)
+        return _debug_artifact_sink
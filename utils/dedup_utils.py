@@ -0,0 +1,119 @@
+import re
+import zlib
+import numpy as np
+from collections import defaultdict
+from utils.log_utils import *
+
+"""
+Near-duplicate detection for news articles.
+
+Syndicated stories come back for many tickers and from many sources with small edits (a different headline prefix,
+a trailing disclaimer). Each article is reduced to a MinHash signature of its word shingles; articles whose
+signatures share a band (locality-sensitive hashing) are compared and joined to the same cluster when their
+estimated Jaccard similarity reaches the threshold. Callers then detect language and sentiment once per cluster
+instead of once per copy.
+"""
+
+SHINGLE_SIZE = 3  # Words per shingle
+NUM_PERMUTATIONS = 128
+NUM_BANDS = 16  # Bands of NUM_PERMUTATIONS / NUM_BANDS rows, pairs above ~0.7 similarity share a band
+DUPLICATE_THRESHOLD = 0.8  # Minimum estimated Jaccard similarity of duplicates
+HASH_PRIME = np.uint64(4294967311)  # Smallest prime above 2^32, keeps (a * x + b) within 64 bits
+MAX_HASH = np.uint64(0xFFFFFFFF)
+HASH_SEED = 42
+
+
+def get_shingles(text: str, shingle_size: int = SHINGLE_SIZE):
+    """
+    Returns the 32 bit hashes of the word shingles of a text.
+    """
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < shingle_size:
+        words = words + [""] * (shingle_size - len(words))
+    shingles = {" ".join(words[index:index + shingle_size]) for index in range(len(words) - shingle_size + 1)}
+    return np.array([zlib.crc32(shingle.encode()) for shingle in shingles], dtype=np.uint64)
+
+
+class NearDuplicateIndex:
+    """
+    Assigns texts to clusters of near duplicates as they are added, clusters persist across calls
+
+    Attributes:
+        threshold (float): Minimum estimated Jaccard similarity to join a cluster
+        num_permutations (int): MinHash signature length
+        num_bands (int): LSH bands, must divide num_permutations
+    """
+    def __init__(self, threshold: float = DUPLICATE_THRESHOLD, num_permutations: int = NUM_PERMUTATIONS,
+                 num_bands: int = NUM_BANDS):
+        self.threshold = threshold
+        self.num_bands = num_bands
+        self.rows_per_band = num_permutations // num_bands
+        generator = np.random.default_rng(HASH_SEED)
+        self.a = generator.integers(1, int(MAX_HASH), size=num_permutations, dtype=np.uint64)
+        self.b = generator.integers(0, int(MAX_HASH), size=num_permutations, dtype=np.uint64)
+        # Band hash -> cluster ids, cluster id -> signature of its first text
+        self.buckets = defaultdict(list)
+        self.signatures = []
+
+    def get_signature(self, text: str):
+        shingles = get_shingles(text)
+        if len(shingles) == 0:
+            return np.full(len(self.a), MAX_HASH, dtype=np.uint64)
+        # One row per permutation, the minimum over the shingles
+        hashes = (np.outer(self.a, shingles) + self.b[:, None]) % HASH_PRIME
+        return hashes.min(axis=1)
+
+    def get_band_keys(self, signature: np.ndarray):
+        return [(band, signature[band * self.rows_per_band:(band + 1) * self.rows_per_band].tobytes())
+                for band in range(self.num_bands)]
+
+    def add(self, text: str):
+        """
+        Returns the cluster id of a text, a new id when it doesn't duplicate an earlier one.
+        """
+        signature = self.get_signature(text or "")
+        band_keys = self.get_band_keys(signature)
+        candidate_ids = {cluster_id for band_key in band_keys for cluster_id in self.buckets.get(band_key, [])}
+
+        best_id, best_similarity = None, self.threshold
+        for cluster_id in candidate_ids:
+            similarity = np.mean(self.signatures[cluster_id] == signature)
+            if similarity >= best_similarity:
+                best_id, best_similarity = cluster_id, similarity
+        if best_id is not None:
+            return best_id
+
+        cluster_id = len(self.signatures)
+        self.signatures.append(signature)
+        for band_key in band_keys:
+            self.buckets[band_key].append(cluster_id)
+        return cluster_id
+
+    def add_all(self, texts):
+        return np.array([self.add(text) for text in texts], dtype=np.int64)
+
+
+def get_news_texts(news_df, text_columns: list):
+    return news_df[text_columns].fillna("").astype(str).agg(" ".join, axis=1)
+
+
+def assign_duplicate_clusters(news_df, text_columns: list, index: NearDuplicateIndex = None):
+    """
+    Adds the near-duplicate cluster of every article as 'cluster_id'. Pass an index to cluster across calls.
+    """
+    if index is None:
+        index = NearDuplicateIndex()
+    news_df['cluster_id'] = index.add_all(get_news_texts(news_df, text_columns)) if len(news_df) > 0 else []
+    return news_df
+
+
+def collapse_duplicates(news_df, text_columns: list, index: NearDuplicateIndex = None):
+    """
+    Keeps the first article of every near-duplicate cluster and counts the copies as 'num_duplicates'.
+    """
+    news_df = assign_duplicate_clusters(news_df, text_columns, index)
+    num_duplicates = news_df.groupby('cluster_id')['cluster_id'].transform('size')
+    collapsed_df = news_df.assign(num_duplicates=num_duplicates).drop_duplicates(subset='cluster_id')
+    if len(collapsed_df) < len(news_df):
+        logd("Collapsed {} articles into {} stories", len(news_df), len(collapsed_df))
+    return collapsed_df
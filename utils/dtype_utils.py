@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+from utils.log_utils import *
+
+"""
+Memory-lean column types for the frames held per symbol during a run.
+
+Prices fit float32 (about 7 significant digits), volumes fit the smallest integer type holding their range,
+dates become datetime64 and repeated strings such as symbols, grades and news sites become categoricals.
+Fundamentals keep float64 because statement values reach the billions and are rounded to cents.
+"""
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'adjClose', 'adj_close', 'vwap', 'change', 'changePercent',
+                 'changeOverTime']
+VOLUME_COLUMNS = ['volume', 'unadjustedVolume']
+DATE_COLUMNS = ['date', 'publishedDate', 'fillingDate', 'acceptedDate', 'paymentDate', 'declarationDate',
+                'recordDate']
+CATEGORY_COLUMNS = ['symbol', 'label', 'newGrade', 'previousGrade', 'gradingCompany', 'action', 'site',
+                    'reportedCurrency', 'period', 'calendarYear', 'cik']
+MAX_CATEGORY_RATIO = 0.5  # Only convert string columns whose unique values are at most this fraction of the rows
+
+
+def to_float32(df: pd.DataFrame, columns: list = None):
+    """
+    Downcasts float columns to float32, all float columns when no columns are given.
+    """
+    if columns is None:
+        columns = df.select_dtypes(include=['float64']).columns
+    for col in columns:
+        if col in df.columns and pd.api.types.is_numeric_dtype(df[col]) and df[col].dtype != np.float32:
+            df[col] = df[col].astype(np.float32)
+    return df
+
+
+def to_small_int(df: pd.DataFrame, columns: list = VOLUME_COLUMNS):
+    """
+    Downcasts integer columns such as volumes, e.g. to int32. Columns with missing values are left as they are.
+    """
+    for col in columns:
+        if col not in df.columns or not pd.api.types.is_numeric_dtype(df[col]) or df[col].isna().any():
+            continue
+        if pd.api.types.is_float_dtype(df[col]) and not (df[col] % 1 == 0).all():
+            continue
+        df[col] = pd.to_numeric(df[col].astype(np.int64), downcast='integer')
+    return df
+
+
+def to_datetime(df: pd.DataFrame, columns: list = DATE_COLUMNS):
+    for col in columns:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    return df
+
+
+def to_category(df: pd.DataFrame, columns: list = CATEGORY_COLUMNS, max_ratio: float = MAX_CATEGORY_RATIO):
+    """
+    Converts repeated string columns to categoricals. A column with one row per value would only grow.
+    """
+    for col in columns:
+        if col not in df.columns or isinstance(df[col].dtype, pd.CategoricalDtype):
+            continue
+        if df[col].dtype == object and df[col].nunique(dropna=True) <= max(1, len(df) * max_ratio):
+            df[col] = df[col].astype('category')
+    return df
+
+
+def optimize_price_dtypes(prices_df: pd.DataFrame):
+    """
+    Price history: float32 prices, small integer volumes, datetime64 index and categorical symbol.
+    """
+    if prices_df is None or len(prices_df) == 0:
+        return prices_df
+    if not isinstance(prices_df.index, pd.DatetimeIndex) and 'date' not in prices_df.columns:
+        prices_df.index = pd.to_datetime(prices_df.index, errors='coerce')
+    prices_df = to_datetime(prices_df, ['date'])
+    prices_df = to_small_int(prices_df)
+    prices_df = to_float32(prices_df, PRICE_COLUMNS)
+    prices_df = to_category(prices_df, ['symbol', 'label'])
+    return prices_df
+
+
+def optimize_prices_dict(prices_dict: dict):
+    """
+    Optimizes every price frame of a symbol -> price DataFrame map in place.
+    """
+    for symbol in list(prices_dict.keys()):
+        prices_dict[symbol] = optimize_price_dtypes(prices_dict[symbol])
+    return prices_dict
+
+
+def optimize_record_dtypes(df: pd.DataFrame):
+    """
+    Record frames such as grades, news and statements: datetime64 dates and categorical repeated strings.
+    Numeric columns keep their type.
+    """
+    if df is None or len(df) == 0:
+        return df
+    df = to_datetime(df)
+    df = to_category(df)
+    return df
+
+
+def get_memory_usage(df: pd.DataFrame):
+    """
+    Returns the memory used by a frame in bytes, including the contents of string columns.
+    """
+    if df is None:
+        return 0
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def log_memory_report(name: str, frames):
+    """
+    Logs the memory used by a frame, a list of frames or a dictionary of frames, e.g. prices_dict.
+    """
+    if isinstance(frames, dict):
+        frames = list(frames.values())
+    elif isinstance(frames, pd.DataFrame):
+        frames = [frames]
+    total_bytes = sum(get_memory_usage(df) for df in frames)
+    num_rows = sum(len(df) for df in frames if df is not None)
+    logi("{}: {} frames, {} rows, {:.1f} MB", name, len(frames), num_rows, total_bytes / (1024 * 1024))
+    return total_bytes
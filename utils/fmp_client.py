@@ -1,26 +1,113 @@
 from utils.log_utils import *
 import requests
 from utils.string_utils import *
+from utils.instrumentation_utils import count, instrument
+from utils.dtype_utils import optimize_price_dtypes, optimize_record_dtypes
+from utils.json_utils import loads, records_to_df
+from utils.http_cache import HttpCache, normalize_url
+from utils.request_coalescer import get_request_coalescer
+from utils.quota_utils import get_quota_ledger, get_retry_after
+from utils.request_scheduler import get_request_scheduler
+from utils.deadline_utils import get_run_deadline
+from enums import RequestPriority
 import pandas as pd
+from datetime import datetime
+
+# Fraction of the quota burst a priority leaves to the higher ones. When the quota is the bottleneck the bucket
+# refills to a higher priority's threshold first, so waiting requests get their tokens in priority order.
+QUOTA_RESERVES = {
+    RequestPriority.CRITICAL: 0.0,
+    RequestPriority.NORMAL: 0.25,
+    RequestPriority.OPTIONAL: 0.5,
+}
 
 
 class FmpClient:
     """
-    Configure FMP client with api key
+    Configure FMP client with api key. The priority applies to all requests of the client unless a method sends
+    its requests with a fixed priority, e.g. bulk calls that gate a whole run.
     """
-    def __init__(self, fmp_api_key):
+    def __init__(self, fmp_api_key, priority: RequestPriority = RequestPriority.NORMAL):
         self._api_key = fmp_api_key
+        self.priority = priority
+        self.http_cache = HttpCache() if HTTP_CACHE_ENABLED else None
+        self.request_coalescer = get_request_coalescer() if REQUEST_COALESCING_ENABLED else None
+        self.quota_ledger = get_quota_ledger("fmp", FMP_CALLS_PER_MINUTE) if FMP_QUOTA_LEDGER_ENABLED else None
+        self.scheduler = get_request_scheduler("fmp", FMP_MAX_CONCURRENCY)
+
+    def _get_json(self, url, priority: RequestPriority = None):
+        """
+        Sends a GET request and returns the decoded JSON body, None if the request failed.
+        All endpoints go through here so requests and bytes are counted and responses are cached in one place.
+        Identical requests of a run share one call, the returned body must not be modified.
+        """
+        if priority is None:
+            priority = self.priority
+        if self.request_coalescer is None:
+            return self._fetch_json(url, priority)
+        return self.request_coalescer.get(normalize_url(url), lambda: self._fetch_json(url, priority))
+
+    def _fetch_json(self, url, priority: RequestPriority):
+        entry = self.http_cache.load(url) if self.http_cache is not None else None
+        if entry is not None and self.http_cache.is_fresh(entry):
+            return entry['body']
+        # Near the run deadline optional data is served from stale cache
+        if entry is not None and priority == RequestPriority.OPTIONAL and get_run_deadline().is_near():
+            count('stale_hits')
+            return entry['body']
+
+        headers = self.http_cache.get_revalidation_headers(entry) if entry is not None else {}
+        response = self._send(url, headers, priority)
+        if response.status_code == 304 and entry is not None:
+            return self.http_cache.refresh(url, entry, response.headers)
+        if response.status_code != 200:
+            count('errors')
+            return None
 
+        data = loads(response.content)
+        if self.http_cache is not None:
+            self.http_cache.store(url, data, response.headers)
+        return data
+
+    def _send(self, url, headers, priority: RequestPriority):
+        """
+        Sends a request within the shared API quota and the scheduler's concurrency limit, higher priorities first.
+        Throttled requests pause all processes and are retried.
+        """
+        reserve_fraction = QUOTA_RESERVES[priority]
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            # Wait for the quota before taking a slot, so requests waiting for a token don't hold slots. The
+            # reserves keep the priority order while waiting for the quota, the scheduler keeps it for the slots.
+            if self.quota_ledger is not None:
+                self.quota_ledger.acquire(reserve_fraction)
+            with self.scheduler.slot(priority) as request_slot:
+                response = requests.get(url, headers=headers, timeout=FMP_REQUEST_TIMEOUT)
+                if response.status_code == 429:
+                    request_slot.failed()
+            count('requests')
+            count('bytes', len(response.content))
+            if response.status_code != 429 or self.quota_ledger is None:
+                break
+            count('throttled')
+            self.quota_ledger.block(get_retry_after(response))
+        return response
+
+    def map(self, func, symbol_list):
+        """
+        Calls func(symbol) concurrently, e.g. a bound FmpClient method, and yields (symbol, result) in the order
+        of the symbols. The number of requests in flight adapts to FMP's latency and errors.
+        """
+        return self.scheduler.map(func, symbol_list)
+
+    @instrument()
     def fetch_stock_screener_results(self, exchange_list="nyse,nasdaq,amex&limit", market_cap_more_than=2000000000, priceMoreThan=10, volume_more_than=100000, beta_lower_than=1, country='US', limit=1000):
         try:
             url = f"https://financialmodelingprep.com/api/v3/stock-screener?exchange={exchange_list}&limit={limit}&marketCapMoreThan={market_cap_more_than}&betaLowerThan={beta_lower_than}&volumeMoreThan={volume_more_than}&country={country}&priceMoreThan={priceMoreThan}&isActivelyTrading=true&isFund=false&isEtf=false&apikey={self._api_key}"
             logd(url)
-            response = requests.get(url)
-
-            if response.status_code == 200:
-                securities_data = response.json()
+            securities_data = self._get_json(url, RequestPriority.CRITICAL)
+            if securities_data is not None:
                 if securities_data:
-                    securities_df = pd.DataFrame(securities_data)
+                    securities_df = records_to_df(securities_data)
 
                     return securities_df
                 return None
@@ -30,49 +117,14 @@ class FmpClient:
             print(ex)
             return None
 
-    def fetch_daily_prices(self, symbol, start_date_str, end_date_str):
-        try:
-            file_name = f"{symbol}-{start_date_str}-{end_date_str}-prices.csv"
-            path = os.path.join(CACHE_DIR, file_name)
-            if os.path.exists(path):
-                prices_df = pd.read_csv(path)
-                prices_df['date'] = pd.to_datetime(prices_df['date'])
-                prices_df.set_index('date', inplace=True)
-                return prices_df
-            else:
-                # Load remotely
-                url = f"https://financialmodelingprep.com/api/v3/historical-price-full/{symbol}?from={start_date_str}&to={end_date_str}&apikey={self._api_key}&serietype=line"
-                response = requests.get(url)
-                if response.status_code == 200:
-                    data = response.json()
-                    historical_data = data.get('historical', [])
-                    if historical_data:
-                        prices_df = pd.DataFrame(historical_data)
-                        prices_df['date'] = pd.to_datetime(prices_df['date'])
-                        prices_df.set_index('date', inplace=True)
-                        prices_df.sort_index(ascending=True, inplace=True)
-
-                        # Cache price file
-                        prices_df.to_csv(path)
-
-                        return prices_df
-                    else:
-                        return None
-                else:
-                    return None
-        except Exception as ex:
-            print(ex)
-            return None
-
+    @instrument()
     def fetch_tradable_list(self):
         try:
             url = f"https://financialmodelingprep.com/api/v3/available-traded/list?apikey={self._api_key}"
-            response = requests.get(url)
-
-            if response.status_code == 200:
-                securities_data = response.json()
+            securities_data = self._get_json(url, RequestPriority.CRITICAL)
+            if securities_data is not None:
                 if securities_data:
-                    securities_df = pd.DataFrame(securities_data)
+                    securities_df = records_to_df(securities_data)
 
                     return securities_df
                 return None
@@ -82,20 +134,18 @@ class FmpClient:
             print(ex)
             return None
 
+    @instrument()
     def get_analyst_ratings(self, symbol):
         try:
             url = f"https://financialmodelingprep.com/api/v3/grade/{symbol}?apikey={self._api_key}"
-            response = requests.get(url)
-
-            if response.status_code == 200:
-                grades_data = response.json()
+            grades_data = self._get_json(url)
+            if grades_data is not None:
                 if grades_data:
-                    grades_df = pd.DataFrame(grades_data)
-                    grades_df['date'] = pd.to_datetime(grades_df['date'], errors='coerce')
+                    grades_df = records_to_df(grades_data)
                     # Filter out invalid dates (NaT values after conversion)
                     grades_df = grades_df.dropna(subset=['date'])
 
-                    return grades_df
+                    return optimize_record_dtypes(grades_df)
                 return None
             else:
                 return None
@@ -103,15 +153,14 @@ class FmpClient:
             loge(ex)
             return None
 
+    @instrument()
     def get_income_growth(self, symbol, period='annual'):
         try:
             url = f"https://financialmodelingprep.com/api/v3/income-statement-growth/{symbol}?period={period}&apikey={self._api_key}"
-            response = requests.get(url)
-
-            if response.status_code == 200:
-                growth_data = response.json()
+            growth_data = self._get_json(url)
+            if growth_data is not None:
                 if growth_data:
-                    growth_df = pd.DataFrame(growth_data)
+                    growth_df = records_to_df(growth_data)
 
                     return growth_df
                 return None
@@ -121,15 +170,14 @@ class FmpClient:
             print(ex)
             return None
 
+    @instrument()
     def get_financial_ratios(self, symbol, period):
         try:
             url = f"https://financialmodelingprep.com/api/v3/ratios/{symbol}?period={period}&apikey={self._api_key}"
-            response = requests.get(url)
-
-            if response.status_code == 200:
-                ratios_data = response.json()
+            ratios_data = self._get_json(url)
+            if ratios_data is not None:
                 if ratios_data:
-                    ratios_df = pd.DataFrame(ratios_data)
+                    ratios_df = records_to_df(ratios_data)
 
                     return ratios_df
                 return None
@@ -139,16 +187,14 @@ class FmpClient:
             print(ex)
             return None
 
+    @instrument()
     def get_social_sentiment(self, symbol):
         try:
             url = f"https://financialmodelingprep.com/api/v4/historical/social-sentiment?symbol={symbol}&apikey={self._api_key}"
-            response = requests.get(url)
-
-            if response.status_code == 200:
-                social_sentiment_data = response.json()
+            social_sentiment_data = self._get_json(url)
+            if social_sentiment_data is not None:
                 if social_sentiment_data:
-                    social_sentiment_df = pd.DataFrame(social_sentiment_data)
-                    social_sentiment_df['date'] = pd.to_datetime(social_sentiment_df['date'], errors='coerce')
+                    social_sentiment_df = records_to_df(social_sentiment_data)
                     # Filter out invalid dates (NaT values after conversion)
                     social_sentiment_df = social_sentiment_df.dropna(subset=['date'])
 
@@ -160,20 +206,18 @@ class FmpClient:
             loge(ex)
             return None
 
+    @instrument()
     def get_stock_news(self, symbol, limit):
         try:
             url = f"https://financialmodelingprep.com/api/v3/stock_news?tickers={symbol}&limit={limit}&apikey={self._api_key}"
-            response = requests.get(url)
-
-            if response.status_code == 200:
-                news_data = response.json()
+            news_data = self._get_json(url)
+            if news_data is not None:
                 if news_data:
-                    news_df = pd.DataFrame(news_data)
-                    news_df['publishedDate'] = pd.to_datetime(news_df['publishedDate'], errors='coerce')
+                    news_df = records_to_df(news_data)
                     # Filter out invalid dates (NaT values after conversion)
                     news_df = news_df.dropna(subset=['publishedDate'])
 
-                    return news_df
+                    return optimize_record_dtypes(news_df)
                 return None
             else:
                 return None
@@ -181,19 +225,18 @@ class FmpClient:
             loge(ex)
             return None
 
+    @instrument()
     def fetch_daily_prices(self, symbol, start_date_str, end_date_str):
         try:
             url = f"https://financialmodelingprep.com/api/v3/historical-price-full/{symbol}?from={start_date_str}&to={end_date_str}&apikey={self._api_key}&serietype=line"
-            response = requests.get(url)
-            if response.status_code == 200:
-                data = response.json()
+            data = self._get_json(url)
+            if data is not None:
                 historical_data = data.get('historical', [])
                 if historical_data:
-                    prices_df = pd.DataFrame(historical_data)
-                    prices_df['date'] = pd.to_datetime(prices_df['date'])
+                    prices_df = records_to_df(historical_data)
                     prices_df.set_index('date', inplace=True)
                     prices_df.sort_index(ascending=True, inplace=True)
-                    return prices_df
+                    return optimize_price_dtypes(prices_df)
                 else:
                     return None
             else:
@@ -202,14 +245,14 @@ class FmpClient:
             print(ex)
             return None
 
+    @instrument()
     def fetch_all_prices(self):
         try:
             url = f"https://financialmodelingprep.com/api/v3/stock/full/real-time-price?apikey={self._api_key}"
-            response = requests.get(url)
-            if response.status_code == 200:
-                data = response.json()
+            data = self._get_json(url, RequestPriority.CRITICAL)
+            if data is not None:
                 if data:
-                    all_prices_df = pd.DataFrame(data)
+                    all_prices_df = records_to_df(data)
                     return all_prices_df
                 else:
                     return None
@@ -219,18 +262,32 @@ class FmpClient:
             print(ex)
             return None
 
+    @instrument()
+    def fetch_exchange_quotes(self, exchange):
+        try:
+            url = f"https://financialmodelingprep.com/api/v3/quotes/{exchange}?apikey={self._api_key}"
+            data = self._get_json(url, RequestPriority.CRITICAL)
+            if data is not None:
+                if data:
+                    quotes_df = records_to_df(data)
+                    return quotes_df
+                else:
+                    return None
+            else:
+                return None
+        except Exception as ex:
+            print(ex)
+            return None
+
+    @instrument()
     def fetch_dividends(self, symbol):
         try:
             url = f"https://financialmodelingprep.com/api/v3/historical-price-full/stock_dividend/{symbol}?apikey={self._api_key}"
-            response = requests.get(url)
-
-            if response.status_code == 200:
-                data = response.json()
+            data = self._get_json(url)
+            if data is not None:
                 historical_data = data.get('historical', [])
                 if historical_data:
-                    dividends_df = pd.DataFrame(historical_data)
-                    dividends_df['paymentDate'] = pd.to_datetime(dividends_df['paymentDate'])
-                    dividends_df['declarationDate'] = pd.to_datetime(dividends_df['declarationDate'])
+                    dividends_df = records_to_df(historical_data)
                     dividends_df.set_index('paymentDate', inplace=True)
                     return dividends_df
                 else:
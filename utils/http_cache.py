@@ -0,0 +1,163 @@
+import re
+import hashlib
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from utils.log_utils import *
+from utils.cache_manager import get_cache_manager
+from utils.instrumentation_utils import count
+
+"""
+Request-level HTTP response cache for FmpClient.
+
+Responses are keyed by the normalized URL (API key removed, query parameters sorted) and stored in the shared
+cache manager. How long a response stays fresh depends on the endpoint: prices are refetched during the day,
+fundamentals stay fresh until the next statement is due (derived from the latest period in the response itself,
+no extra call), profiles for a week. Endpoints without a rule
+are not cached. Stale responses that came with an ETag or Last-Modified header are revalidated with a
+conditional request, a 304 answer renews the stored body without downloading it again.
+"""
+
+HTTP_CACHE_NAMESPACE = "http_responses"
+UNTIL_NEXT_EARNINGS = "until_next_earnings"
+QUARTER_LENGTH = timedelta(days=91)
+YEAR_LENGTH = timedelta(days=365)
+EARNINGS_FILING_LAG = timedelta(days=45)  # Statements show up within about 45 days after the period end
+MAX_FUNDAMENTALS_AGE = timedelta(days=100)  # About one quarter
+DEFAULT_FUNDAMENTALS_AGE = timedelta(days=7)  # When the next statement date is unknown or overdue
+IGNORED_QUERY_PARAMS = ['apikey']
+
+# URL pattern -> freshness, first match wins
+HTTP_CACHE_RULES = [
+    (re.compile(r"/api/v3/historical-price-full/stock_dividend/"), timedelta(days=1)),
+    (re.compile(r"/api/v3/historical-price-full/"), timedelta(hours=1)),
+    (re.compile(r"/api/v3/(income-statement-growth|income-statement|balance-sheet-statement|cash-flow-statement"
+                r"|ratios|key-metrics)/(?P<symbol>[^/?]+)"), UNTIL_NEXT_EARNINGS),
+    (re.compile(r"/api/v3/profile/"), timedelta(days=7)),
+    (re.compile(r"/api/v3/available-traded/list"), timedelta(days=1)),
+    (re.compile(r"/api/v3/grade/"), timedelta(days=1)),
+    (re.compile(r"/api/v3/stock_news"), timedelta(days=1)),
+    (re.compile(r"/api/v4/historical/social-sentiment"), timedelta(days=1)),
+]
+
+
+def normalize_url(url: str):
+    """
+    Removes the API key and sorts the query parameters so equal requests share one cache entry.
+    """
+    parts = urlsplit(url)
+    query = sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if key.lower() not in IGNORED_QUERY_PARAMS)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, urlencode(query), ""))
+
+
+def get_header(headers, name: str):
+    if not headers:
+        return None
+    return headers.get(name)
+
+
+def get_next_filing_date(url: str, body):
+    """
+    Estimates when the statement following the latest period of a fundamentals response will be filed, None if
+    the response has no period dates.
+    """
+    if not isinstance(body, list):
+        return None
+    period_dates = []
+    for record in body:
+        try:
+            period_dates.append(datetime.strptime(str(record.get('date'))[:10], "%Y-%m-%d"))
+        except (AttributeError, ValueError):
+            continue
+    if not period_dates:
+        return None
+    period_length = QUARTER_LENGTH if "period=quarter" in url else YEAR_LENGTH
+    return max(period_dates) + period_length + EARNINGS_FILING_LAG
+
+
+class HttpCache:
+    """
+    Stores decoded JSON responses with their freshness and validators
+
+    Attributes:
+        rules (list): (URL pattern, freshness) pairs
+    """
+    def __init__(self, rules: list = None):
+        self.rules = rules if rules is not None else HTTP_CACHE_RULES
+        self.cache_manager = get_cache_manager()
+
+    def get_rule(self, url: str):
+        for pattern, freshness in self.rules:
+            match = pattern.search(url)
+            if match:
+                return match, freshness
+        return None, None
+
+    def is_cacheable(self, url: str):
+        return self.get_rule(url)[1] is not None
+
+    def _get_key(self, normalized_url: str):
+        return hashlib.sha1(normalized_url.encode()).hexdigest()
+
+    def _get_expiry(self, url: str, now: datetime, body=None):
+        match, freshness = self.get_rule(url)
+        if freshness != UNTIL_NEXT_EARNINGS:
+            return now + freshness
+
+        # Fundamentals only change when the statement of the next period is filed
+        next_filing_date = get_next_filing_date(url, body)
+        if next_filing_date is None or next_filing_date < now:
+            return now + DEFAULT_FUNDAMENTALS_AGE
+        return min(next_filing_date, now + MAX_FUNDAMENTALS_AGE)
+
+    def load(self, url: str):
+        """
+        Returns the stored entry of a URL, fresh or stale, None if there is none.
+        """
+        if not self.is_cacheable(url):
+            return None
+        return self.cache_manager.load_json(HTTP_CACHE_NAMESPACE, self._get_key(normalize_url(url)))
+
+    def is_fresh(self, entry: dict):
+        return entry is not None and datetime.now().timestamp() < entry['expires']
+
+    def get_revalidation_headers(self, entry: dict):
+        """
+        Returns the conditional request headers for a stale entry.
+        """
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url: str, body, response_headers=None):
+        if body is None or not self.is_cacheable(url):
+            return
+        now = datetime.now()
+        normalized_url = normalize_url(url)
+        entry = {
+            'url': normalized_url,
+            'fetched': now.timestamp(),
+            'expires': self._get_expiry(url, now, body).timestamp(),
+            'etag': get_header(response_headers, 'ETag'),
+            'last_modified': get_header(response_headers, 'Last-Modified'),
+            'body': body,
+        }
+        self.cache_manager.store_json(HTTP_CACHE_NAMESPACE, self._get_key(normalized_url), entry)
+
+    def refresh(self, url: str, entry: dict, response_headers=None):
+        """
+        Renews a stale entry after the server confirmed it is unchanged (304 Not Modified).
+        """
+        count('revalidations')
+        now = datetime.now()
+        entry['fetched'] = now.timestamp()
+        entry['expires'] = self._get_expiry(url, now, entry['body']).timestamp()
+        entry['etag'] = get_header(response_headers, 'ETag') or entry.get('etag')
+        entry['last_modified'] = get_header(response_headers, 'Last-Modified') or entry.get('last_modified')
+        self.cache_manager.store_json(HTTP_CACHE_NAMESPACE, self._get_key(entry['url']), entry)
+        return entry['body']
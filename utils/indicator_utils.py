@@ -5,6 +5,7 @@ import numpy as np
 import talib
 import pandas_ta as ta
 from scipy.stats import linregress
+from utils.instrumentation_utils import instrument
 
 
 
@@ -47,6 +48,7 @@ def compute_slope(df: pd.DataFrame, target_col: str, slope_col: str, window_size
     return df
 
 
+@instrument()
 def calculate_trend(df: pd.DataFrame, bandwidth: int = 9):
     # Add smoothed line
     df = add_kernel_reg_smoothed_line(df, column_list=['close'], bandwidth=bandwidth, var_type='c')
@@ -59,6 +61,7 @@ def calculate_trend(df: pd.DataFrame, bandwidth: int = 9):
 
 
 # Function to calculate ADX for trend strength
+@instrument()
 def calculate_adx(df, length=14):
     temp_df = ta.adx(df['high'], df['low'], df['close'], length=length)
     #df['DMI_POS'] = temp_df[f'DMP_{length}']
@@ -67,11 +70,13 @@ def calculate_adx(df, length=14):
     return temp_df[f'ADX_{length}']
 
 # Function to calculate RSI for identifying pullbacks
+@instrument()
 def calculate_rsi(df, window=14):
     return ta.rsi(df['close'], window=window)
 
 
 # Function to calculate EMAs
+@instrument()
 def calculate_ema(df, window=5):
     return ta.ema(df['close'], length=window)
 
@@ -135,6 +140,7 @@ def calculate_trend_numpy(values):
     return m, c
 
 
+@instrument()
 def add_kernel_reg_smoothed_line(df, column_list=['close'], output_cols=None, bandwidth=2, var_type='c'):
     """
     Adds smoothed lines to the dataframe using kernel regression for multiple columns.
@@ -0,0 +1,249 @@
+import json
+import time
+import functools
+import threading
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager
+from datetime import datetime
+from utils.log_utils import *
+
+"""
+Lightweight run instrumentation.
+
+Spans time a block of work (an API endpoint, a loader fetch, an indicator calculation, a report write).
+Request, byte and cache counters roll up into every open span of the current thread and into the run totals,
+row counts only apply to the span that recorded them. Work handed to a thread pool is wrapped with
+propagate_spans() so its counters roll up into the spans of the submitting thread. Gauges hold the latest value of a run metric such as the
+current request concurrency. At the end of a run a summary table is logged and
+a JSON trace with every span is written for later analysis.
+"""
+
+TRACE_DIR = os.path.join(LOG_DIR, "traces")
+COUNTER_NAMES = ['requests', 'bytes', 'cache_hits', 'cache_misses', 'revalidations', 'stale_hits', 'coalesced',
+                 'throttled', 'rows_in', 'rows_out', 'errors']
+TOTAL_COUNTER_NAMES = ['requests', 'bytes', 'cache_hits', 'cache_misses', 'revalidations', 'stale_hits', 'coalesced',
+                       'throttled', 'errors']
+
+_local = threading.local()
+_lock = threading.Lock()
+_spans = []
+_totals = dict.fromkeys(TOTAL_COUNTER_NAMES, 0)
+_gauges = {}
+
+
+class Span:
+    """
+    A timed block of work
+
+    Attributes:
+        name (str): Span name, e.g. 'FmpClient.get_analyst_ratings'
+        parent (str): Name of the enclosing span, None for top-level spans
+        counters (dict): Counter name -> value
+    """
+    def __init__(self, name: str, parent: str = None):
+        self.name = name
+        self.parent = parent
+        self.start_time = time.time()
+        self.seconds = 0.0
+        self.counters = dict.fromkeys(COUNTER_NAMES, 0)
+
+    def add(self, counter: str, value=1):
+        self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'parent': self.parent,
+            'start_time': datetime.fromtimestamp(self.start_time).isoformat(),
+            'seconds': round(self.seconds, 6),
+            **self.counters
+        }
+
+
+def _get_stack():
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+
+def _get_num_rows(value):
+    if isinstance(value, (list, tuple, set, dict, pd.DataFrame, pd.Series, pd.Index, np.ndarray)):
+        return len(value)
+    return None
+
+
+@contextmanager
+def span(name: str):
+    """
+    Times the enclosed block and collects the counters recorded while it runs.
+    """
+    stack = _get_stack()
+    current = Span(name, stack[-1].name if stack else None)
+    stack.append(current)
+    start_time = time.perf_counter()
+    try:
+        yield current
+    except Exception:
+        current.add('errors')
+        raise
+    finally:
+        current.seconds = time.perf_counter() - start_time
+        stack.pop()
+        with _lock:
+            _spans.append(current)
+
+
+def propagate_spans(func):
+    """
+    Wraps func to run inside the spans open in the calling thread, e.g. before submitting it to a thread pool.
+    """
+    parent_stack = list(_get_stack())
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        previous_stack = _get_stack()
+        _local.stack = list(parent_stack)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.stack = previous_stack
+    return wrapper
+
+
+def count(counter: str, value=1):
+    """
+    Adds to a counter of all open spans of the current thread and of the run totals.
+    """
+    # Under the lock, worker threads add to the spans of the thread that submitted their work
+    with _lock:
+        for open_span in _get_stack():
+            open_span.add(counter, value)
+        _totals[counter] = _totals.get(counter, 0) + value
+
+
+def set_gauge(gauge: str, value):
+    """
+    Sets the latest value of a run metric.
+    """
+    with _lock:
+        _gauges[gauge] = value
+
+
+def instrument(name: str = None):
+    """
+    Decorator that wraps a function in a span. The first collection argument is counted as rows in,
+    the size of a collection result as rows out.
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name) as current:
+                for arg in list(args) + list(kwargs.values()):
+                    num_rows = _get_num_rows(arg)
+                    if num_rows is not None:
+                        current.add('rows_in', num_rows)
+                        break
+                result = func(*args, **kwargs)
+                num_rows = _get_num_rows(result)
+                if num_rows is not None:
+                    current.add('rows_out', num_rows)
+                return result
+        return wrapper
+    return decorator
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        for counter in list(_totals.keys()):
+            _totals[counter] = 0
+        _gauges.clear()
+
+
+def get_totals():
+    with _lock:
+        return dict(_totals)
+
+
+def get_gauges():
+    with _lock:
+        return dict(_gauges)
+
+
+def get_summary_df():
+    """
+    Aggregates all finished spans by name, slowest first.
+    """
+    with _lock:
+        span_dicts = [current.to_dict() for current in _spans]
+    if not span_dicts:
+        return pd.DataFrame(columns=['name', 'calls', 'seconds', 'avg_seconds'] + COUNTER_NAMES)
+
+    spans_df = pd.DataFrame(span_dicts)
+    summary_df = spans_df.groupby('name').agg(calls=('seconds', 'size'), seconds=('seconds', 'sum'),
+                                              **{counter: (counter, 'sum') for counter in COUNTER_NAMES})
+    summary_df.insert(2, 'avg_seconds', summary_df['seconds'] / summary_df['calls'])
+    summary_df = summary_df.reset_index().sort_values(by='seconds', ascending=False)
+    return summary_df.round({'seconds': 3, 'avg_seconds': 3})
+
+
+def log_summary(run_name: str = "run"):
+    summary_df = get_summary_df()
+    totals = get_totals()
+    logi("Instrumentation summary for {}:\n{}", run_name, summary_df.to_string(index=False))
+    logi("Totals for {}: {}", run_name, ", ".join(f"{counter}={value}" for counter, value in totals.items()))
+    gauges = get_gauges()
+    if gauges:
+        logi("Gauges for {}: {}", run_name, ", ".join(f"{gauge}={value}" for gauge, value in gauges.items()))
+
+
+def write_trace(run_name: str = "run", trace_dir: str = TRACE_DIR):
+    """
+    Writes all spans and the run totals to a JSON file.
+
+    Returns:
+        str: Path of the trace file, None if it could not be written.
+    """
+    try:
+        os.makedirs(trace_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        path = os.path.join(trace_dir, f"{run_name}-{timestamp}.json")
+        with _lock:
+            trace = {
+                'run': run_name,
+                'created': datetime.now().isoformat(),
+                'totals': dict(_totals),
+                'gauges': dict(_gauges),
+                'spans': [current.to_dict() for current in _spans]
+            }
+        with open(path, "w") as trace_file:
+            json.dump(trace, trace_file, indent=1)
+        logi("Trace written to {}", path)
+        return path
+    except Exception as ex:
+        loge(f"Failed to write trace: {ex}")
+        return None
+
+
+@contextmanager
+def trace_run(run_name: str):
+    """
+    Instruments a complete run: resets the collected spans and the request memo, then logs the summary and
+    writes the trace when the run finishes. Can be used as a decorator too.
+    """
+    # Imported here, the coalescer counts its hits with this module
+    from utils.request_coalescer import get_request_coalescer
+
+    reset()
+    # Results of the previous job are neither served to this one nor kept in memory after it
+    get_request_coalescer().clear()
+    try:
+        with span(run_name) as current:
+            yield current
+    finally:
+        get_request_coalescer().clear()
+        log_summary(run_name)
+        write_trace(run_name)
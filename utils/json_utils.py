@@ -0,0 +1,101 @@
+import json
+import warnings
+import numpy as np
+import pandas as pd
+from utils.log_utils import *
+from utils.dtype_utils import DATE_COLUMNS
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    logd("orjson is not installed, decoding JSON with the standard library")
+
+"""
+Fast JSON decoding for API payloads.
+
+Bodies are parsed with orjson when it is installed (several times faster than the standard library) and record lists
+are turned into DataFrames column by column: numbers become float64/int64 arrays, flags bool arrays, ISO date strings are parsed in
+bulk to datetime64, other values stay objects. This skips the slow row-wise construction of pd.DataFrame(list of
+dicts) and the separate pd.to_datetime passes.
+"""
+
+def loads(content):
+    """
+    Decodes a JSON body given as bytes or str.
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def dumps(data):
+    """
+    Encodes data as JSON bytes.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(data).encode()
+
+
+def parse_dates(values: list):
+    """
+    Parses ISO date strings to datetime64, invalid or timezone-qualified dates fall back to pandas.
+    """
+    try:
+        with warnings.catch_warnings():
+            # Timezone offsets are deprecated in numpy, let pandas handle them
+            warnings.simplefilter("error", DeprecationWarning)
+            return np.array(values, dtype='datetime64[ns]')
+    except (ValueError, TypeError, DeprecationWarning):
+        dates = pd.to_datetime(pd.Series(values, dtype=object), errors='coerce', format='ISO8601')
+        if isinstance(dates.dtype, pd.DatetimeTZDtype):
+            dates = dates.dt.tz_convert(None)
+        return dates.to_numpy()
+
+
+def to_column(values: list, is_date: bool = False):
+    """
+    Converts the values of one field to a typed array.
+    """
+    if is_date:
+        return parse_dates(values)
+    first_value = next((value for value in values if value is not None), None)
+    if isinstance(first_value, bool) and None not in values:
+        return np.array(values, dtype=bool)
+    if isinstance(first_value, (int, float)) and not isinstance(first_value, bool):
+        try:
+            # Missing numbers become NaN
+            array = np.array(values, dtype=np.float64 if None in values else None)
+            if array.dtype.kind in 'iuf':
+                return array
+        except (ValueError, TypeError, OverflowError):
+            pass
+    return np.array(values, dtype=object)
+
+
+def records_to_df(records: list, date_columns: list = DATE_COLUMNS):
+    """
+    Builds a DataFrame from a list of JSON records, one typed column at a time.
+
+    Parameters:
+        records (list): Decoded records, e.g. the 'historical' list of a price payload.
+        date_columns (list): Fields holding ISO dates, parsed to datetime64.
+
+    Returns:
+        pd.DataFrame: One column per field, in the order of first appearance.
+    """
+    if not records:
+        return pd.DataFrame()
+
+    # FMP records share their fields, only look for additional ones when a record differs
+    columns = dict.fromkeys(records[0])
+    for record in records:
+        if record.keys() != columns.keys():
+            columns.update(dict.fromkeys(record))
+
+    data = {}
+    for column in columns:
+        values = [record.get(column) for record in records]
+        data[column] = to_column(values, column in date_columns)
+    return pd.DataFrame(data, copy=False)
@@ -2,6 +2,8 @@ from loguru import logger
 from datetime import datetime
 import os
 import sys
+import multiprocessing
+from time import perf_counter
 from config import *
 from enum import Enum
 
@@ -14,46 +16,98 @@ class LogLevel(Enum):
 
 #  Set log level
 LOG_LEVEL = LogLevel.DEBUG
+LOG_ROTATION = "00:00"  # Start a new log file every day at midnight
+LOG_RETENTION = "14 days"  # Delete rotated log files older than this
+PROGRESS_LOG_EVERY = 100  # Progress loggers report every n-th item...
+PROGRESS_LOG_INTERVAL_SECONDS = 30  # ...or when this much time passed since the last report
 
 
-def setup_logger(log_file_name):
-    if not os.path.exists(LOG_DIR):
-        os.makedirs(LOG_DIR)
-
+def setup_logger(log_file_name=None):
+    """
+    Logs to the console and, when a file name is given, to a rotated file in LOG_DIR.
+    """
     logger.remove()
-    log_level = "DEBUG"
-    log_full_path = os.path.join(LOG_DIR, log_file_name)
+    log_level = LOG_LEVEL.name
 
     console_log_format = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level}</level> | <level>{message}</level>"
     file_log_format = "{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}"
 
-    logger.add(sys.stdout, level=log_level, format=console_log_format, colorize=True, backtrace=True, diagnose=True)
-    logger.add(log_full_path, level=log_level, format=file_log_format, colorize=True, backtrace=True, diagnose=True)
+    # Variable values in tracebacks (diagnose) are expensive and may leak API keys, keep them off
+    logger.add(sys.stdout, level=log_level, format=console_log_format, colorize=True, backtrace=False, diagnose=False)
+    if log_file_name is None:
+        return
+
+    if not os.path.exists(LOG_DIR):
+        os.makedirs(LOG_DIR)
+    log_full_path = os.path.join(LOG_DIR, log_file_name)
+    # File writes happen on a background thread so logging never blocks the loaders
+    logger.add(log_full_path, level=log_level, format=file_log_format, colorize=False, backtrace=False,
+               diagnose=False, enqueue=True, rotation=LOG_ROTATION, retention=LOG_RETENTION)
+
+
+def _is_enabled(level: LogLevel):
+    return LOG_LEVEL.value <= level.value
+
+
+# Messages may contain {} placeholders that are only formatted when the level is enabled,
+# e.g. logd("Loading {}... ({}/{})", symbol, i, num_symbols)
+def logd(message, *args, **kwargs):
+    if _is_enabled(LogLevel.DEBUG):
+        logger.debug(message, *args, **kwargs)
+
+
+def loge(message, *args, **kwargs):
+    logger.error(message, *args, **kwargs)
 
 
-def logd(message):
-    if LOG_LEVEL == LogLevel.DEBUG:
-        logger.debug(message)
+def logi(message, *args, **kwargs):
+    if _is_enabled(LogLevel.INFO):
+        logger.info(message, *args, **kwargs)
 
 
-def loge(message):
-    logger.error(message)
+def logw(message, *args, **kwargs):
+    if _is_enabled(LogLevel.WARNING):
+        logger.warning(message, *args, **kwargs)
 
 
-def logi(message):
-    if LOG_LEVEL == LogLevel.INFO or LOG_LEVEL == LogLevel.DEBUG:
-        logger.info(message)
+class ProgressLogger:
+    """
+    Sampled progress reporting for per-symbol loops.
 
+    Logs the first and the last item, every n-th item and whenever the interval passed since the last report,
+    instead of one line per symbol.
+    """
+    def __init__(self, name: str, total: int, every: int = PROGRESS_LOG_EVERY,
+                 interval_seconds: float = PROGRESS_LOG_INTERVAL_SECONDS):
+        self.name = name
+        self.total = total
+        self.every = max(1, every)
+        self.interval_seconds = interval_seconds
+        self.count = 0
+        self.start_time = perf_counter()
+        self.last_log_time = self.start_time
 
-def logw(message):
-    if LOG_LEVEL == LogLevel.INFO or LOG_LEVEL == LogLevel.DEBUG or LOG_LEVEL == LogLevel.WARNING:
-        logger.warning(message)
+    def update(self, item=None):
+        self.count += 1
+        if not _is_enabled(LogLevel.DEBUG):
+            return
+        now = perf_counter()
+        if (self.count == 1 or self.count == self.total or self.count % self.every == 0
+                or now - self.last_log_time >= self.interval_seconds):
+            self.last_log_time = now
+            rate = self.count / max(now - self.start_time, 1e-9)
+            logger.debug("{} {}... ({}/{}, {:.1f}/s)", self.name, item if item is not None else "",
+                         self.count, self.total, rate)
 
 
 def create_log_file():
-    today = datetime.today().strftime("%Y%m%d")
-    log_file_name = f"fmp-screener-log-{today}.log"
-    setup_logger(log_file_name)
+    # Fixed name, rotation renames the previous file with its date and retention deletes the old ones
+    setup_logger(LOG_FILE_NAME)
 
 
-create_log_file()
\ No newline at end of file
+# Worker processes started with spawn import this module again. Only the main process writes the log file, a
+# second rotating sink on the same file in every worker would rotate and delete it concurrently.
+if multiprocessing.current_process().name == "MainProcess":
+    create_log_file()
+else:
+    setup_logger()
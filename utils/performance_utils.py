@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+"""
+Vectorized performance metrics computed over a (date x symbol) returns matrix.
+Every metric is calculated for all columns at once instead of looping through symbols.
+"""
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def calculate_alpha_beta(returns: np.ndarray, benchmark_returns: np.ndarray):
+    """
+    Calculates annualized alpha and beta of every column against the benchmark with a single regression.
+
+    Parameters:
+        returns (np.ndarray): 2D array of daily returns (dates x symbols), may contain NaN values.
+        benchmark_returns (np.ndarray): 1D array of daily benchmark returns.
+
+    Returns:
+        tuple: (alpha, beta) arrays with one value per symbol.
+    """
+    # Only use benchmark returns on dates where the symbol has a return
+    independent = np.where(np.isnan(returns), np.nan, benchmark_returns[:, None])
+    independent_residual = independent - np.nanmean(independent, axis=0)
+    covariances = np.nanmean(independent_residual * returns, axis=0)
+    independent_variances = np.nanmean(independent_residual ** 2, axis=0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        beta = covariances / independent_variances
+    beta[independent_variances < 1.0E-30] = np.nan
+
+    alpha_series = returns - beta * benchmark_returns[:, None]
+    alpha = (np.nanmean(alpha_series, axis=0) + 1) ** TRADING_DAYS_PER_YEAR - 1
+
+    return alpha, beta
+
+
+def calculate_annual_volatility(returns: np.ndarray):
+    return np.nanstd(returns, ddof=1, axis=0) * np.sqrt(TRADING_DAYS_PER_YEAR)
+
+
+def calculate_max_drawdown(returns: np.ndarray):
+    # Cumulative wealth per column with a starting value of 1, missing returns count as flat days
+    cumulative = np.ones((returns.shape[0] + 1, returns.shape[1]))
+    np.cumprod(1 + np.nan_to_num(returns), axis=0, out=cumulative[1:])
+    running_max = np.fmax.accumulate(cumulative, axis=0)
+    return np.nanmin((cumulative - running_max) / running_max, axis=0)
+
+
+def calculate_annual_return(returns: np.ndarray):
+    if len(returns) == 0:
+        return np.full(returns.shape[1], np.nan)
+    num_years = len(returns) / TRADING_DAYS_PER_YEAR
+    ending_value = np.prod(1 + np.nan_to_num(returns), axis=0)
+    return ending_value ** (1 / num_years) - 1
+
+
+def calculate_trailing_annual_return(returns_df: pd.DataFrame, num_years: int):
+    # Same window as returns_df.last(f"{num_years}Y"): everything after the year end num_years back
+    start_date = returns_df.index[-1] - pd.offsets.YearEnd(num_years)
+    start = returns_df.index.searchsorted(start_date, side="right")
+    return calculate_annual_return(returns_df.values[start:])
+
+
+def calculate_yearly_returns(returns_df: pd.DataFrame, num_years: int, end_date: datetime = None):
+    """
+    Calculates compounded returns for consecutive 365-day periods counted back from the end date.
+
+    Parameters:
+        returns_df (pd.DataFrame): Daily returns with a DatetimeIndex (dates x symbols).
+        num_years (int): Number of yearly periods to calculate.
+        end_date (datetime): End of the most recent period. Defaults to now.
+
+    Returns:
+        pd.DataFrame: Yearly returns (symbols x periods), column 'return_y1' is the most recent period.
+    """
+    if end_date is None:
+        end_date = datetime.today()
+
+    # Assign every date to its yearly period and compound all periods with one grouped product
+    elapsed_years = (pd.Timestamp(end_date) - returns_df.index) / pd.Timedelta(days=365)
+    period = np.ceil(elapsed_years).astype(int)
+    yearly_returns_df = (returns_df + 1).groupby(period).prod() - 1
+
+    # Periods without any dates stay empty
+    yearly_returns_df = yearly_returns_df.reindex(range(1, num_years + 1))
+    yearly_returns_df.index = [f"return_y{year}" for year in yearly_returns_df.index]
+
+    return yearly_returns_df.T
+
+
+def calculate_performance_metrics(returns_df: pd.DataFrame, benchmark_symbol: str, num_years: int,
+                                  precision: int = 4):
+    """
+    Calculates alpha, beta, volatility, drawdown and trailing returns for every column of a returns matrix.
+
+    Parameters:
+        returns_df (pd.DataFrame): Aligned daily returns with a DatetimeIndex (dates x symbols).
+        benchmark_symbol (str): Column used as the benchmark for alpha and beta.
+        num_years (int): Number of years of price data analyzed.
+        precision (int): Number of places after the decimal point.
+
+    Returns:
+        pd.DataFrame: One row of metrics per symbol.
+    """
+    returns_df = returns_df.sort_index()
+    returns = returns_df.values.astype(np.float64)
+    benchmark_returns = returns_df[benchmark_symbol].values.astype(np.float64)
+
+    alpha, beta = calculate_alpha_beta(returns, benchmark_returns)
+    volatility = calculate_annual_volatility(returns)
+    max_drawdown = calculate_max_drawdown(returns)
+
+    # Average annual return over the full analysis period
+    total_return = np.nanprod(returns + 1, axis=0) - 1
+    avg_annual_return = (1 + total_return) ** (1 / num_years) - 1
+
+    metrics_df = pd.DataFrame({
+        'symbol': returns_df.columns,
+        'alpha': np.round(alpha * 100, precision),
+        'beta': np.round(beta, precision),
+        'volatility': np.round(volatility, precision) * 100,
+        'max_drawdown': np.round(max_drawdown, precision) * 100,
+        'avg_annual_return': np.round(avg_annual_return, precision) * 100,
+        'avg_3yr_return': np.round(calculate_trailing_annual_return(returns_df, 3) * 100, precision),
+        'avg_5yr_return': np.round(calculate_trailing_annual_return(returns_df, 5) * 100, precision),
+        'avg_10yr_return': np.round(calculate_trailing_annual_return(returns_df, 10) * 100, precision),
+    })
+
+    # Add yearly returns
+    yearly_returns_df = calculate_yearly_returns(returns_df, num_years)
+    yearly_returns_df = np.round(yearly_returns_df * 100, precision)
+    metrics_df = metrics_df.merge(yearly_returns_df, left_on='symbol', right_index=True, how='left')
+
+    return metrics_df
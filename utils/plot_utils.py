@@ -29,7 +29,7 @@ def plot_pullback_chart(symbol,
                        df,
                        plots_dir="plots",
                        file_name="channels.png"):
-    logi(f"Plotting pullback chart for {symbol}")
+    logi("Plotting pullback chart for {}", symbol)
     palette = light_palette
 
     title = file_name.replace(".png", "").replace("-", " ")
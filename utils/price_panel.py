@@ -0,0 +1,201 @@
+import json
+import numpy as np
+import pandas as pd
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from utils.log_utils import *
+
+"""
+Shared, read-only price panel for worker processes.
+
+The price history of all symbols is written once into a memory-mapped (symbol x date x field) array with a
+symbol -> row index next to it. Worker processes attach to the file instead of receiving pickled DataFrames, the
+operating system shares the pages between them. A panel behaves like a read-only prices_dict, so screeners that
+take a prices_dict accept a panel as well.
+"""
+
+PRICE_PANEL_DIR = os.path.join(CACHE_DIR, "price_panels")
+PRICE_PANEL_DATA_FILE_NAME = "panel.dat"
+PRICE_PANEL_INDEX_FILE_NAME = "panel_index.json"
+PRICE_PANEL_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+PRICE_PANEL_DTYPE = 'float32'
+
+
+def get_dates(prices_df: pd.DataFrame):
+    if 'date' in prices_df.columns:
+        return pd.to_datetime(prices_df['date']).values
+    return pd.to_datetime(prices_df.index).values
+
+
+def create_price_panel(prices_dict: dict, name: str, fields: list = None, dtype: str = PRICE_PANEL_DTYPE,
+                       panel_dir: str = PRICE_PANEL_DIR):
+    """
+    Writes the price frames into a memory-mapped panel and returns it attached read-only.
+
+    Parameters:
+        prices_dict (dict): Map of symbol -> price DataFrame, indexed by date or with a 'date' column.
+        name (str): Panel name, an existing panel with the same name is replaced.
+        fields (list): Price columns to store, PRICE_PANEL_FIELDS by default.
+        dtype (str): Data type of the stored values.
+
+    Returns:
+        PricePanel: The attached panel.
+    """
+    if fields is None:
+        fields = PRICE_PANEL_FIELDS
+    prices_dict = {symbol: prices_df for symbol, prices_df in prices_dict.items()
+                   if prices_df is not None and len(prices_df) > 0}
+    symbols = list(prices_dict.keys())
+    if symbols:
+        date_index = pd.DatetimeIndex(np.unique(np.concatenate([get_dates(df) for df in prices_dict.values()])))
+    else:
+        date_index = pd.DatetimeIndex([])
+
+    path = os.path.join(panel_dir, name)
+    os.makedirs(path, exist_ok=True)
+    shape = (len(symbols), len(date_index), len(fields))
+    data = np.memmap(os.path.join(path, PRICE_PANEL_DATA_FILE_NAME), dtype=dtype, mode='w+',
+                     shape=(max(1, shape[0]), max(1, shape[1]), max(1, shape[2])))
+    data[:] = np.nan
+
+    # Rows are filled one symbol at a time, only one price frame is converted at once
+    ranges = {}
+    for row, symbol in enumerate(symbols):
+        prices_df = prices_dict[symbol]
+        positions = date_index.get_indexer(get_dates(prices_df))
+        for col, field in enumerate(fields):
+            if field in prices_df.columns:
+                data[row, positions, col] = prices_df[field].to_numpy(dtype=dtype, na_value=np.nan)
+        ranges[symbol] = [int(positions.min()), int(positions.max()) + 1]
+    data.flush()
+    del data
+
+    panel_index = {
+        'symbols': symbols,
+        'dates': [date.strftime("%Y-%m-%d") for date in date_index],
+        'fields': fields,
+        'dtype': dtype,
+        'shape': list(shape),
+        'ranges': ranges,
+    }
+    with open(os.path.join(path, PRICE_PANEL_INDEX_FILE_NAME), "w") as index_file:
+        json.dump(panel_index, index_file)
+
+    panel = PricePanel(path)
+    logi("Price panel {}: {} symbols x {} dates x {} fields, {:.1f} MB", name, shape[0], shape[1], shape[2],
+         panel.nbytes / (1024 * 1024))
+    return panel
+
+
+class PricePanel(Mapping):
+    """
+    Read-only view on a memory-mapped price panel. Maps symbol -> price DataFrame like a prices_dict.
+
+    Attributes:
+        path (str): Panel directory
+        symbols (list): Symbols in row order
+        dates (pd.DatetimeIndex): Union of all trading dates
+        fields (list): Stored price columns
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, PRICE_PANEL_INDEX_FILE_NAME), "r") as index_file:
+            panel_index = json.load(index_file)
+        self.symbols = panel_index['symbols']
+        self.dates = pd.DatetimeIndex(pd.to_datetime(panel_index['dates']), name='date')
+        self.fields = panel_index['fields']
+        self.ranges = panel_index['ranges']
+        self.symbol_index = {symbol: row for row, symbol in enumerate(self.symbols)}
+        shape = tuple(max(1, size) for size in panel_index['shape'])
+        self.data = np.memmap(os.path.join(path, PRICE_PANEL_DATA_FILE_NAME), dtype=panel_index['dtype'],
+                              mode='r', shape=shape)
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+    def __getitem__(self, symbol):
+        if symbol not in self.symbol_index:
+            raise KeyError(symbol)
+        return self.get_prices_df(symbol)
+
+    def __contains__(self, symbol):
+        return symbol in self.symbol_index
+
+    def __iter__(self):
+        return iter(self.symbols)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def get_prices_df(self, symbol: str, dtype=np.float64):
+        """
+        Returns the price history of a symbol as a DataFrame indexed by date, oldest first.
+        The values are copied, callers may add columns or modify the frame.
+        """
+        row = self.symbol_index[symbol]
+        start, end = self.ranges[symbol]
+        values = np.array(self.data[row, start:end, :len(self.fields)], dtype=dtype)
+        prices_df = pd.DataFrame(values, index=self.dates[start:end], columns=self.fields)
+        # Dates on which only other symbols traded
+        return prices_df[~np.isnan(values).all(axis=1)]
+
+    def get_field_matrix(self, field: str, symbol_list: list = None):
+        """
+        Returns one field of all (or the given) symbols as a (date x symbol) DataFrame.
+        Without a symbol list the DataFrame is backed by the memory map and must not be modified.
+        """
+        col = self.fields.index(field)
+        if symbol_list is None:
+            return pd.DataFrame(self.data[:len(self.symbols), :len(self.dates), col].T, index=self.dates,
+                                columns=self.symbols, copy=False)
+        rows = [self.symbol_index[symbol] for symbol in symbol_list if symbol in self.symbol_index]
+        return pd.DataFrame(self.data[rows, :len(self.dates), col].T, index=self.dates,
+                            columns=[self.symbols[row] for row in rows])
+
+
+# Panel attached once per worker process
+_worker_panel = None
+
+
+def _attach_worker_panel(path: str):
+    global _worker_panel
+    _worker_panel = PricePanel(path)
+
+
+def _run_for_symbol(func, symbol: str, panel: PricePanel = None):
+    if panel is None:
+        panel = _worker_panel
+    try:
+        return symbol, func(symbol, panel.get_prices_df(symbol))
+    except Exception as ex:
+        loge(f"Failed to process {symbol}: {ex}")
+        return symbol, None
+
+
+def map_symbols(func, panel: PricePanel, symbol_list: list = None, num_workers: int = NUM_WORKER_PROCESSES,
+                chunk_size: int = 16):
+    """
+    Calls func(symbol, prices_df) for every symbol of the panel in worker processes that share the panel.
+
+    The function must be defined at module level so it can be sent to the workers. Runs in-process when
+    num_workers is 1.
+
+    Returns:
+        dict: Symbol -> result, None for symbols that failed.
+    """
+    if symbol_list is None:
+        symbol_list = panel.symbols
+    symbol_list = [symbol for symbol in symbol_list if symbol in panel]
+    if num_workers <= 1 or len(symbol_list) <= chunk_size:
+        return dict(_run_for_symbol(func, symbol, panel) for symbol in symbol_list)
+
+    results = {}
+    progress = ProgressLogger("Processed", len(symbol_list))
+    with ProcessPoolExecutor(max_workers=num_workers, initializer=_attach_worker_panel,
+                             initargs=(panel.path,)) as executor:
+        for symbol, result in executor.map(_run_for_symbol, [func] * len(symbol_list), symbol_list,
+                                           chunksize=chunk_size):
+            progress.update(symbol)
+            results[symbol] = result
+    return results
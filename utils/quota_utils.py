@@ -0,0 +1,114 @@
+import time
+import sqlite3
+import threading
+from utils.log_utils import *
+
+"""
+API quota shared by all processes on the host.
+
+The FMP quota is per account, not per process, so overlapping schedule jobs and parallel finders draw from one
+token bucket kept in a SQLite file. Every request takes a token, tokens refill at the account rate and a small
+burst is allowed. Optional requests can be made to leave part of the burst to more important ones. When the API
+still answers 429 Too Many Requests the bucket is blocked for all processes until the Retry-After time has passed,
+instead of every process retrying on its own.
+"""
+
+QUOTA_LEDGER_PATH = os.path.join(CACHE_DIR, "api_quota.db")
+QUOTA_BURST_SECONDS = 5  # Bucket capacity in seconds of quota
+DEFAULT_RETRY_AFTER = 10  # Seconds to block when a 429 response has no Retry-After header
+MAX_QUOTA_WAIT = 1.0  # Seconds between ledger checks while waiting for a token
+
+
+class QuotaLedger:
+    """
+    Token bucket stored in SQLite, shared by all processes using the same file
+
+    Attributes:
+        name (str): Bucket name, one per API account
+        calls_per_minute (int): Account quota
+        path (str): SQLite file
+    """
+    def __init__(self, name: str, calls_per_minute: int, path: str = QUOTA_LEDGER_PATH):
+        self.name = name
+        self.rate = calls_per_minute / 60
+        self.capacity = max(1.0, self.rate * QUOTA_BURST_SECONDS)
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL, "
+                                "updated REAL, blocked_until REAL)")
+        self.connection.execute("INSERT OR IGNORE INTO buckets VALUES (?, ?, ?, 0)",
+                                (name, self.capacity, time.time()))
+
+    def _take(self, reserve: float):
+        """
+        Takes a token if one is available beyond the reserve. Returns 0 on success, otherwise the seconds to wait.
+        """
+        with self.lock:
+            # Write lock for the whole read-modify-write, other processes wait for it
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                tokens, updated, blocked_until = self.connection.execute(
+                    "SELECT tokens, updated, blocked_until FROM buckets WHERE name = ?", (self.name,)).fetchone()
+                now = time.time()
+                if now < blocked_until:
+                    wait_seconds = blocked_until - now
+                else:
+                    tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+                    if tokens >= 1 + reserve:
+                        tokens -= 1
+                        wait_seconds = 0
+                    else:
+                        wait_seconds = (1 + reserve - tokens) / self.rate
+                    self.connection.execute("UPDATE buckets SET tokens = ?, updated = ? WHERE name = ?",
+                                            (tokens, now, self.name))
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+        return wait_seconds
+
+    def acquire(self, reserve_fraction: float = 0.0):
+        """
+        Blocks until a request may be sent. With a reserve fraction the request only takes a token while that
+        fraction of the bucket stays available to other requests.
+        """
+        reserve = min(self.capacity - 1, self.capacity * reserve_fraction)
+        wait_seconds = self._take(reserve)
+        while wait_seconds > 0:
+            time.sleep(min(wait_seconds, MAX_QUOTA_WAIT))
+            wait_seconds = self._take(reserve)
+
+    def block(self, seconds: float):
+        """
+        Stops all processes from sending requests for the given time, e.g. after a 429 response.
+        """
+        with self.lock:
+            self.connection.execute("UPDATE buckets SET tokens = 0, blocked_until = MAX(blocked_until, ?) "
+                                    "WHERE name = ?", (time.time() + seconds, self.name))
+        logw("API quota of {} exceeded, pausing requests for {:.0f} seconds", self.name, seconds)
+
+
+def get_retry_after(response):
+    """
+    Returns the seconds to wait after a 429 response.
+    """
+    try:
+        return float(response.headers.get('Retry-After', DEFAULT_RETRY_AFTER))
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+
+_quota_ledgers = {}
+_quota_ledgers_lock = threading.Lock()
+
+
+def get_quota_ledger(name: str, calls_per_minute: int):
+    """
+    Returns the process-wide ledger of a bucket.
+    """
+    with _quota_ledgers_lock:
+        if name not in _quota_ledgers:
+            _quota_ledgers[name] = QuotaLedger(name, calls_per_minute)
+        return _quota_ledgers[name]
@@ -8,6 +8,11 @@ def convert_list_to_dataframe(data_list: list, column_list: list):
     return df
 
 
+def reduce_row(row: dict, column_list: list):
+    # Keep only the report columns of a per-symbol record so the full record can be released
+    return {column: row[column] for column in column_list if column in row}
+
+
 # Helper function for normalizing columns
 def normalize_columns(df, columns):
     scaler = MinMaxScaler()
@@ -0,0 +1,96 @@
+import time
+import threading
+from collections import OrderedDict
+from utils.log_utils import *
+from utils.instrumentation_utils import count
+
+"""
+In-flight deduplication and run memo for API requests.
+
+Several code paths ask for the same symbol during one run, often through different FmpClient instances. Identical
+requests that are in flight at the same time share one call, the other callers wait for its result. Completed
+results are kept for the rest of the run, so a symbol that shows up in several segments or screeners is only
+fetched once. Failed requests (None results) are not kept and are retried by the next caller. trace_run clears
+the memo when a job starts and ends, so the scheduler process does not serve one job's data to the next; results
+also expire after a few hours for callers outside trace_run.
+"""
+
+REQUEST_MEMO_MAX_ENTRIES = 500  # Oldest results are dropped first, bounds the memory held by the memo
+REQUEST_MEMO_MAX_AGE = 4 * 60 * 60  # Seconds
+
+
+class InFlightRequest:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class RequestCoalescer:
+    """
+    Shares the results of identical requests within a run
+
+    Attributes:
+        max_entries (int): Maximum number of completed results kept
+        max_age (float): Seconds a completed result is kept
+    """
+    def __init__(self, max_entries: int = REQUEST_MEMO_MAX_ENTRIES, max_age: float = REQUEST_MEMO_MAX_AGE):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.memo = OrderedDict()
+        self.in_flight = {}
+        self.lock = threading.Lock()
+
+    def get(self, key: str, func):
+        """
+        Returns the result of func() for a request key, calling func at most once for concurrent and repeated
+        requests. Results are shared between callers and must not be modified.
+        """
+        with self.lock:
+            if key in self.memo:
+                stored_time, result = self.memo[key]
+                if time.time() - stored_time < self.max_age:
+                    self.memo.move_to_end(key)
+                    count('coalesced')
+                    return result
+                del self.memo[key]
+            request = self.in_flight.get(key)
+            is_owner = request is None
+            if is_owner:
+                request = InFlightRequest()
+                self.in_flight[key] = request
+
+        if not is_owner:
+            count('coalesced')
+            request.done.wait()
+            return request.result
+
+        try:
+            request.result = func()
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+                if request.result is not None:
+                    self.memo[key] = (time.time(), request.result)
+                    while len(self.memo) > self.max_entries:
+                        self.memo.popitem(last=False)
+            request.done.set()
+        return request.result
+
+    def clear(self):
+        with self.lock:
+            self.memo.clear()
+
+
+_request_coalescer = None
+_request_coalescer_lock = threading.Lock()
+
+
+def get_request_coalescer():
+    """
+    Returns the process-wide request coalescer, all FmpClient instances share one memo.
+    """
+    global _request_coalescer
+    with _request_coalescer_lock:
+        if _request_coalescer is None:
+            _request_coalescer = RequestCoalescer()
+        return _request_coalescer
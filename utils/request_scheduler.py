@@ -0,0 +1,155 @@
+import time
+import heapq
+import itertools
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from utils.log_utils import *
+from utils.instrumentation_utils import set_gauge, propagate_spans
+from enums import RequestPriority
+
+"""
+Adaptive concurrency for FMP requests.
+
+The number of requests in flight follows AIMD (additive increase, multiplicative decrease): while responses are
+healthy the limit grows by about one per round of requests, a 429, a timeout or a latency spike halves it. This
+finds the concurrency FMP tolerates that night instead of relying on a fixed delay. The current limit, the peak
+and the throughput of the last minute are published as run gauges.
+
+Free slots go to the waiting request with the highest priority, first come first served within a priority, so
+critical-path requests overtake optional enrichment when the limit or the quota is tight.
+"""
+
+INITIAL_CONCURRENCY = 4
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 32
+DECREASE_FACTOR = 0.5
+LATENCY_SPIKE_FACTOR = 3.0  # A response slower than this multiple of the typical latency counts as a spike
+LATENCY_SMOOTHING = 0.05  # Weight of a new latency sample in the typical latency
+THROUGHPUT_WINDOW = 60  # Seconds
+
+
+class RequestScheduler:
+    """
+    Limits the requests in flight and adapts the limit to the observed latency and errors
+
+    Attributes:
+        name (str): Gauge prefix, e.g. 'fmp'
+        concurrency (float): Current limit, the integer part is used
+        min_concurrency (int): Lower bound of the limit
+        max_concurrency (int): Upper bound of the limit and size of the thread pool used by map()
+    """
+    def __init__(self, name: str, initial_concurrency: int = INITIAL_CONCURRENCY,
+                 min_concurrency: int = MIN_CONCURRENCY, max_concurrency: int = MAX_CONCURRENCY):
+        self.name = name
+        self.concurrency = float(initial_concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.peak_concurrency = initial_concurrency
+        self.in_flight = 0
+        self.typical_latency = None
+        self.last_decrease_time = 0.0
+        self.completion_times = deque()
+        self.waiting = []
+        self.tickets = itertools.count()
+        self.condition = threading.Condition()
+
+    def get_limit(self):
+        return max(self.min_concurrency, int(self.concurrency))
+
+    @contextmanager
+    def slot(self, priority: RequestPriority = RequestPriority.NORMAL):
+        """
+        Waits for a free slot, then times the request sent in the block. Call failed() on the returned slot for
+        a 429 or timeout.
+        """
+        with self.condition:
+            ticket = (priority.value, next(self.tickets))
+            heapq.heappush(self.waiting, ticket)
+            while self.in_flight >= self.get_limit() or self.waiting[0] != ticket:
+                self.condition.wait()
+            heapq.heappop(self.waiting)
+            self.in_flight += 1
+            # The next waiter may fit as well
+            self.condition.notify_all()
+
+        request_slot = RequestSlot()
+        try:
+            yield request_slot
+        except Exception:
+            request_slot.failed()
+            raise
+        finally:
+            with self.condition:
+                self.in_flight -= 1
+                self._record(time.perf_counter() - request_slot.start_time, request_slot.is_failed)
+                self.condition.notify_all()
+
+    def _record(self, latency: float, is_failed: bool):
+        now = time.time()
+        is_spike = self.typical_latency is not None and latency > self.typical_latency * LATENCY_SPIKE_FACTOR
+        if is_failed or is_spike:
+            # Back off once per round trip, the other requests of the same burst fail for the same reason
+            if now - self.last_decrease_time > (self.typical_latency or latency):
+                self.concurrency = max(self.min_concurrency, self.concurrency * DECREASE_FACTOR)
+                self.last_decrease_time = now
+        else:
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+
+        if not is_failed:
+            if self.typical_latency is None:
+                self.typical_latency = latency
+            else:
+                self.typical_latency += (latency - self.typical_latency) * LATENCY_SMOOTHING
+        self.peak_concurrency = max(self.peak_concurrency, self.get_limit())
+
+        self.completion_times.append(now)
+        while self.completion_times[0] < now - THROUGHPUT_WINDOW:
+            self.completion_times.popleft()
+
+        set_gauge(f"{self.name}_concurrency", self.get_limit())
+        set_gauge(f"{self.name}_peak_concurrency", self.peak_concurrency)
+        set_gauge(f"{self.name}_requests_per_second", round(len(self.completion_times) / THROUGHPUT_WINDOW, 2))
+        set_gauge(f"{self.name}_typical_latency_ms", round((self.typical_latency or 0) * 1000))
+
+    def map(self, func, items):
+        """
+        Calls func(item) for every item on a thread pool and yields (item, result) in the order of the items.
+        Only a bounded number of calls run ahead of the consumer, the scheduler limits the requests they send.
+        """
+        items = list(items)
+        # Requests of the workers count towards the caller's loader and finder spans
+        func = propagate_spans(func)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            pending = deque()
+            next_index = 0
+            while next_index < len(items) or pending:
+                while next_index < len(items) and len(pending) < self.max_concurrency * 2:
+                    pending.append((items[next_index], executor.submit(func, items[next_index])))
+                    next_index += 1
+                item, future = pending.popleft()
+                yield item, future.result()
+
+
+class RequestSlot:
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.is_failed = False
+
+    def failed(self):
+        self.is_failed = True
+
+
+_request_schedulers = {}
+_request_schedulers_lock = threading.Lock()
+
+
+def get_request_scheduler(name: str, max_concurrency: int = MAX_CONCURRENCY):
+    """
+    Returns the process-wide scheduler of an API, all clients of the API share its limit.
+    """
+    with _request_schedulers_lock:
+        if name not in _request_schedulers:
+            _request_schedulers[name] = RequestScheduler(name, max_concurrency=max_concurrency)
+        return _request_schedulers[name]
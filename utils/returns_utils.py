@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+from utils.price_panel import PricePanel
+
+"""
+Builds aligned (date x symbol) price and returns matrices from a dictionary of per-symbol price frames.
+"""
+
+
+def get_price_series(prices_df: pd.DataFrame, column: str = 'close'):
+    # Price frames arrive either indexed by date or with a 'date' column
+    if 'date' in prices_df.columns:
+        index = pd.to_datetime(prices_df['date'])
+    else:
+        index = pd.to_datetime(prices_df.index)
+    return pd.Series(prices_df[column].values, index=index)
+
+
+def build_price_matrix(prices_dict: dict, column: str = 'close', dtype=np.float32, symbol_list: list = None):
+    """
+    Aligns one price column of every symbol into a single (date x symbol) matrix.
+
+    Parameters:
+        prices_dict (dict): Map of symbol -> price DataFrame, or a PricePanel.
+        column (str): Price column to use, e.g. 'close' or 'adj_close'.
+        dtype: Data type of the matrix. float32 halves the memory of a full universe.
+        symbol_list (list): Only use these symbols, all symbols when None.
+
+    Returns:
+        pd.DataFrame: Price matrix, NaN where a symbol has no price for a date.
+    """
+    # A panel already holds the aligned matrix
+    if isinstance(prices_dict, PricePanel):
+        return prices_dict.get_field_matrix(column, symbol_list).astype(dtype, copy=False)
+
+    if symbol_list is not None:
+        prices_dict = {symbol: prices_dict[symbol] for symbol in symbol_list if symbol in prices_dict}
+
+    series_dict = {}
+    for symbol, prices_df in prices_dict.items():
+        if prices_df is None or len(prices_df) == 0 or column not in prices_df.columns:
+            continue
+        series = get_price_series(prices_df, column)
+        series_dict[symbol] = series[~series.index.duplicated(keep='last')]
+
+    if not series_dict:
+        return pd.DataFrame(dtype=dtype)
+
+    # Build the union of all dates once and fill a preallocated matrix column by column
+    date_index = pd.DatetimeIndex(np.unique(np.concatenate([s.index.values for s in series_dict.values()])),
+                                  name='date')
+    matrix = np.full((len(date_index), len(series_dict)), np.nan, dtype=dtype)
+    for i, series in enumerate(series_dict.values()):
+        matrix[date_index.get_indexer(series.index), i] = series.values
+
+    return pd.DataFrame(matrix, index=date_index, columns=list(series_dict.keys()))
+
+
+def calculate_daily_returns(price_matrix: pd.DataFrame):
+    """
+    Calculates daily returns per symbol. Returns after a gap are measured from the last available price,
+    the first return of each symbol is 0 and dates on which a symbol has no price stay NaN.
+    """
+    present = price_matrix.notna()
+    returns_df = price_matrix.ffill().pct_change(fill_method=None).fillna(0)
+    return returns_df.where(present)
+
+
+def calculate_period_returns(price_matrix: pd.DataFrame, rule: str = 'M'):
+    """
+    Calculates returns between the last prices of each resampling period, e.g. 'M' for monthly or 'Y' for yearly.
+    """
+    period_prices_df = price_matrix.resample(rule).last()
+    return period_prices_df.pct_change(fill_method=None)
+
+
+def build_returns_matrices(prices_dict: dict, column: str = 'close', dtype=np.float32):
+    """
+    Builds the price matrix and the daily, monthly and yearly returns matrices in one pass.
+
+    Returns:
+        dict: Keys 'prices', 'daily', 'monthly' and 'yearly' mapped to (date x symbol) DataFrames.
+    """
+    price_matrix = build_price_matrix(prices_dict, column=column, dtype=dtype)
+    if price_matrix.empty:
+        empty_df = pd.DataFrame(dtype=dtype)
+        return {'prices': price_matrix, 'daily': empty_df, 'monthly': empty_df, 'yearly': empty_df}
+
+    return {
+        'prices': price_matrix,
+        'daily': calculate_daily_returns(price_matrix),
+        'monthly': calculate_period_returns(price_matrix, 'M'),
+        'yearly': calculate_period_returns(price_matrix, 'Y'),
+    }